@@ -1,5 +1,4 @@
 from pathlib import Path
-from multiprocessing import Pool
 
 import src.scripts as scr
 import src.analysis_definition as analyze
@@ -7,6 +6,8 @@ import src.hdf5_exporter as exhdf5
 import src.utils as util
 import model.paths as pth
 
+from src.shared_waveforms import export_time_history_status, shared_waveform, time_history_pool
+
 # Import config data
 import model.config as config
  
@@ -24,7 +25,8 @@ def run_incremental_dynamic(time_history) -> None:
     analyze.run_incremental_dynamic_analysis(
         frame=frame,
         time_history_analysis=time_history,
-        structure_periods=structure_periods
+        structure_periods=structure_periods,
+        ground_motion=shared_waveform(time_history.filename)
     )
 
 
@@ -39,7 +41,8 @@ def run_time_history(time_history) -> bool:
         frame=frame,
         time_history_analysis=time_history,
         structure_periods=structure_periods,
-        waveform_folder=Path(pth.TIMESERIES_INPUT_FOLDER)
+        waveform_folder=Path(pth.TIMESERIES_INPUT_FOLDER),
+        ground_motion=shared_waveform(time_history.filename)
     )
     # returns if the analysis Failed
     return status
@@ -74,40 +77,43 @@ def main():
 
     # TIME HISTORY MULTI PROCESSING
     if cfg.analysis.run_timehistory:
-        timehistory_analyses = scr.import_time_history_analysis(Path(pth.TIME_HISTORY_PATH))
         util.clean_directory(Path(pth.OUTPUT_TH_DIR_PATH))
-
-        with Pool(processes=cfg.performance_options.processes) as pool:
+        with time_history_pool(
+            Path(pth.TIME_HISTORY_PATH),
+            Path(pth.TIMESERIES_INPUT_FOLDER),
+            processes=cfg.performance_options.processes
+        ) as (pool, timehistory_analyses):
             state = pool.map(run_time_history, timehistory_analyses)
-            # Status output
-            util.export_to_json(
-                filepath=Path('./output/time_history/status.json'),
-                data=dict(
-                    zip(
-                        range(1, len(state) + 1),
-                        state
-                    )
-                )
+            export_time_history_status(
+                Path('./output/time_history/status.json'),
+                timehistory_analyses,
+                state
             )
         # Export TH
         exhdf5.export_CLOUD_to_HDF5(
             time_history_folder=Path('./output/time_history'),
             hdf5_save_path=Path('./output/CLOUD.hdf5'),
-            time_history_input_data=Path('./input/time_history.json')
+            time_history_input_data=Path('./input/time_history.json'),
+            n_storeys=frame.n_storeys,
+            storey_height=frame.storey_height
         )
 
     # IDA
     if cfg.analysis.run_IDA:
-        timehistory_analyses = scr.import_time_history_analysis(Path('./input/time_history_IDA.json'))
         util.clean_directory(Path('./output/IDA'))
-
-        with Pool(processes=cfg.performance_options.processes) as pool:
+        with time_history_pool(
+            Path('./input/time_history_IDA.json'),
+            Path(pth.IDA_TIMESERIES_INPUT_FOLDER),
+            processes=cfg.performance_options.processes
+        ) as (pool, timehistory_analyses):
             pool.map(run_incremental_dynamic, timehistory_analyses)
         # Export IDA
         exhdf5.export_IDA_to_HDF5(
             time_history_folder=Path('./output/IDA'),
             hdf5_save_path=Path('./output/IDA.hdf5'),
-            time_history_input_data=Path('./input/time_history_IDA.json')
+            time_history_input_data=Path('./input/time_history_IDA.json'),
+            n_storeys=frame.n_storeys,
+            storey_height=frame.storey_height
         )
 
 
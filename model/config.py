@@ -19,6 +19,8 @@ class AnalysisConfig(BaseModel):
 
 class MomentRotationOptions(BaseModel):
     pt_points: int
+    backbone_points: int
+    backbone_tolerance: float
     use_GM: bool
     steel_failure: bool
     tendon_failure: bool
@@ -39,9 +41,36 @@ class IDAOptions(BaseModel):
     max_iter_ida: int
 
 
+class IMCacheOptions(BaseModel):
+    cache_folder: Path
+    max_size_mb: float
+    min_period: float
+    max_period: float
+    n_periods: int
+    interpolate: bool
+
+
+class PreprocessingOptions(BaseModel):
+    trim_records: bool
+    arias_start: float
+    arias_end: float
+    taper_duration: float
+
+
+class AdaptiveMSAOptions(BaseModel):
+    batch_size: int
+    min_records: int
+    confidence: float
+    target_ci_width: float
+    seed: int
+
+
 class MNINTConfig(BaseModel):
     analysis: AnalysisConfig
     moment_rotation_options: MomentRotationOptions
     model_options: ModelOptions
     ida_options: IDAOptions
     performance_options: PerfOptions
+    intensity_measure_cache: IMCacheOptions
+    preprocessing_options: PreprocessingOptions
+    adaptive_msa_options: AdaptiveMSAOptions
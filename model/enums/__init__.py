@@ -1,2 +1,3 @@
 from .frame_enums import BeamSide, ColumnSide
-from .model_enums import Transformation, ConnectionLimitStateType
\ No newline at end of file
+from .model_enums import (Transformation, ConnectionLimitStateType, EquilibriumState,
+                          UncertainParameter, Distribution, SweepParameter, SweepSections)
\ No newline at end of file
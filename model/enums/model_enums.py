@@ -7,4 +7,38 @@ class Transformation(int, Enum):
 class ConnectionLimitStateType(str, Enum):
     DS1 = 'DS1'
     DS2 = 'DS2'
-    DST = 'DST'
\ No newline at end of file
+    DST = 'DST'
+
+class EquilibriumState(str, Enum):
+    SteelYielding = 'steel_yielding'
+    SteelFailure = 'steel_failure'
+    TendonFailure = 'tendon_failure'
+    TimberYielding = 'timber_yielding'
+    NeutralAxis = 'neutral_axis'
+
+class UncertainParameter(str, Enum):
+    TimberE = 'timber_E'                    # factor on the timber E
+    TimberFc = 'timber_fc'                  # factor on the timber fc
+    SteelFy = 'steel_fy'                    # factor on the steel fy
+    SteelFu = 'steel_fu'                    # factor on the steel fu
+    PTLoss = 'pt_loss'                      # fraction of post tensioning force lost
+    ConnectionStiffness = 'connection_stiffness_ratio'   # factor on the ratio of every section
+
+class Distribution(str, Enum):
+    Normal = 'normal'
+    Lognormal = 'lognormal'
+    Uniform = 'uniform'
+
+class SweepParameter(str, Enum):
+    TendonsPT = 'tendons_pt'
+    NTendons = 'n_tendons'
+    ReinforcementCount = 'reinforcement_count'
+    B = 'b'
+    H = 'h'
+    ConnectionStiffness = 'connection_stiffness_ratio'
+    Masses = 'masses'                       # every storey mass
+
+class SweepSections(str, Enum):
+    Beams = 'beams'
+    Columns = 'columns'
+    All = 'all'
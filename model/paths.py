@@ -11,6 +11,9 @@ FRAME_PATHS: dict[str, Path] = {
 PUSHOVER_PATH: Path = Path('./input/pushover.json')
 TIME_HISTORY_PATH: Path = Path('./input/time_history.json')
 TIME_HISTORY_IDA_PATH: Path = Path('./input/time_history_IDA.json')
+# Cases and intensities of autoscaled multiple stripe analyses
+MSA_TIME_HISTORY_PATH: Path = Path('./output/msa_time_history.json')
+MSA_INTENSITIES_PATH: Path = Path('./output/msa_intensities.json')
 
 MODEL_OUTPUT_PATH: Path = Path('./output/model.json')
 
@@ -30,6 +33,9 @@ OUTPUT_TH_DIR_PATH: Path = Path('./output/time_history')
 ###
 TIMESERIES_INPUT_FOLDER: Path = Path('./time_series')
 IDA_TIMESERIES_INPUT_FOLDER: Path = Path('./time_series_IDA')
+# Binary waveform library, stored in each waveform folder
+WAVEFORM_LIBRARY_DATA_FILE: str = 'waveforms.bin'
+WAVEFORM_LIBRARY_INDEX_FILE: str = 'waveforms_index.json'
 
 STOREY_DISPS_FILE: str = STOREY_DISPS_FILE
 STOREY_REL_ACC_FILE: str = 'storey_acc.txt'
@@ -44,5 +50,14 @@ STOREY_DRIFTS_PROCESSED: Path = Path('./output/storey_drifts.csv')
 FLOOR_ACCELERATIONS: Path = Path('./output/storey_acc.csv')
 DCR_PROCESSED: Path = Path('./output/cloud_data.csv')
 
+# Design optimization
+OPTIMIZATION_OUTPUT_FOLDER: Path = Path('./output/optimization')
+OPTIMIZATION_HISTORY_FILE: str = 'history.csv'
+OPTIMIZATION_PARETO_FILE: str = 'pareto.csv'
+
+# Solver benchmarks
+BENCHMARK_REFERENCE_PATH: Path = Path('./input/benchmark_reference.json')
+BENCHMARK_OUTPUT_PATH: Path = Path('./output/benchmarks.json')
+
 # Logging not working yet
 LOGGING_CONF = './logging.conf'
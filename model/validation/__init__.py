@@ -1,4 +1,9 @@
 from .frame_validation import RegularFrameInput, SectionCollectionInput, BasicSectionInput
 from .materials_validation import TendonInput, TimberInput, SteelInput
 from .pushover_valdation import PushPullInput
-from .timehistory_validation import TimeHistoryCollectionInput, TimeHistoryInput
\ No newline at end of file
+from .timehistory_validation import TimeHistoryCollectionInput, TimeHistoryInput
+from .record_selection_validation import TargetSpectraInput, TargetStripeInput
+from .stochastic_validation import StochasticGroundMotionInput
+from .uncertainty_validation import MaterialUncertaintyInput, RandomVariableInput
+from .sweep_validation import DesignSweepInput, SweepParameterInput
+from .optimization_validation import DesignOptimizationInput, DesignBoundsInput
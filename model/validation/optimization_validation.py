@@ -0,0 +1,73 @@
+from typing import Optional
+from pydantic import BaseModel, validator
+
+from model.enums import ConnectionLimitStateType
+
+class DesignBoundsInput(BaseModel):
+    """
+    Validator data model for the range of a design variable, the same range
+    applies to every storey
+    """
+    lower : float
+    upper : float
+
+    class Config:
+        frozen = True
+
+    @validator('lower')
+    def validate_lower(cls, value):
+        if value < 0:
+            raise ValueError('lower bound of a design variable must be positive')
+        return value
+
+    @validator('upper')
+    def validate_upper(cls, value, values):
+        if values.get('lower') is not None and value < values['lower']:
+            raise ValueError('upper bound must not be lower than the lower bound')
+        return value
+
+
+class DesignOptimizationInput(BaseModel):
+    """
+    Validator data model for the performance based design optimization of
+    the beam post tensioning force and dissipators of each storey
+    """
+    tendons_pt : DesignBoundsInput              # beam post tensioning force [kN]
+    reinforcement_count : DesignBoundsInput     # beam dissipator bars
+    pt_cost : float                             # cost of 1 kN of post tensioning of a beam
+    reinforcement_cost : float                  # cost of 1 dissipator bar of a beam
+    drift_target : float                        # mean peak interstorey drift ratio [rad]
+    gap_dcr_target : Optional[float] = 1.      # mean peak gap opening over its limit state
+    limit_state : Optional[ConnectionLimitStateType] = ConnectionLimitStateType.DS1
+    n_screening : Optional[int] = 16            # designs of the screening stage
+    n_iterations : Optional[int] = 4            # refinement batches
+    batch_size : Optional[int] = 8              # designs of each refinement batch
+    n_candidates : Optional[int] = 2000         # candidates ranked on the surrogate at each batch
+    seed : Optional[int] = None
+
+    class Config:
+        frozen = True
+
+    @validator('pt_cost', 'reinforcement_cost')
+    def validate_cost(cls, value):
+        if value < 0:
+            raise ValueError('unit costs must be positive')
+        return value
+
+    @validator('drift_target', 'gap_dcr_target')
+    def validate_target(cls, value):
+        if value <= 0:
+            raise ValueError('performance targets must be strictly positive')
+        return value
+
+    @validator('n_screening', 'batch_size', 'n_candidates')
+    def validate_count(cls, value):
+        if value < 1:
+            raise ValueError('number of designs must be at least 1')
+        return value
+
+    @validator('n_iterations')
+    def validate_iterations(cls, value):
+        if value < 0:
+            raise ValueError('number of refinement batches must be positive')
+        return value
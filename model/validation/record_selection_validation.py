@@ -0,0 +1,53 @@
+from typing import List
+from pydantic import BaseModel, validator
+
+class TargetStripeInput(BaseModel):
+    """
+    Validator data model for the target spectrum of a stripe
+    """
+    name : str
+    Sa : List[float]
+    mafe : float
+
+    class Config:
+        frozen = True
+
+    @validator('Sa')
+    def validate_spectrum(cls, value):
+        if any(sa <= 0 for sa in value):
+            raise ValueError('target spectral accelerations must be strictly positive')
+        return value
+
+
+class TargetSpectraInput(BaseModel):
+    """
+    Validator data model for the target spectra of a multiple stripe analysis
+    """
+    periods : List[float]
+    stripes : List[TargetStripeInput]
+    n_records : int
+    modeling_dispersion : float
+
+    class Config:
+        frozen = True
+
+    @validator('periods')
+    def validate_periods(cls, value):
+        if any(period <= 0 for period in value):
+            raise ValueError('target periods must be strictly positive')
+        if any(this_period >= next_period for this_period, next_period in zip(value, value[1:])):
+            raise ValueError('target periods must be increasing')
+        return value
+
+    @validator('stripes')
+    def validate_stripes(cls, value, values):
+        for stripe in value:
+            if 'periods' in values and len(stripe.Sa) != len(values['periods']):
+                raise ValueError(f'stripe {stripe.name} must have one Sa value per period')
+        return value
+
+    @validator('n_records')
+    def validate_n_records(cls, value):
+        if value <= 0:
+            raise ValueError('number of records must be strictly positive')
+        return value
@@ -0,0 +1,40 @@
+from typing import List, Union
+from pydantic import BaseModel, validator
+
+class StochasticGroundMotionInput(BaseModel):
+    """
+    Validator data model for the stochastic ground motion generator. Model
+    parameters are one value for all the records or a list with one value
+    per record
+    """
+    time_step : float
+    duration : float
+    arias_intensity : Union[float, List[float]]
+    significant_duration : Union[float, List[float]]
+    mid_time : Union[float, List[float]]
+    mid_frequency : Union[float, List[float]]
+    frequency_slope : Union[float, List[float]]
+    filter_damping : Union[float, List[float]]
+
+    class Config:
+        frozen = True
+
+    @validator('time_step', 'duration')
+    def validate_time(cls, value):
+        if value <= 0:
+            raise ValueError('time step and duration must be strictly positive')
+        return value
+
+    @validator('arias_intensity', 'significant_duration', 'mid_time', 'mid_frequency')
+    def validate_positive(cls, value):
+        values = value if isinstance(value, list) else [value]
+        if any(item <= 0 for item in values):
+            raise ValueError('Arias intensity, durations and frequencies must be strictly positive')
+        return value
+
+    @validator('filter_damping')
+    def validate_damping(cls, value):
+        values = value if isinstance(value, list) else [value]
+        if any(not 0 < item < 1 for item in values):
+            raise ValueError('filter damping must be between 0 and 1')
+        return value
@@ -0,0 +1,47 @@
+from typing import List, Optional
+from pydantic import BaseModel, validator
+
+from model.enums import SweepParameter, SweepSections
+
+class SweepParameterInput(BaseModel):
+    """
+    Validator data model for a swept design parameter. Values replace the
+    base value of the selected sections, factors multiply it
+    """
+    parameter : SweepParameter
+    sections : Optional[SweepSections] = SweepSections.All
+    values : Optional[List[float]] = None
+    factors : Optional[List[float]] = None
+
+    class Config:
+        frozen = True
+
+    @validator('factors', always=True)
+    def validate_range(cls, value, values):
+        if (value is None) == (values.get('values') is None):
+            raise ValueError('either values or factors must be given for a swept parameter')
+        if value is not None and any(factor <= 0 for factor in value):
+            raise ValueError('factors must be strictly positive')
+        if not (value or values.get('values')):
+            raise ValueError('a swept parameter must have at least one value')
+        return value
+
+
+class DesignSweepInput(BaseModel):
+    """
+    Validator data model for a design variant sweep, variants are all the
+    combinations of the swept parameters
+    """
+    parameters : List[SweepParameterInput]
+
+    class Config:
+        frozen = True
+
+    @validator('parameters')
+    def validate_parameters(cls, value):
+        if not value:
+            raise ValueError('at least one parameter must be swept')
+        swept = [(parameter.parameter, parameter.sections) for parameter in value]
+        if len(set(swept)) != len(swept):
+            raise ValueError('each parameter can be swept only once for the same sections')
+        return value
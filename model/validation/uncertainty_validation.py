@@ -0,0 +1,70 @@
+from typing import List, Optional
+
+import numpy as np
+from pydantic import BaseModel, validator
+
+from model.enums import Distribution, UncertainParameter
+
+class RandomVariableInput(BaseModel):
+    """
+    Validator data model for an uncertain material or section parameter.
+    Samples are kept within the optional bounds by truncating the distribution
+    """
+    parameter : UncertainParameter
+    distribution : Distribution
+    mean : float
+    cov : float
+    lower : Optional[float] = None
+    upper : Optional[float] = None
+
+    class Config:
+        frozen = True
+
+    @validator('cov')
+    def validate_cov(cls, value):
+        if value < 0:
+            raise ValueError('coefficient of variation must be positive')
+        return value
+
+    @validator('mean')
+    def validate_mean(cls, value, values):
+        if values.get('distribution') == Distribution.Lognormal and value <= 0:
+            raise ValueError('mean of a lognormal variable must be strictly positive')
+        return value
+
+    @validator('upper')
+    def validate_bounds(cls, value, values):
+        if value is not None and values.get('lower') is not None and value <= values['lower']:
+            raise ValueError('upper bound must be greater than the lower bound')
+        return value
+
+
+class MaterialUncertaintyInput(BaseModel):
+    """
+    Validator data model for the material uncertainty of a Monte Carlo
+    analysis. The correlation matrix refers to the rank of the variables, in
+    the order they are given
+    """
+    variables : List[RandomVariableInput]
+    correlation : List[List[float]]
+
+    class Config:
+        frozen = True
+
+    @validator('variables')
+    def validate_variables(cls, value):
+        parameters = [variable.parameter for variable in value]
+        if len(set(parameters)) != len(parameters):
+            raise ValueError('each uncertain parameter can be given only once')
+        return value
+
+    @validator('correlation')
+    def validate_correlation(cls, value, values):
+        matrix = np.array(value, dtype=float)
+        if 'variables' in values and matrix.shape != (len(values['variables']),) * 2:
+            raise ValueError('correlation must be a square matrix with one row per variable')
+        if not np.allclose(matrix, matrix.T) or not np.allclose(np.diag(matrix), 1):
+            raise ValueError('correlation must be symmetric with unit diagonal')
+        if np.any(np.linalg.eigvalsh(matrix) <= 0):
+            raise ValueError('correlation must be positive definite')
+        return value
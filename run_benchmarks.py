@@ -0,0 +1,74 @@
+import argparse
+import sys
+
+from pathlib import Path
+
+import src.utils as util
+import model.paths as pth
+
+from src.solver_benchmarks import check_reference, compare_benchmarks, run_benchmarks
+
+
+def main_benchmarks(
+    frame_paths: dict[str, Path],
+    output_path: Path,
+    repeats: int,
+    baseline_path: Path = None,
+    update_reference: bool = False
+) -> bool:
+    input_data = dict(
+        frame_data=util.import_from_json(frame_paths['frame_path']),
+        steel_data=util.import_from_json(frame_paths['steel_path']),
+        tendon_data=util.import_from_json(frame_paths['tendon_path']),
+        timber_data=util.import_from_json(frame_paths['timber_path'])
+    )
+    benchmarks = run_benchmarks(input_data, repeats)
+
+    # Result values against the stored reference ones
+    reference = {case: case_data['values'] for case, case_data in benchmarks['cases'].items()}
+    if update_reference:
+        util.export_to_json(pth.BENCHMARK_REFERENCE_PATH, reference)
+        print(f'Reference values saved to {pth.BENCHMARK_REFERENCE_PATH}')
+    else:
+        reference = util.import_from_json(pth.BENCHMARK_REFERENCE_PATH)
+    failures = check_reference(benchmarks['cases'], reference)
+    benchmarks['reference_check'] = dict(passed=not failures, failures=failures)
+    for failure in failures:
+        print(f'Reference mismatch: {failure}')
+    print(f'Reference check {"passed" if not failures else "FAILED"}')
+
+    if baseline_path is not None:
+        comparison = compare_benchmarks(benchmarks, util.import_from_json(baseline_path))
+        benchmarks['comparison'] = comparison
+        print(f'{"case":<20}{"stage":<28}{"time [s]":>12}{"baseline [s]":>14}{"ratio":>8}{"points":>8}')
+        for row in comparison:
+            print(f'{row["case"]:<20}{row["stage"]:<28}{row["min_time"]:>12.5f}'
+                  f'{row["baseline_min_time"]:>14.5f}{row["time_ratio"]:>8.2f}{row["evaluated_points_ratio"]:>8.2f}')
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    util.export_to_json(output_path, benchmarks)
+    return not failures
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the moment-rotation and limit state solvers.")
+    parser.add_argument('-output', dest='output_path', default=pth.BENCHMARK_OUTPUT_PATH, help='Path to benchmark output json')
+    parser.add_argument('-repeats', dest='repeats', type=int, default=5, help='Timed runs of each stage')
+    parser.add_argument('-compare', dest='baseline_path', default=None, help='Path to the benchmark output of a baseline commit')
+    parser.add_argument('-update_reference', dest='update_reference', action='store_true', help='Store the result values as the new reference')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+
+    args = parse_args()
+
+    passed = main_benchmarks(
+        frame_paths=pth.FRAME_PATHS,
+        output_path=Path(args.output_path),
+        repeats=args.repeats,
+        baseline_path=Path(args.baseline_path) if args.baseline_path is not None else None,
+        update_reference=args.update_reference
+    )
+    if not passed:
+        sys.exit(1)
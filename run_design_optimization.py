@@ -0,0 +1,83 @@
+import argparse
+
+from functools import partial
+from pathlib import Path
+from typing import Iterable
+
+import src.utils as util
+import model.paths as pth
+import model.validation as mdl
+
+from src.design_optimization import DesignEvaluator, export_optimization_results, optimize_design
+from src.shared_waveforms import time_history_pool
+
+
+def main_design_optimization(
+    frame_paths: dict[str, Path],
+    optimization_path: Path,
+    th_options_path: Path,
+    waveform_folder: Path,
+    case_ids: Iterable[int] = None
+):
+    optimization = mdl.DesignOptimizationInput(**util.import_from_json(optimization_path))
+    input_data = dict(
+        frame_data=util.import_from_json(frame_paths['frame_path']),
+        steel_data=util.import_from_json(frame_paths['steel_path']),
+        tendon_data=util.import_from_json(frame_paths['tendon_path']),
+        timber_data=util.import_from_json(frame_paths['timber_path'])
+    )
+
+    pth.OPTIMIZATION_OUTPUT_FOLDER.mkdir(parents=True, exist_ok=True)
+    util.clean_directory(pth.OPTIMIZATION_OUTPUT_FOLDER)
+
+    # Each batch of designs runs in the same pool, on the reduced record set
+    with time_history_pool(th_options_path, waveform_folder, case_ids) as (pool, timehistory_analyses):
+        evaluator = DesignEvaluator(
+            input_data=input_data,
+            optimization=optimization,
+            time_histories=timehistory_analyses,
+            waveform_folder=waveform_folder,
+            output_folder=pth.OPTIMIZATION_OUTPUT_FOLDER,
+            map_function=partial(pool.map, chunksize=1)
+        )
+        history = optimize_design(evaluator)
+
+    pareto = export_optimization_results(history, pth.OPTIMIZATION_OUTPUT_FOLDER)
+    feasible = pareto[pareto['feasible']]
+    if feasible.empty:
+        print('No design meets the performance targets')
+    else:
+        print(f'Cheapest design meeting the targets:\n{feasible.iloc[0].to_string()}')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Search the cheapest beam post tensioning and dissipators meeting drift and gap opening targets.")
+    parser.add_argument('-frame', dest='frame_input_path', required=True, help='Path to base frame input file')
+    parser.add_argument('-timber', dest='timber_input_path', required=True, help='Path to timber input file')
+    parser.add_argument('-steel', dest='steel_input_path', required=True, help='Path to steel input file')
+    parser.add_argument('-tendon', dest='tendon_input_path', required=True, help='Path to tendon input file')
+    parser.add_argument('-optimization', dest='optimization_path', required=True, help='Path to optimization input file')
+    parser.add_argument('-th', dest='th_options', required=True, help='Path to time history input options')
+    parser.add_argument('-waveforms', dest='waveform_folder', required=True, help='Path to waveform input directory')
+    parser.add_argument('-cases', dest='case_ids', type=int, nargs='+', default=None, help='Ids of the time history cases of the reduced record set, defaults to all')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+
+    args = parse_args()
+
+    frame_paths = dict(
+        frame_path=Path(args.frame_input_path),
+        timber_path=Path(args.timber_input_path),
+        steel_path=Path(args.steel_input_path),
+        tendon_path=Path(args.tendon_input_path)
+    )
+
+    main_design_optimization(
+        frame_paths=frame_paths,
+        optimization_path=Path(args.optimization_path),
+        th_options_path=Path(args.th_options),
+        waveform_folder=Path(args.waveform_folder),
+        case_ids=args.case_ids
+    )
@@ -0,0 +1,177 @@
+import argparse
+
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+
+import src.scripts as scr
+import src.analysis_definition as analyze
+import src.hdf5_exporter as exhdf5
+import src.utils as util
+import model.validation as mdl
+
+from src.classes import PushPullAnalysis, TimeHistoryAnalysis
+from src.design_sweep import expand_variants, variant_frame_data
+from src.shared_waveforms import shared_waveform, time_history_pool
+
+
+SWEEP_OUTPUT_FOLDER: Path = Path('./output/sweep')
+SWEEP_HDF5_OUTPUT_PATH: Path = Path('./output/sweep.hdf5')
+
+
+# Picklable function, modal, pushpull or TH of a variant
+def run_variant_analysis(task):
+    """This function performs a single analysis of a design variant"""
+    input_data, links, variant_folder, waveform_folder, analysis = task
+    frame = scr.build_frame(**input_data)
+    scr.assign_frame_links(frame, links)
+    scr.build_opensees_model(frame)
+    structure_periods = analyze.run_modal_analysis(frame)
+
+    if isinstance(analysis, PushPullAnalysis):
+        analyze.run_pushpull_analysis(
+            frame,
+            analysis,
+            force_pattern=frame.inelastic_shape,
+            save_dir=variant_folder / 'pushpull'
+        )
+        return True
+
+    if isinstance(analysis, TimeHistoryAnalysis):
+        # returns if the analysis Failed
+        return analyze.run_time_history_analysis(
+            frame=frame,
+            time_history_analysis=analysis,
+            structure_periods=structure_periods,
+            waveform_folder=waveform_folder,
+            save_dir=variant_folder / f'TH_{analysis.id:04}',
+            ground_motion=shared_waveform(analysis.filename)
+        )
+
+    return structure_periods
+
+
+def main_design_sweep(
+    frame_paths: dict[str, Path],
+    sweep_path: Path,
+    pushover_path: Path = None,
+    th_options_path: Path = None,
+    waveform_folder: Path = None,
+    case_ids: Iterable[int] = None
+):
+    if th_options_path is not None and waveform_folder is None:
+        raise ValueError('Time history cases need the waveform input directory, pass -waveforms')
+
+    # Design variants, identical sections of different variants are solved once
+    sweep = mdl.DesignSweepInput(**util.import_from_json(sweep_path))
+    variants = expand_variants(sweep)
+    base_data = dict(
+        frame_data=util.import_from_json(frame_paths['frame_path']),
+        steel_data=util.import_from_json(frame_paths['steel_path']),
+        tendon_data=util.import_from_json(frame_paths['tendon_path']),
+        timber_data=util.import_from_json(frame_paths['timber_path'])
+    )
+    variant_inputs = [
+        dict(base_data, frame_data=variant_frame_data(base_data['frame_data'], sweep, variant))
+        for variant in variants
+    ]
+    frames = [scr.build_frame(**input_data) for input_data in variant_inputs]
+    scr.compute_moment_rotations(frames)
+    variant_links = [scr.frame_links(frame) for frame in frames]
+    limit_states = np.array([
+        [
+            [np.nan if value is None else value for value in section_limit_states.__dict__.values()]
+            for section_limit_states in frame_limit_states
+        ]
+        for frame_limit_states in scr.compute_frames_limit_states(frames)
+    ])
+    print(f'{len(variants)} design variants')
+
+    pushpull_analysis = None if pushover_path is None else scr.import_pushpull_analysis(pushover_path)
+
+    SWEEP_OUTPUT_FOLDER.mkdir(parents=True, exist_ok=True)
+    util.clean_directory(SWEEP_OUTPUT_FOLDER)
+    variant_folders = [
+        SWEEP_OUTPUT_FOLDER / f'V_{index:04}' for index in range(1, len(variants) + 1)
+    ]
+    for variant_folder in variant_folders:
+        variant_folder.mkdir()
+
+    # Selected time history cases, run on every variant
+    with time_history_pool(th_options_path, waveform_folder, case_ids) as (pool, timehistory_analyses):
+        # Analyses of all the variants in one pool, longest first, None stands
+        # for the modal analysis
+        analyses = timehistory_analyses + ([] if pushpull_analysis is None else [pushpull_analysis]) + [None]
+        tasks = [
+            (input_data, links, variant_folder, waveform_folder, analysis)
+            for analysis in analyses
+            for input_data, links, variant_folder in zip(variant_inputs, variant_links, variant_folders)
+        ]
+        results = pool.map(run_variant_analysis, tasks, chunksize=1)
+
+    th_status = {
+        f'{variant_folder.name}/TH_{analysis.id:04}': result
+        for (_, _, variant_folder, _, analysis), result in zip(tasks, results)
+        if isinstance(analysis, TimeHistoryAnalysis)
+    }
+    periods = [
+        result for (*_, analysis), result in zip(tasks, results) if analysis is None
+    ]
+    util.export_to_json(SWEEP_OUTPUT_FOLDER / 'status.json', th_status)
+
+    # Export all the variants
+    time_histories = []
+    if th_options_path is not None:
+        selected_ids = {time_history.id for time_history in timehistory_analyses}
+        time_histories = [
+            time_history for time_history in util.import_from_json(th_options_path)['NLTHCases']
+            if time_history['id'] in selected_ids
+        ]
+    exhdf5.export_SWEEP_to_HDF5(
+        sweep_folder=SWEEP_OUTPUT_FOLDER,
+        hdf5_save_path=SWEEP_HDF5_OUTPUT_PATH,
+        variants=variants,
+        periods=periods,
+        limit_states=limit_states,
+        time_histories=time_histories,
+        th_status=th_status,
+        n_storeys=base_data['frame_data']['n_storeys'],
+        storey_height=base_data['frame_data']['storey_height'],
+        waveform_folder=waveform_folder
+    )
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run modal, pushpull and time history analyses on the design variants of a sweep.")
+    parser.add_argument('-frame', dest='frame_input_path', required=True, help='Path to base frame input file')
+    parser.add_argument('-timber', dest='timber_input_path', required=True, help='Path to timber input file')
+    parser.add_argument('-steel', dest='steel_input_path', required=True, help='Path to steel input file')
+    parser.add_argument('-tendon', dest='tendon_input_path', required=True, help='Path to tendon input file')
+    parser.add_argument('-sweep', dest='sweep_path', required=True, help='Path to sweep input file')
+    parser.add_argument('-pushover', dest='pushover_path', default=None, help='Path to pushpull input options, runs a pushpull on every variant')
+    parser.add_argument('-th', dest='th_options', default=None, help='Path to time history input options, runs the cases on every variant')
+    parser.add_argument('-waveforms', dest='waveform_folder', default=None, help='Path to waveform input directory, needed with -th')
+    parser.add_argument('-cases', dest='case_ids', type=int, nargs='+', default=None, help='Ids of the time history cases to run, defaults to all')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+
+    args = parse_args()
+
+    frame_paths = dict(
+        frame_path=Path(args.frame_input_path),
+        timber_path=Path(args.timber_input_path),
+        steel_path=Path(args.steel_input_path),
+        tendon_path=Path(args.tendon_input_path)
+    )
+
+    main_design_sweep(
+        frame_paths=frame_paths,
+        sweep_path=Path(args.sweep_path),
+        pushover_path=Path(args.pushover_path) if args.pushover_path is not None else None,
+        th_options_path=Path(args.th_options) if args.th_options is not None else None,
+        waveform_folder=Path(args.waveform_folder) if args.waveform_folder is not None else None,
+        case_ids=args.case_ids
+    )
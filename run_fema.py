@@ -2,30 +2,133 @@ import argparse
 
 from pathlib import Path
 
+import numpy as np
+
 import src.utils as util
+import model.config as config
+import model.paths as pth
 
+from run_modal import main_modal
 from run_timehistory import main_time_history, CLOUD_HDF5_OUTPUT_PATH
-from src.fema_parser import export_fema_edps
+from src.fema_parser import compute_edps, export_fema_edps
+from src.intensity_measure_cache import default_intensity_measure_cache
+from src.msa_sampling import SAMPLING_EDPS, median_interval_width, shuffled_stripes, stripe_converged
+from src.record_selection import scale_to_stripes
+from src.results_store import ResultsStore
+
+
+def run_adaptive_stripes(
+    frame_paths: dict[str, Path],
+    th_options_path: Path,
+    waveform_folder: Path,
+    intenisty_dct: dict,
+    floor_height: float,
+    append: bool = False
+) -> dict:
+    """Runs the records of each stripe in random batches until the EDP medians are known"""
+    cfg: config.MNINTConfig
+    cfg = util.import_configuration(config.CONFIG_PATH, object_hook=config.MNINTConfig)
+    options = cfg.adaptive_msa_options
+
+    pending_ids = shuffled_stripes(intenisty_dct['map'], options.seed)
+    sampled_ids = [[] for _ in pending_ids]
+    converged = [False] * len(pending_ids)
+    completed_ids = set()
+    while not all(converged):
+        # next batch of every open stripe, cases shared by stripes run once
+        batch_ids = []
+        for stripe, th_ids in enumerate(pending_ids):
+            if not converged[stripe]:
+                sampled_ids[stripe] += th_ids[:options.batch_size]
+                batch_ids += th_ids[:options.batch_size]
+                del th_ids[:options.batch_size]
+        new_ids = [th_id for th_id in dict.fromkeys(batch_ids) if th_id not in completed_ids]
+        if new_ids:
+            main_time_history(
+                frame_paths,
+                th_options_path,
+                waveform_folder,
+                append=append or bool(completed_ids),
+                case_ids=new_ids
+            )
+            completed_ids.update(new_ids)
+
+        with ResultsStore(CLOUD_HDF5_OUTPUT_PATH) as store:
+            for stripe, th_ids in enumerate(sampled_ids):
+                if converged[stripe]:
+                    continue
+                successful_ids = [th_id for th_id in th_ids if store.case(th_id).success]
+                if successful_ids:
+                    edp_dct = compute_edps(store, successful_ids, floor_height)
+                    converged[stripe] = stripe_converged(
+                        edp_dct,
+                        options.confidence,
+                        options.target_ci_width,
+                        options.min_records
+                    )
+                    widths = [
+                        np.max(median_interval_width(edp_dct[key], options.confidence))
+                        for key in SAMPLING_EDPS
+                    ]
+                    print(f'Stripe {intenisty_dct["intensities"][stripe]}: {len(th_ids)} records, '
+                          f'median drift +-{widths[0]:.1%}, acceleration +-{widths[1]:.1%}')
+                converged[stripe] = converged[stripe] or not pending_ids[stripe]
+
+    # Cases that were not needed are left out of the map
+    sampled_dct = dict(intenisty_dct)
+    sampled_dct['map'] = sampled_ids
+    sampled_dct['cases'] = max(len(th_ids) for th_ids in sampled_ids)
+    return sampled_dct
+
 
 def main_msa(
     frame_paths: dict[str, Path],
     th_options_path: Path,
     intensities_msa_path: Path,
     waveform_folder: Path,
-    output_path: Path
+    output_path: Path,
+    append: bool = False,
+    autoscale: bool = False,
+    adaptive: bool = False
 ):
-    main_time_history(
-        frame_paths,
-        th_options_path,
-        waveform_folder
-    )
-
     # Import the intensities metadata
     intenisty_dct = util.import_from_json(intensities_msa_path)
 
+    # Records of each stripe scaled to its SaT1 at the model T1
+    if autoscale:
+        structure_periods = main_modal(frame_paths)
+        time_history_data, intenisty_dct = scale_to_stripes(
+            time_history_cases=util.import_from_json(th_options_path)['NLTHCases'],
+            intensities=intenisty_dct,
+            waveform_folder=waveform_folder,
+            first_period=structure_periods[0],
+            cache=default_intensity_measure_cache()
+        )
+        util.export_to_json(pth.MSA_TIME_HISTORY_PATH, time_history_data)
+        util.export_to_json(pth.MSA_INTENSITIES_PATH, intenisty_dct)
+        th_options_path = pth.MSA_TIME_HISTORY_PATH
+
     # floor height
     floor_height = util.import_from_json(frame_paths['frame_path'])['storey_height']
 
+    if adaptive:
+        intenisty_dct = run_adaptive_stripes(
+            frame_paths,
+            th_options_path,
+            waveform_folder,
+            intenisty_dct,
+            floor_height,
+            append=append
+        )
+        util.export_to_json(pth.MSA_INTENSITIES_PATH, intenisty_dct)
+    else:
+        main_time_history(
+            frame_paths,
+            th_options_path,
+            waveform_folder,
+            append=append
+        )
+
     export_fema_edps(CLOUD_HDF5_OUTPUT_PATH, intenisty_dct, output_path, floor_height)
         
 
@@ -39,6 +142,9 @@ def parse_args():
     parser.add_argument('-waveforms', dest='waveform_folder', required=True, help='Path to waveform input directory')
     parser.add_argument('-intensities', dest='intensities_msa', required=True, help='Path to the instensities data to perform multiple stripe')
     parser.add_argument('-output', dest='output_path', required=True, help='Path to output fema file')
+    parser.add_argument('-append', dest='append', action='store_true', help='Add the cases to the existing hdf5 file instead of rewriting it')
+    parser.add_argument('-adaptive', dest='adaptive', action='store_true', help='Run the records of each stripe in random batches until the EDP medians are known, see adaptive_msa_options in config.yaml')
+    parser.add_argument('-autoscale', dest='autoscale', action='store_true', help='Scale the records of each stripe to its SaT1 at the model first period')
     return parser.parse_args()
 
 
@@ -58,5 +164,8 @@ if __name__ == '__main__':
         th_options_path=Path(args.th_options),
         intensities_msa_path=Path(args.intensities_msa),
         waveform_folder=Path(args.waveform_folder),
-        output_path=Path(args.output_path)
+        output_path=Path(args.output_path),
+        append=args.append,
+        autoscale=args.autoscale,
+        adaptive=args.adaptive
     )
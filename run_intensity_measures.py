@@ -0,0 +1,57 @@
+import argparse
+
+from pathlib import Path
+
+from src.intensity_measure_cache import default_intensity_measure_cache
+from src.intensity_measures import intensity_measures, intensity_measures_table
+from src.waveform_library import build_waveform_library
+
+
+def main_intensity_measures(
+    waveform_folder: Path,
+    first_period: float,
+    output_path: Path,
+    time_step: float = None
+):
+    library = build_waveform_library(waveform_folder)
+    time_steps = [
+        time_step if time_step is not None else library.time_step(record_name)
+        for record_name in library.names
+    ]
+    missing_time_steps = [
+        record_name for record_name, dt in zip(library.names, time_steps) if dt is None
+    ]
+    if missing_time_steps:
+        raise ValueError(
+            f'Unknown time step for {len(missing_time_steps)} records, '
+            'pass -dt or build the library with run_waveform_library.py -th'
+        )
+
+    measures = intensity_measures(
+        time_series=[library[record_name] for record_name in library.names],
+        time_step=time_steps,
+        first_period=first_period,
+        cache=default_intensity_measure_cache()
+    )
+    intensity_measures_table(library.names, measures).to_csv(output_path)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compute the intensity measures of every record of a waveform folder.")
+    parser.add_argument('-waveforms', dest='waveform_folder', required=True, help='Path to waveform input directory')
+    parser.add_argument('-period', dest='first_period', type=float, required=True, help='First mode period T1 [s]')
+    parser.add_argument('-output', dest='output_path', required=True, help='Path to output csv table')
+    parser.add_argument('-dt', dest='time_step', type=float, default=None, help='Time step of the records, defaults to the one stored in the library')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+
+    args = parse_args()
+
+    main_intensity_measures(
+        waveform_folder=Path(args.waveform_folder),
+        first_period=args.first_period,
+        output_path=Path(args.output_path),
+        time_step=args.time_step
+    )
@@ -0,0 +1,66 @@
+import argparse
+
+from pathlib import Path
+import os
+
+import src.utils as util
+
+from src.legacy_migration import migrate_tree
+
+
+def main_migration(
+    tree_folder: Path,
+    hdf5_save_path: Path,
+    th_options_path: Path,
+    waveform_folder: Path,
+    frame_path: Path,
+    processes: int,
+    compression: str,
+    append: bool = False,
+    delete_text: bool = False
+):
+    frame_data = util.import_from_json(frame_path)
+    migrated_cases = migrate_tree(
+        tree_folder=tree_folder,
+        hdf5_save_path=hdf5_save_path,
+        time_history_input_data=th_options_path,
+        waveform_folder=waveform_folder,
+        n_storeys=frame_data['n_storeys'],
+        storey_height=frame_data['storey_height'],
+        processes=processes,
+        compression=compression,
+        append=append,
+        delete_text=delete_text
+    )
+    print(f'Migrated {len(migrated_cases)} cases from {tree_folder} to {hdf5_save_path}')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Convert a text output tree of time history or IDA analyses to hdf5.")
+    parser.add_argument('-tree', dest='tree_folder', required=True, help='Path to time history or IDA output folder')
+    parser.add_argument('-output', dest='output_path', required=True, help='Path to output hdf5 file')
+    parser.add_argument('-th', dest='th_options', required=True, help='Path to time history input options used for the analyses')
+    parser.add_argument('-waveforms', dest='waveform_folder', required=True, help='Path to waveform input directory')
+    parser.add_argument('-frame', dest='frame_input_path', required=True, help='Path to frame input file')
+    parser.add_argument('-processes', dest='processes', type=int, default=max(1, (os.cpu_count() or 1) - 1), help='Number of parsing processes')
+    parser.add_argument('-compression', dest='compression', default='gzip', help='HDF5 compression filter (gzip, lzf)')
+    parser.add_argument('-append', dest='append', action='store_true', help='Add the cases to the existing hdf5 file instead of rewriting it')
+    parser.add_argument('-delete', dest='delete_text', action='store_true', help='Delete the recorder text files of the migrated cases')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+
+    args = parse_args()
+
+    main_migration(
+        tree_folder=Path(args.tree_folder),
+        hdf5_save_path=Path(args.output_path),
+        th_options_path=Path(args.th_options),
+        waveform_folder=Path(args.waveform_folder),
+        frame_path=Path(args.frame_input_path),
+        processes=args.processes,
+        compression=args.compression,
+        append=args.append,
+        delete_text=args.delete_text
+    )
@@ -19,6 +19,7 @@ def main_modal(frame_paths: dict[str, Path]):
 
     structure_periods = analyze.run_modal_analysis(frame, True)
     print(structure_periods)
+    return structure_periods
 
 
 def parse_args():
@@ -0,0 +1,153 @@
+import argparse
+
+from pathlib import Path
+from functools import partial
+
+import h5py
+import numpy as np
+
+import src.scripts as scr
+import src.analysis_definition as analyze
+import src.hdf5_exporter as exhdf5
+import src.utils as util
+import model.paths as pth
+import model.validation as mdl
+
+from src.material_sampling import pair_realizations, realization_inputs, sample_realizations
+from src.shared_waveforms import export_time_history_status, shared_waveform, time_history_pool
+
+from run_modal import main_modal
+
+
+MONTE_CARLO_HDF5_OUTPUT_PATH: Path = Path('./output/monte_carlo.hdf5')
+
+
+# Picklable function TH
+def run_realization_time_history(input_data, waveform_folder, parameters, links, time_history) -> bool:
+    """This function performs a single TH on a material realization"""
+    frame = scr.build_frame(**realization_inputs(input_data, parameters))
+    scr.assign_frame_links(frame, links)
+    scr.build_opensees_model(frame)
+    structure_periods = analyze.run_modal_analysis(frame)
+    status = analyze.run_time_history_analysis(
+        frame=frame,
+        time_history_analysis=time_history,
+        structure_periods=structure_periods,
+        waveform_folder=waveform_folder,
+        ground_motion=shared_waveform(time_history.filename)
+    )
+    # returns if the analysis Failed
+    return status
+
+
+def main_monte_carlo(
+    frame_paths: dict[str, Path],
+    uncertainty_path: Path,
+    n_realizations: int,
+    th_options_path: Path,
+    waveform_folder: Path,
+    seed: int = None
+):
+    # Nominal frame, shared modal and limit state data
+    main_modal(frame_paths)
+
+    # Material realizations, links and limit states of all of them are
+    # computed together
+    uncertainty = mdl.MaterialUncertaintyInput(**util.import_from_json(uncertainty_path))
+    realizations = sample_realizations(uncertainty, n_realizations, seed=seed)
+    realization_parameters = [
+        {name: float(values[index]) for name, values in realizations.items()}
+        for index in range(n_realizations)
+    ]
+    input_data = dict(
+        frame_data=util.import_from_json(frame_paths['frame_path']),
+        steel_data=util.import_from_json(frame_paths['steel_path']),
+        tendon_data=util.import_from_json(frame_paths['tendon_path']),
+        timber_data=util.import_from_json(frame_paths['timber_path'])
+    )
+    frames = [
+        scr.build_frame(**realization_inputs(input_data, parameters))
+        for parameters in realization_parameters
+    ]
+    scr.compute_moment_rotations(frames)
+    realization_links = [scr.frame_links(frame) for frame in frames]
+    limit_states = np.array([
+        [
+            [np.nan if value is None else value for value in section_limit_states.__dict__.values()]
+            for section_limit_states in frame_limit_states
+        ]
+        for frame_limit_states in scr.compute_frames_limit_states(frames)
+    ])
+
+    # Each case runs on a realization
+    util.clean_directory(pth.OUTPUT_TH_DIR_PATH)
+    with time_history_pool(th_options_path, waveform_folder) as (pool, timehistory_analyses):
+        case_realizations = pair_realizations(
+            [time_history.id for time_history in timehistory_analyses],
+            n_realizations,
+            seed=seed
+        )
+        state = pool.starmap(
+            partial(run_realization_time_history, input_data, waveform_folder),
+            [
+                (
+                    realization_parameters[case_realizations[time_history.id]],
+                    realization_links[case_realizations[time_history.id]],
+                    time_history
+                )
+                for time_history in timehistory_analyses
+            ]
+        )
+        export_time_history_status(pth.OUTPUT_TH_DIR_PATH / 'status.json', timehistory_analyses, state)
+
+    # Export TH and realizations
+    exhdf5.export_CLOUD_to_HDF5(
+        time_history_folder=pth.OUTPUT_TH_DIR_PATH,
+        hdf5_save_path=MONTE_CARLO_HDF5_OUTPUT_PATH,
+        time_history_input_data=th_options_path,
+        waveform_folder=waveform_folder,
+        n_storeys=input_data['frame_data']['n_storeys'],
+        storey_height=input_data['frame_data']['storey_height']
+    )
+    with h5py.File(MONTE_CARLO_HDF5_OUTPUT_PATH, 'a') as hdf5_file:
+        exhdf5.hdf5_write_realizations(
+            hdf5_file,
+            realizations,
+            limit_states,
+            {f'TH_{case_id:04}': realization for case_id, realization in case_realizations.items()}
+        )
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run time history analyses on Monte Carlo material realizations of the frame.")
+    parser.add_argument('-frame', dest='frame_input_path', required=True, help='Path to frame input file')
+    parser.add_argument('-timber', dest='timber_input_path', required=True, help='Path to timber input file')
+    parser.add_argument('-steel', dest='steel_input_path', required=True, help='Path to steel input file')
+    parser.add_argument('-tendon', dest='tendon_input_path', required=True, help='Path to tendon input file')
+    parser.add_argument('-uncertainty', dest='uncertainty_path', required=True, help='Path to material uncertainty input file')
+    parser.add_argument('-n', dest='n_realizations', type=int, required=True, help='Number of material realizations')
+    parser.add_argument('-th', dest='th_options', required=True, help='Path to time history input options')
+    parser.add_argument('-waveforms', dest='waveform_folder', required=True, help='Path to waveform input directory')
+    parser.add_argument('-seed', dest='seed', type=int, default=None, help='Random generator seed')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+
+    args = parse_args()
+
+    frame_paths = dict(
+        frame_path=Path(args.frame_input_path),
+        timber_path=Path(args.timber_input_path),
+        steel_path=Path(args.steel_input_path),
+        tendon_path=Path(args.tendon_input_path)
+    )
+
+    main_monte_carlo(
+        frame_paths=frame_paths,
+        uncertainty_path=Path(args.uncertainty_path),
+        n_realizations=args.n_realizations,
+        th_options_path=Path(args.th_options),
+        waveform_folder=Path(args.waveform_folder),
+        seed=args.seed
+    )
@@ -0,0 +1,85 @@
+import argparse
+
+from pathlib import Path
+
+import src.utils as util
+import model.validation as mdl
+
+from src.intensity_measure_cache import default_intensity_measure_cache
+from src.record_selection import build_msa_inputs, spectrum_index
+from src.waveform_library import build_waveform_library
+
+
+def main_record_selection(
+    waveform_folder: Path,
+    targets_path: Path,
+    first_period: float,
+    th_output_path: Path,
+    intensities_output_path: Path,
+    time_step: float = None,
+    min_scale_factor: float = 0.25,
+    max_scale_factor: float = 4.0
+):
+    targets = mdl.TargetSpectraInput(**util.import_from_json(targets_path))
+
+    library = build_waveform_library(waveform_folder)
+    time_steps = [
+        time_step if time_step is not None else library.time_step(record_name)
+        for record_name in library.names
+    ]
+    missing_time_steps = [
+        record_name for record_name, dt in zip(library.names, time_steps) if dt is None
+    ]
+    if missing_time_steps:
+        raise ValueError(
+            f'Unknown time step for {len(missing_time_steps)} records, '
+            'pass -dt or build the library with run_waveform_library.py -th'
+        )
+
+    candidate_sa = spectrum_index(
+        library,
+        targets.periods,
+        time_steps,
+        cache=default_intensity_measure_cache()
+    )
+    time_history_data, intensities_data = build_msa_inputs(
+        targets=targets,
+        record_names=library.names,
+        time_steps=time_steps,
+        record_lengths=[library[record_name].size for record_name in library.names],
+        candidate_sa=candidate_sa,
+        first_period=first_period,
+        min_scale_factor=min_scale_factor,
+        max_scale_factor=max_scale_factor
+    )
+    util.export_to_json(th_output_path, time_history_data)
+    util.export_to_json(intensities_output_path, intensities_data)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Select and scale records matching the target spectra of a multiple stripe analysis.")
+    parser.add_argument('-waveforms', dest='waveform_folder', required=True, help='Path to waveform input directory')
+    parser.add_argument('-targets', dest='targets_path', required=True, help='Path to target spectra input file')
+    parser.add_argument('-period', dest='first_period', type=float, required=True, help='First mode period T1 [s]')
+    parser.add_argument('-th', dest='th_output_path', required=True, help='Path to output time history input options')
+    parser.add_argument('-intensities', dest='intensities_output_path', required=True, help='Path to output intensities data of the multiple stripe')
+    parser.add_argument('-dt', dest='time_step', type=float, default=None, help='Time step of the records, defaults to the one stored in the library')
+    parser.add_argument('-min_sf', dest='min_scale_factor', type=float, default=0.25, help='Lowest allowed scale factor')
+    parser.add_argument('-max_sf', dest='max_scale_factor', type=float, default=4.0, help='Highest allowed scale factor')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+
+    args = parse_args()
+
+    main_record_selection(
+        waveform_folder=Path(args.waveform_folder),
+        targets_path=Path(args.targets_path),
+        first_period=args.first_period,
+        th_output_path=Path(args.th_output_path),
+        intensities_output_path=Path(args.intensities_output_path),
+        time_step=args.time_step,
+        min_scale_factor=args.min_scale_factor,
+        max_scale_factor=args.max_scale_factor
+    )
@@ -0,0 +1,84 @@
+import argparse
+
+from pathlib import Path
+
+import src.utils as util
+import model.validation as mdl
+
+from src.stochastic_ground_motion import generate_ground_motions, write_ground_motions
+
+
+def main_stochastic_records(
+    parameters_path: Path,
+    n_records: int,
+    waveform_folder: Path,
+    prefix: str = 'synthetic',
+    seed: int = None,
+    text_files: bool = True,
+    th_output_path: Path = None
+):
+    parameters = mdl.StochasticGroundMotionInput(**util.import_from_json(parameters_path))
+
+    ground_motions = generate_ground_motions(
+        n_records=n_records,
+        time_step=parameters.time_step,
+        duration=parameters.duration,
+        arias_intensity=parameters.arias_intensity,
+        significant_duration=parameters.significant_duration,
+        mid_time=parameters.mid_time,
+        mid_frequency=parameters.mid_frequency,
+        frequency_slope=parameters.frequency_slope,
+        filter_damping=parameters.filter_damping,
+        seed=seed
+    )
+    filenames = write_ground_motions(
+        ground_motions,
+        waveform_folder,
+        parameters.time_step,
+        prefix=prefix,
+        text_files=text_files
+    )
+    print(f'{len(filenames)} records written to {waveform_folder}')
+
+    # Time history cases running every generated record
+    if th_output_path is not None:
+        util.export_to_json(th_output_path, {
+            'NLTHCases': [
+                {
+                    'id': case_id,
+                    'time_step_ratio': 1,
+                    'scale_factor': 1,
+                    'time_step': parameters.time_step,
+                    'duration': (ground_motions.shape[1] - 1) * parameters.time_step,
+                    'filename': filename
+                }
+                for case_id, filename in enumerate(filenames, start=1)
+            ]
+        })
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate synthetic records with a stochastic ground motion model.")
+    parser.add_argument('-params', dest='parameters_path', required=True, help='Path to stochastic model parameters input file')
+    parser.add_argument('-n', dest='n_records', type=int, required=True, help='Number of records')
+    parser.add_argument('-waveforms', dest='waveform_folder', required=True, help='Path to output waveform directory')
+    parser.add_argument('-prefix', dest='prefix', default='synthetic', help='Record file name prefix')
+    parser.add_argument('-seed', dest='seed', type=int, default=None, help='Random generator seed')
+    parser.add_argument('-binary', dest='binary', action='store_true', help='Store the records in the binary waveform library only, without text files')
+    parser.add_argument('-th', dest='th_output_path', default=None, help='Path to output time history input options running every record')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+
+    args = parse_args()
+
+    main_stochastic_records(
+        parameters_path=Path(args.parameters_path),
+        n_records=args.n_records,
+        waveform_folder=Path(args.waveform_folder),
+        prefix=args.prefix,
+        seed=args.seed,
+        text_files=not args.binary,
+        th_output_path=Path(args.th_output_path) if args.th_output_path is not None else None
+    )
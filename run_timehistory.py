@@ -1,9 +1,8 @@
 import argparse
 
 from pathlib import Path
-from multiprocessing import Pool
-import os
 from functools import partial
+from typing import Iterable
 
 import src.scripts as scr
 import src.analysis_definition as analyze
@@ -11,6 +10,8 @@ import src.hdf5_exporter as exhdf5
 import src.utils as util
 import model.paths as pth
 
+from src.shared_waveforms import export_time_history_status, shared_waveform, time_history_pool
+
 from run_modal import main_modal
 
 
@@ -28,7 +29,8 @@ def run_time_history(frame_paths, waveform_folder, time_history) -> bool:
         frame=frame,
         time_history_analysis=time_history,
         structure_periods=structure_periods,
-        waveform_folder=waveform_folder
+        waveform_folder=waveform_folder,
+        ground_motion=shared_waveform(time_history.filename)
     )
     # returns if the analysis Failed
     return status
@@ -37,33 +39,28 @@ def run_time_history(frame_paths, waveform_folder, time_history) -> bool:
 def main_time_history(
     frame_paths: dict[str, Path],
     th_options_path: Path,
-    waveform_folder: Path
+    waveform_folder: Path,
+    append: bool = False,
+    case_ids: Iterable[int] = None
 ):
     main_modal(frame_paths)
 
-    # Run time histories analyses
-    timehistory_analyses = scr.import_time_history_analysis(th_options_path)
+    # Run time histories analyses, optionally a subset of the cases
     util.clean_directory(pth.OUTPUT_TH_DIR_PATH)
-
-    num_cpus = os.cpu_count() or 1
-    with Pool(processes=max(1, num_cpus - 1)) as pool:
+    with time_history_pool(th_options_path, waveform_folder, case_ids) as (pool, timehistory_analyses):
         state = pool.map(partial(run_time_history, frame_paths, waveform_folder), timehistory_analyses)
-        # Status output
-        util.export_to_json(
-            filepath=pth.OUTPUT_TH_DIR_PATH / 'status.json',
-            data=dict(
-                zip(
-                    range(1, len(state) + 1),
-                    state
-                )
-            )
-        )
+        export_time_history_status(pth.OUTPUT_TH_DIR_PATH / 'status.json', timehistory_analyses, state)
 
     # Export TH
+    frame_data = util.import_from_json(frame_paths['frame_path'])
     exhdf5.export_CLOUD_to_HDF5(
         time_history_folder=pth.OUTPUT_TH_DIR_PATH,
         hdf5_save_path=CLOUD_HDF5_OUTPUT_PATH,
-        time_history_input_data=th_options_path
+        time_history_input_data=th_options_path,
+        waveform_folder=waveform_folder,
+        n_storeys=frame_data['n_storeys'],
+        storey_height=frame_data['storey_height'],
+        append=append
     )
 
 
@@ -75,6 +72,7 @@ def parse_args():
     parser.add_argument('-tendon', dest='tendon_input_path', required=True, help='Path to tendon input file')
     parser.add_argument('-th', dest='th_options', required=True, help='Path to time history input options')
     parser.add_argument('-waveforms', dest='waveform_folder', required=True, help='Path to waveform input directory')
+    parser.add_argument('-append', dest='append', action='store_true', help='Add the cases to the existing hdf5 file instead of rewriting it')
     return parser.parse_args()
 
 
@@ -92,5 +90,6 @@ if __name__ == '__main__':
     main_time_history(
         frame_paths=frame_paths,
         th_options_path=Path(args.th_options),
-        waveform_folder=Path(args.waveform_folder)
+        waveform_folder=Path(args.waveform_folder),
+        append=args.append
     )
@@ -0,0 +1,38 @@
+import argparse
+
+from pathlib import Path
+
+import src.scripts as scr
+
+from src.waveform_library import build_waveform_library
+
+
+def main_waveform_library(
+    waveform_folder: Path,
+    th_options_path: Path = None
+):
+    time_steps = None
+    if th_options_path is not None:
+        time_steps = {
+            time_history.filename: time_history.time_step
+            for time_history in scr.import_time_history_analysis(th_options_path)
+        }
+    library = build_waveform_library(waveform_folder, time_steps)
+    print(f'{len(library.names)} records in {library.data_path}')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build or update the binary library of a waveform folder.")
+    parser.add_argument('-waveforms', dest='waveform_folder', required=True, help='Path to waveform input directory')
+    parser.add_argument('-th', dest='th_options', default=None, help='Path to time history input options, used to store the record time steps')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+
+    args = parse_args()
+
+    main_waveform_library(
+        waveform_folder=Path(args.waveform_folder),
+        th_options_path=Path(args.th_options) if args.th_options is not None else None
+    )
@@ -6,9 +6,12 @@ from numpy.typing import ArrayLike
 from typing import List
 from pathlib import Path
 from .time_history import run_time_history_analysis
-from ..classes import TimeHistoryAnalysis, Frame
-from ..time_series_tools import spectral_acceleration
+from ..case_summary import gap_openings
+from ..classes import TimeHistoryAnalysis, Frame, LimitStateTable
+from ..intensity_measure_cache import default_intensity_measure_cache
+from ..scripts import frame_limit_state_table
 from ..utils import import_configuration
+from ..waveform_library import load_waveform
 
 import model.paths as pth
 
@@ -20,61 +23,48 @@ cfg = import_configuration(config.CONFIG_PATH, object_hook=config.MNINTConfig)
 
 
 def get_intensity_measure(time_history_analysis: TimeHistoryAnalysis,
-                          period: float) -> float:
+                          period: float,
+                          ground_motion: ArrayLike = None) -> float:
     """
     Returns the intensity measure for given period
     :param time_history_analysis: time history data
     :param period: first mode period
+    :param ground_motion: ground motion values, read from the waveform library if None
     :return:
     """
-    return spectral_acceleration(
-        np.loadtxt(pth.IDA_TIMESERIES_INPUT_FOLDER / time_history_analysis.filename),
+    if ground_motion is None:
+        ground_motion = load_waveform(pth.IDA_TIMESERIES_INPUT_FOLDER, time_history_analysis.filename)
+    return default_intensity_measure_cache().spectral_acceleration(
+        ground_motion,
         time_history_analysis.time_step,
         period
     )
 
 
-def format_ls(limit_states: ArrayLike) -> ArrayLike:
-    rows = limit_states.shape[0]
-    formatted_limit_states = np.zeros(2 * (rows - 1))
-    formatted_limit_states[:2] = limit_states[:2]
-    for i in range(2, rows):
-        formatted_limit_states[2*i-2] = limit_states[i]
-        formatted_limit_states[2*i-1] = limit_states[i]
-    return formatted_limit_states
-
-
-def compute_dcr(results_directory: Path) -> dict:
+def compute_dcr(results_directory: Path, limit_state_table: LimitStateTable) -> dict:
     """
     Computes the demand capacity ratios of the sections given the tim ehistory save path
 
     Args:
         results_directory (Path): path where to find time history output files
+        limit_state_table (LimitStateTable): limit states of the frame connections
 
     Returns:
         dict: demand capacity ratios for each DS
     """
-    damage_states = pd.read_csv('.\\output\\section_limit_states.csv')
-
-    recorded_gaps = np.loadtxt(results_directory / pth.GAP_OPENINGS_FILE)[:, 1:]
-    left_rotations = recorded_gaps[:, ::2]
-    right_rotations = recorded_gaps[:, 1::2]
-    gap_openings = abs(left_rotations - right_rotations)
-    max_gap_openings = np.amax(gap_openings, axis=0)
-
-    demand_capacity_ratios = dict()
-    for key in damage_states.keys():
-        limit_states = format_ls(damage_states[key].to_numpy())
-        demand_capacity_ratios[key] = max(
-            np.nan_to_num(max_gap_openings/limit_states)
-        )
-    
-    return demand_capacity_ratios
+    recorded_gaps = np.loadtxt(results_directory / pth.GAP_OPENINGS_FILE, ndmin=2)
+    max_gap_openings = np.max(gap_openings(recorded_gaps), axis=0)
+
+    return dict(zip(
+        limit_state_table.damage_states,
+        limit_state_table.max_demand_capacity_ratios(max_gap_openings).tolist()
+    ))
 
 
 def run_incremental_dynamic_analysis(frame: Frame,
                                      time_history_analysis: TimeHistoryAnalysis,
-                                     structure_periods: List[float]) -> None:
+                                     structure_periods: List[float],
+                                     ground_motion: ArrayLike = None) -> None:
     run_number = 1
     reached_dcr = False
     continue_iterating = True
@@ -82,8 +72,9 @@ def run_incremental_dynamic_analysis(frame: Frame,
     id_ground_motion = time_history_analysis.id
 
     ida_results = pd.DataFrame(columns=['scale_factor', 'int_measures', 'DS1', 'DS2', 'DST'])
+    limit_state_table = frame_limit_state_table(frame)
 
-    initial_int_measure = get_intensity_measure(time_history_analysis, structure_periods[0])
+    initial_int_measure = get_intensity_measure(time_history_analysis, structure_periods[0], ground_motion)
     current_scale_factor = cfg.ida_options.initial_int_measure/initial_int_measure
 
     step = current_scale_factor * cfg.ida_options.initial_step
@@ -103,8 +94,10 @@ def run_incremental_dynamic_analysis(frame: Frame,
             frame, 
             time_history_analysis, 
             structure_periods, 
+            waveform_folder=pth.IDA_TIMESERIES_INPUT_FOLDER,
             save_dir=ida_directory,
-            ida=True
+            is_ida=True,
+            ground_motion=ground_motion
         )
 
         run_number += 1
@@ -128,7 +121,7 @@ def run_incremental_dynamic_analysis(frame: Frame,
         
         current_scale_factor = current_scale_factor + step
 
-        dem_cap_ratios = list(compute_dcr(ida_directory).values())
+        dem_cap_ratios = list(compute_dcr(ida_directory, limit_state_table).values())
         data_row += dem_cap_ratios
         ida_results.loc[len(ida_results)] = data_row
 
@@ -1,6 +1,8 @@
+from pathlib import Path
 from typing import List
 import openseespy.opensees as ops
 import time
+import os
 
 import model.paths as pth
 
@@ -11,7 +13,8 @@ from model.enums.frame_enums import BeamSide
 
 def run_pushpull_analysis(frame: Frame,
                           pushpull_analysis: PushPullAnalysis,
-                          force_pattern: List[float]) -> None:
+                          force_pattern: List[float],
+                          save_dir: Path = None) -> None:
     """
     Performs a push-pull analysis on the opensees model
 
@@ -19,9 +22,16 @@ def run_pushpull_analysis(frame: Frame,
         frame (Frame): frame object
         pushpull_analysis (PushPullAnalysis): pushpull analysis
         force_pattern (List[float]): force pushover pattern
+        save_dir (Path, optional): directory where to save the analysis output.
+            Defaults to the one specified in model.paths.
     """
+    pushpull_results_directory = pth.OUTPUT_PUSHPULL_DIR_PATH if save_dir is None else save_dir
+
     # prepares the output folder
-    clean_directory(dir_path=pth.OUTPUT_PUSHPULL_DIR_PATH)
+    if os.path.isdir(pushpull_results_directory):
+        clean_directory(dir_path=pushpull_results_directory)
+    else:
+        os.makedirs(pushpull_results_directory)
 
     base_nodes_ids = [
         frame.node_grid(vertical, 0) for vertical in range(frame.n_spans + 1)
@@ -49,7 +59,7 @@ def run_pushpull_analysis(frame: Frame,
     ops.recorder(
         'Node', 
         '-file', 
-        (pth.OUTPUT_PUSHPULL_DIR_PATH / pth.BASE_REACTIONS_FILE).__str__(),
+        (pushpull_results_directory / pth.BASE_REACTIONS_FILE).__str__(),
         '-time', 
         '-node', 
         *base_nodes_ids, 
@@ -61,7 +71,7 @@ def run_pushpull_analysis(frame: Frame,
     ops.recorder(
         'Node', 
         '-file', 
-        (pth.OUTPUT_PUSHPULL_DIR_PATH / pth.STOREY_DISPS_FILE).__str__(),
+        (pushpull_results_directory / pth.STOREY_DISPS_FILE).__str__(),
         '-time', 
         '-node', 
         *storey_nodes_ids, 
@@ -73,7 +83,7 @@ def run_pushpull_analysis(frame: Frame,
     ops.recorder(
         'Node',
         '-file',
-        (pth.OUTPUT_PUSHPULL_DIR_PATH / pth.GAP_OPENINGS_FILE).__str__(),
+        (pushpull_results_directory / pth.GAP_OPENINGS_FILE).__str__(),
         '-time',
         '-node',
         *gap_nodes_ids,
@@ -1,5 +1,6 @@
 from pathlib import Path
 from typing import List
+import numpy.typing as npt
 import openseespy.opensees as ops
 import time
 import math
@@ -17,7 +18,8 @@ def run_time_history_analysis(frame: Frame,
                               structure_periods: List[float],
                               waveform_folder: Path,
                               save_dir: Path = None,
-                              is_ida: bool = False) -> bool:
+                              is_ida: bool = False,
+                              ground_motion: npt.ArrayLike = None) -> bool:
     """
     Runs a time history analysis
 
@@ -25,9 +27,13 @@ def run_time_history_analysis(frame: Frame,
         frame (Frame): frame object
         time_history_analysis (TimeHistoryAnalysis): time history options.
         structure_periods (List[float]) List of modal periods
+        waveform_folder (Path): folder holding the waveform file
         save_dir (Path, optional): directory where to save the analysis output.
             Defaults to the one specified in model.paths.
         ida (bool, optional): if the TH is part of an IDA sequence. Defaults False.
+        ground_motion (npt.ArrayLike, optional): unscaled ground motion values,
+            passed to OpenSees instead of reading the waveform file, required
+            for trimmed records. Defaults to None.
 
     Returns:
         bool: success of analysis
@@ -133,16 +139,28 @@ def run_time_history_analysis(frame: Frame,
 
     # time series definition
     dt = time_history_analysis.time_step
-    ops.timeSeries(
-        'Path', 
-        time_history_analysis.id + 1, 
-        '-dt', 
-        dt, 
-        '-filePath',
-        (waveform_folder / time_history_analysis.filename).__str__(),
-        '-factor', 
-        time_history_analysis.scale_factor
-    )
+    if ground_motion is None:
+        ops.timeSeries(
+            'Path', 
+            time_history_analysis.id + 1, 
+            '-dt', 
+            dt, 
+            '-filePath',
+            (waveform_folder / time_history_analysis.filename).__str__(),
+            '-factor', 
+            time_history_analysis.scale_factor
+        )
+    else:
+        ops.timeSeries(
+            'Path',
+            time_history_analysis.id + 1,
+            '-dt',
+            dt,
+            '-values',
+            *map(float, ground_motion),
+            '-factor',
+            time_history_analysis.scale_factor
+        )
     # performance
     start_t = time.perf_counter()
 
@@ -165,11 +183,14 @@ def run_time_history_analysis(frame: Frame,
     final_time = ops.getTime() + TH_steps * dt
 
     dt_analyze = dt * time_history_analysis.time_step_ratio
+    # committed steps, one recorder row each
+    recorded_steps = 0
 
     while success and time_analysis <= final_time:
 
         analysis_status = ops.analyze(1, dt_analyze)
         success = (analysis_status == 0)
+        recorded_steps += success
         time_analysis = ops.getTime()
 
     end_t = time.perf_counter()
@@ -194,7 +215,11 @@ def run_time_history_analysis(frame: Frame,
     th_stats = {
         'time': total_time,
         'success': success,
-        'time_series_name': time_history_analysis.filename
+        'time_series_name': time_history_analysis.filename,
+        'scale_factor': time_history_analysis.scale_factor,
+        'steps': recorded_steps,
+        'time_offset': time_history_analysis.time_offset,
+        'duration': time_history_analysis.duration
     }
     export_to_json(
         filepath=th_results_directory / pth.TH_STATS_FILE,
@@ -0,0 +1,155 @@
+from typing import List
+
+import numpy as np
+import numpy.typing as npt
+
+
+def connection_names(n_storeys: int) -> List[str]:
+    """
+    Names of the connections recorded in the gap openings file
+
+    Args:
+        n_storeys (int): number of storeys of the frame
+
+    Returns:
+        List[str]: connection names (ext_col, int_col, ext_beam_1, int_beam_1, ...)
+    """
+    names = ['ext_col', 'int_col']
+    for storey in range(1, n_storeys + 1):
+        names += [f'ext_beam_{storey}', f'int_beam_{storey}']
+    return names
+
+
+def interstorey_drifts(displacements: npt.NDArray, storey_height: float) -> npt.NDArray:
+    """
+    Interstorey drift ratios history from the recorded storey displacements
+
+    Args:
+        displacements (npt.NDArray): recorded displacements, first column is time
+        storey_height (float): interstorey height [m]
+
+    Returns:
+        npt.NDArray: absolute drift ratios (steps x storeys)
+    """
+    return np.abs(np.diff(displacements[:, 1:], axis=1)) / storey_height
+
+
+def absolute_accelerations(accelerations: npt.NDArray,
+                           time_series: npt.NDArray,
+                           time_step: float,
+                           scale_factor: float = 1.,
+                           time_offset: float = 0.) -> npt.NDArray:
+    """
+    Absolute floor accelerations history from the recorded relative ones.
+    The ground motion is sampled at the recorder times
+
+    Args:
+        accelerations (npt.NDArray): recorded relative accelerations, first column is time
+        time_series (npt.NDArray): unscaled ground motion [m/s2]
+        time_step (float): time step of the ground motion
+        scale_factor (float, optional): ground motion scale factor. Defaults to 1.
+        time_offset (float, optional): start time of the applied record within
+            the ground motion. Defaults to 0.
+
+    Returns:
+        npt.NDArray: absolute accelerations (steps x floors) [m/s2]
+    """
+    record_times = np.arange(time_series.shape[0]) * time_step
+    ground_acceleration = np.interp(
+        accelerations[:, 0] + time_offset,
+        record_times,
+        time_series * scale_factor,
+        left=0.,
+        right=0.
+    )
+    return accelerations[:, 1:] + ground_acceleration[:, np.newaxis]
+
+
+def gap_openings(recorded_gaps: npt.NDArray) -> npt.NDArray:
+    """
+    Gap openings history from the recorded node rotations
+
+    Args:
+        recorded_gaps (npt.NDArray): recorded rotations, first column is time
+
+    Returns:
+        npt.NDArray: gap openings (steps x connections) [rad]
+    """
+    rotations = recorded_gaps[:, 1:]
+    return np.abs(rotations[:, ::2] - rotations[:, 1::2])
+
+
+def summarize_case(n_storeys: int,
+                   storey_height: float,
+                   displacements: npt.NDArray = None,
+                   accelerations: npt.NDArray = None,
+                   recorded_gaps: npt.NDArray = None,
+                   base_reactions: npt.NDArray = None,
+                   time_series: npt.NDArray = None,
+                   time_step: float = None,
+                   scale_factor: float = 1.,
+                   time_offset: float = 0.) -> dict[str, npt.NDArray]:
+    """
+    Computes the peak response quantities of a single analysis case.
+    Missing or empty recorder data yields NaN values
+
+    Args:
+        n_storeys (int): number of storeys of the frame
+        storey_height (float): interstorey height [m]
+        displacements (npt.NDArray, optional): recorded storey displacements
+        accelerations (npt.NDArray, optional): recorded relative floor accelerations
+        recorded_gaps (npt.NDArray, optional): recorded gap node rotations
+        base_reactions (npt.NDArray, optional): recorded base reactions
+        time_series (npt.NDArray, optional): unscaled ground motion
+        time_step (float, optional): time step of the ground motion
+        scale_factor (float, optional): ground motion scale factor. Defaults to 1.
+        time_offset (float, optional): start time of the applied record within
+            the ground motion. Defaults to 0.
+
+    Returns:
+        dict[str, npt.NDArray]: summary row keyed as the summary datasets
+    """
+    n_connections = 2 * (n_storeys + 1)
+    summary = {
+        'peak_drift': np.full(n_storeys, np.nan),
+        'residual_drift': np.full(n_storeys, np.nan),
+        'peak_acceleration': np.full(n_storeys + 1, np.nan),
+        'peak_gap_opening': np.full(n_connections, np.nan),
+        'peak_gap_opening_time': np.full(n_connections, np.nan),
+        'peak_base_shear': np.nan
+    }
+
+    if _has_rows(displacements):
+        drifts = interstorey_drifts(displacements, storey_height)
+        summary['peak_drift'] = np.max(drifts, axis=0)
+        summary['residual_drift'] = drifts[-1]
+
+    if _has_rows(accelerations) and time_series is not None:
+        abs_accs = absolute_accelerations(
+            accelerations,
+            time_series,
+            time_step,
+            scale_factor=scale_factor,
+            time_offset=time_offset
+        )
+        summary['peak_acceleration'] = np.max(np.abs(abs_accs), axis=0)
+
+    if _has_rows(recorded_gaps):
+        gaps = gap_openings(recorded_gaps)
+        peak_steps = np.argmax(gaps, axis=0)
+        summary['peak_gap_opening'] = gaps[peak_steps, np.arange(gaps.shape[1])]
+        summary['peak_gap_opening_time'] = recorded_gaps[peak_steps, 0]
+
+    if _has_rows(base_reactions):
+        base_shear = np.sum(base_reactions[:, 1:], axis=1)
+        summary['peak_base_shear'] = np.max(np.abs(base_shear))
+
+    return summary
+
+
+def _has_rows(data: npt.NDArray) -> bool:
+    """
+    Checks that recorder data holds at least one complete row
+    """
+    return (data is not None and data.ndim == 2
+            and data.shape[0] > 0 and data.shape[1] > 1)
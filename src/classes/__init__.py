@@ -3,3 +3,5 @@ from .material_classes import Steel, Timber, Tendon
 from .links import GMSteelLink, KineticLink, MultilinearElasticLink
 from .frame import Frame
 from .section import Section, SectionFactory, SectionLimitStates
+from .compiled_section import CompiledSection, compile_section
+from .limit_state_table import LimitStateTable
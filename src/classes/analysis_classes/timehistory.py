@@ -12,6 +12,8 @@ class TimeHistoryAnalysis:
     time_step: float
     duration: float
     filename: str
+    # start time of the applied record within the waveform file, if trimmed
+    time_offset: float = 0.
 
     @property
     def steps(self) -> int:
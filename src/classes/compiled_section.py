@@ -0,0 +1,112 @@
+from dataclasses import dataclass
+from typing import Union
+
+import numpy as np
+import numpy.typing as npt
+
+from .frame import Frame
+from .section import Section
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledSection:
+    """
+    Dataclass containing the constants of a section within its frame, derived
+    once so that strains, forces and moments are plain arithmetic. Names
+    follow the Section properties they replace
+    """
+    is_beam: bool
+    has_tendon: bool
+    b: float
+    h: float
+    axial_load: float
+    tendons_pt: float
+    top_reinforcement_depth: float
+    bottom_reinforcement_depth: float
+    bar_length: float
+    steel_area: float
+    steel_E: float
+    steel_fy: float
+    steel_epsilon_y: float
+    steel_epsilon_u: float
+    steel_hardening_ratio: float
+    connection_stiffness: float
+    timber_limit_strain: float
+    cantilever_length: float        # L_cant of the timber strain
+    post_tensioning_area: float
+    tendon_stiffness: float         # E * A of the post tensioning
+    tendon_initial_strain: float
+    tendon_epsilon_y: float
+    tendon_unbonded_length: float
+    tendon_strain_ratio: float      # 2 * n_spans / tendon_unbonded_length
+
+    def steel_stress(self, strain: npt.ArrayLike) -> npt.ArrayLike:
+        """
+        Computes the steel stress given the strain, as Steel.stress_from_strain
+
+        Args:
+            strain (npt.ArrayLike): strain values
+
+        Returns:
+            npt.ArrayLike: stress values
+        """
+        strain = np.asarray(strain, dtype=float)
+        return np.where(
+            np.abs(strain) <= self.steel_epsilon_y,
+            strain * self.steel_E,
+            np.sign(strain) * self.steel_fy * (
+                1 + self.steel_hardening_ratio * (strain / self.steel_epsilon_y - 1)
+            )
+        )[()]
+
+
+def compile_section(section: Union[Section, CompiledSection],
+                    frame: Frame) -> CompiledSection:
+    """
+    Derives the constants of a section within its frame. Inputs that are not
+    a Section (a CompiledSection or SectionArrays) are returned unchanged
+
+    Args:
+        section (Union[Section, CompiledSection]): section
+        frame (Frame): frame containing the section
+
+    Returns:
+        CompiledSection: compiled section
+    """
+    if not isinstance(section, Section):
+        return section
+
+    if section.is_beam:
+        cantilever_length = .5 * (frame.span_length - frame.int_column_section.h)
+
+    else:
+        cantilever_length = .5 * (frame.storey_height - frame.beam_sections[0].h)
+
+    has_tendon = section.tendon is not None
+    post_tensioning_area = section.post_tensioning_area if has_tendon else 0.
+    return CompiledSection(
+        is_beam=section.is_beam,
+        has_tendon=has_tendon,
+        b=section.b,
+        h=section.h,
+        axial_load=section.axial_load,
+        tendons_pt=section.tendons_pt,
+        top_reinforcement_depth=section.top_reinforcement_depth,
+        bottom_reinforcement_depth=section.bottom_reinforcement_depth,
+        bar_length=section.bar_length,
+        steel_area=section.steel_area,
+        steel_E=section.steel.E,
+        steel_fy=section.steel.fy,
+        steel_epsilon_y=section.steel.epsilon_y,
+        steel_epsilon_u=section.steel.epsilon_u,
+        steel_hardening_ratio=section.steel.hardening_ratio,
+        connection_stiffness=section.connection_stiffness,
+        timber_limit_strain=section.timber.epsilon_lim(section.connection_stiffness_ratio),
+        cantilever_length=cantilever_length,
+        post_tensioning_area=post_tensioning_area,
+        tendon_stiffness=section.tendon.E * post_tensioning_area if has_tendon else 0.,
+        tendon_initial_strain=section.tendon_initial_strain if has_tendon else 0.,
+        tendon_epsilon_y=section.tendon.epsilon_y if has_tendon else float('nan'),
+        tendon_unbonded_length=frame.tendon_unbonded_length,
+        tendon_strain_ratio=2 * frame.n_spans / frame.tendon_unbonded_length
+    )
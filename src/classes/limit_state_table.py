@@ -0,0 +1,94 @@
+from dataclasses import dataclass
+from typing import List, Tuple, Union
+
+import numpy as np
+import numpy.typing as npt
+
+from model.enums import ConnectionLimitStateType
+from .section import SectionLimitStates
+
+
+@dataclass(frozen=True)
+class LimitStateTable:
+    """
+    Dataclass containing the gap opening limit states of every connection of
+    a frame, one row per damage state. Connections follow the gap openings
+    recorder: ext_col, int_col, ext_beam_1, int_beam_1, ...
+    """
+    damage_states: Tuple[str, ...]
+    connections: Tuple[str, ...]
+    capacities: npt.NDArray     # damage states x connections [rad], nan where the section has no such limit state
+
+    @classmethod
+    def from_section_limit_states(cls, section_limit_states: List[SectionLimitStates]) -> 'LimitStateTable':
+        """
+        Builds the table from the limit states of the sections
+
+        Args:
+            section_limit_states (List[SectionLimitStates]): limit states of the
+                external column, internal column and beams
+
+        Returns:
+            LimitStateTable: limit state table
+        """
+        damage_states = tuple(SectionLimitStates.__annotations__.keys())
+        section_capacities = np.array([
+            [np.nan if getattr(limit_states, damage_state) is None else getattr(limit_states, damage_state)
+             for limit_states in section_limit_states]
+            for damage_state in damage_states
+        ], dtype=float)
+        n_storeys = len(section_limit_states) - 2
+        connections = ['ext_col', 'int_col']
+        for storey in range(1, n_storeys + 1):
+            connections += [f'ext_beam_{storey}', f'int_beam_{storey}']
+        # the two connections of each beam share its section
+        capacities = np.concatenate(
+            [section_capacities[:, :2], np.repeat(section_capacities[:, 2:], 2, axis=1)],
+            axis=1
+        )
+        capacities.flags.writeable = False
+        return cls(damage_states=damage_states, connections=tuple(connections), capacities=capacities)
+
+    def capacity(self, damage_state: Union[str, ConnectionLimitStateType]) -> npt.NDArray:
+        """
+        Limit gap openings of every connection at a damage state
+
+        Args:
+            damage_state (Union[str, ConnectionLimitStateType]): damage state
+
+        Returns:
+            npt.NDArray: limit gap openings
+        """
+        return self.capacities[self.damage_states.index(ConnectionLimitStateType(damage_state).value)]
+
+    def demand_capacity_ratios(self, gap_openings: npt.ArrayLike) -> npt.NDArray:
+        """
+        Demand capacity ratios of the gap openings at every damage state,
+        zero where the connection has no such limit state
+
+        Args:
+            gap_openings (npt.ArrayLike): gap openings, connections on the last
+                axis, e.g. (cases x connections)
+
+        Returns:
+            npt.NDArray: ratios (damage states x gap openings shape)
+        """
+        gap_openings = np.asarray(gap_openings, dtype=float)
+        capacities = self.capacities.reshape(
+            (len(self.damage_states),) + (1,) * (gap_openings.ndim - 1) + (len(self.connections),)
+        )
+        with np.errstate(invalid='ignore'):
+            return np.where(np.isnan(capacities), 0., gap_openings / capacities)
+
+    def max_demand_capacity_ratios(self, gap_openings: npt.ArrayLike) -> npt.NDArray:
+        """
+        Largest demand capacity ratio over the connections at every damage state
+
+        Args:
+            gap_openings (npt.ArrayLike): gap openings, connections on the last
+                axis, e.g. (cases x connections)
+
+        Returns:
+            npt.NDArray: ratios (damage states x cases)
+        """
+        return np.max(self.demand_capacity_ratios(gap_openings), axis=-1)
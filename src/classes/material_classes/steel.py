@@ -1,5 +1,8 @@
 from dataclasses import dataclass
 
+import numpy as np
+import numpy.typing as npt
+
 
 @dataclass(frozen=True)
 class Steel:
@@ -21,21 +24,19 @@ class Steel:
         return (((self.fu - self.fy) * self.epsilon_y)
                 / ((self.epsilon_u - self.epsilon_y) * self.fy))
     
-    def stress_from_strain(self, strain : float) -> float:
+    def stress_from_strain(self, strain : npt.ArrayLike) -> npt.ArrayLike:
         """
-        Computes the stress given the strain
+        Computes the stress given the strain, element wise for arrays
 
         Args:
-            strain (float): strain value
+            strain (npt.ArrayLike): strain values
 
         Returns:
-            float: stress value
+            npt.ArrayLike: stress values
         """
-        if abs(strain) <= self.epsilon_y:
-            return strain * self.E
-        
-        else:
-            stress_sign = abs(strain)/strain
-            return stress_sign * self.fy * (1 + self.hardening_ratio * (strain / self.epsilon_y - 1))
-    
-    
\ No newline at end of file
+        strain = np.asarray(strain, dtype=float)
+        return np.where(
+            np.abs(strain) <= self.epsilon_y,
+            strain * self.E,
+            np.sign(strain) * self.fy * (1 + self.hardening_ratio * (strain / self.epsilon_y - 1))
+        )[()]
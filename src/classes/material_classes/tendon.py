@@ -1,5 +1,8 @@
 from dataclasses import dataclass
 
+import numpy as np
+import numpy.typing as npt
+
 
 @dataclass(frozen=True)
 class Tendon:
@@ -15,4 +18,17 @@ class Tendon:
 
     @property
     def epsilon_y(self) -> float:
-        return self.fy/self.E
\ No newline at end of file
+        return self.fy/self.E
+
+    def stress_from_strain(self, strain : npt.ArrayLike) -> npt.ArrayLike:
+        """
+        Computes the stress given the strain, linear elastic, element wise
+        for arrays
+
+        Args:
+            strain (npt.ArrayLike): strain values
+
+        Returns:
+            npt.ArrayLike: stress values
+        """
+        return (np.asarray(strain, dtype=float) * self.E)[()]
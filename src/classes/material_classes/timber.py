@@ -1,5 +1,8 @@
 from dataclasses import dataclass
 
+import numpy as np
+import numpy.typing as npt
+
 
 @dataclass(frozen=True)
 class Timber:
@@ -16,15 +19,16 @@ class Timber:
     def epsilon_y(self):
         return self.fc/self.E
     
-    def epsilon_lim(self, k_con : float) -> float:
+    def epsilon_lim(self, k_con : npt.ArrayLike) -> npt.ArrayLike:
         """
         Deformation limit for timber given the stiffnes constant of the connection
 
         Args:
-            k_con (float): stiffness constant of the connection (below 1)
+            k_con (npt.ArrayLike): stiffness constant of the connection (below 1)
 
         Returns:
-            float: deformation limit
+            npt.ArrayLike: deformation limit
         """
-        assert 0 < k_con <= 1, "k_con must be between 0 and 1"
-        return self.fc / (self.E * k_con)
+        k_con = np.asarray(k_con, dtype=float)
+        assert np.all((0 < k_con) & (k_con <= 1)), "k_con must be between 0 and 1"
+        return (self.fc / (self.E * k_con))[()]
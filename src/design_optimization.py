@@ -0,0 +1,462 @@
+import copy
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+from scipy.interpolate import RBFInterpolator
+
+import model.paths as pth
+from model.validation import DesignOptimizationInput
+
+from .analysis_definition import run_modal_analysis, run_time_history_analysis
+from .case_summary import summarize_case
+from .classes import Frame, LimitStateTable, SectionLimitStates, TimeHistoryAnalysis
+from .material_sampling import latin_hypercube
+from .scripts import (assign_frame_links, build_frame, build_opensees_model,
+                      compute_frames_limit_states, compute_moment_rotations, frame_links)
+from .shared_waveforms import shared_waveform
+from .utils import clean_directory
+
+
+# Upper value of the performance ratio seen by the surrogate, failed
+# analyses and far off designs are clipped to it
+MAX_SURROGATE_RATIO = 10.
+# Candidates closer than this to a chosen or evaluated design are skipped,
+# distance in the unit design space
+MIN_CANDIDATE_DISTANCE = 0.05
+
+
+def design_labels(n_storeys: int) -> List[str]:
+    """
+    Names of the design variables, the post tensioning force of the beams of
+    every storey followed by their dissipator bars
+
+    Args:
+        n_storeys (int): number of storeys of the frame
+
+    Returns:
+        List[str]: labels, e.g. 'beam_1.tendons_pt'
+    """
+    return (
+        [f'beam_{storey}.tendons_pt' for storey in range(1, n_storeys + 1)]
+        + [f'beam_{storey}.reinforcement_count' for storey in range(1, n_storeys + 1)]
+    )
+
+
+def design_bounds(optimization: DesignOptimizationInput, n_storeys: int) -> Tuple[npt.NDArray, npt.NDArray]:
+    """
+    Lower and upper bounds of the design variables
+
+    Args:
+        optimization (DesignOptimizationInput): optimization input
+        n_storeys (int): number of storeys of the frame
+
+    Returns:
+        Tuple[npt.NDArray, npt.NDArray]: lower and upper bounds
+    """
+    lower = np.repeat([optimization.tendons_pt.lower, optimization.reinforcement_count.lower], n_storeys)
+    upper = np.repeat([optimization.tendons_pt.upper, optimization.reinforcement_count.upper], n_storeys)
+    return lower.astype(float), upper.astype(float)
+
+
+def round_designs(designs: npt.ArrayLike, n_storeys: int) -> npt.NDArray:
+    """
+    Rounds the dissipator bars of the designs to integers
+
+    Args:
+        designs (npt.ArrayLike): designs (designs x variables)
+        n_storeys (int): number of storeys of the frame
+
+    Returns:
+        npt.NDArray: rounded designs
+    """
+    designs = np.array(designs, dtype=float, ndmin=2)
+    designs[:, n_storeys:] = np.round(designs[:, n_storeys:])
+    return designs
+
+
+def design_frame_data(frame_data: dict, design: npt.ArrayLike) -> dict:
+    """
+    Frame input data of a design, the base frame data with the post
+    tensioning force and dissipator bars of the beams of each storey replaced
+
+    Args:
+        frame_data (dict): base frame input data
+        design (npt.ArrayLike): design variables
+
+    Returns:
+        dict: frame input data of the design
+    """
+    frame_data = copy.deepcopy(frame_data)
+    beams = frame_data['sections']['beams']
+    n_storeys = len(beams)
+    for storey, beam in enumerate(beams):
+        beam['tendons_pt'] = float(design[storey])
+        beam['reinforcement_count'] = int(round(design[n_storeys + storey]))
+    return frame_data
+
+
+def design_costs(designs: npt.ArrayLike,
+                 optimization: DesignOptimizationInput,
+                 frame_data: dict) -> npt.NDArray:
+    """
+    Cost of the post tensioning and dissipators of the designs, summed over
+    the beams of every span and frame
+
+    Args:
+        designs (npt.ArrayLike): designs (designs x variables)
+        optimization (DesignOptimizationInput): optimization input
+        frame_data (dict): base frame input data
+
+    Returns:
+        npt.NDArray: cost of each design
+    """
+    designs = np.array(designs, dtype=float, ndmin=2)
+    n_storeys = frame_data['n_storeys']
+    beams_per_storey = frame_data['n_spans'] * frame_data['n_frames']
+    storey_costs = (
+        optimization.pt_cost * designs[:, :n_storeys]
+        + optimization.reinforcement_cost * designs[:, n_storeys:]
+    )
+    return beams_per_storey * np.sum(storey_costs, axis=1)
+
+
+def pareto_front(costs: npt.ArrayLike, ratios: npt.ArrayLike) -> npt.NDArray:
+    """
+    Designs no other design beats on both cost and performance ratio
+
+    Args:
+        costs (npt.ArrayLike): design costs
+        ratios (npt.ArrayLike): design performance ratios, not finite for
+            failed analyses
+
+    Returns:
+        npt.NDArray: mask of the Pareto designs
+    """
+    costs = np.asarray(costs, dtype=float)
+    ratios = np.asarray(ratios, dtype=float)
+    is_pareto = np.zeros(costs.shape, dtype=bool)
+    best_ratio = np.inf
+    for index in np.lexsort((ratios, costs)):
+        if np.isfinite(ratios[index]) and ratios[index] < best_ratio:
+            is_pareto[index] = True
+            best_ratio = ratios[index]
+    return is_pareto
+
+
+def solve_design_sections(frames: List[Frame]) -> List[Optional[List[SectionLimitStates]]]:
+    """
+    Computes the links and limit states of the sections of many designs
+    together, identical sections of different designs are solved once. If a
+    section has no equilibrium the designs are solved one at a time, the
+    points already found are reused from the equilibrium cache
+
+    Args:
+        frames (List[Frame]): frames of the designs
+
+    Returns:
+        List[Optional[List[SectionLimitStates]]]: section limit states of
+            each design, None for the designs that could not be solved
+    """
+    try:
+        compute_moment_rotations(frames)
+        return compute_frames_limit_states(frames)
+    except ValueError:
+        if len(frames) == 1:
+            return [None]
+    return [solve_design_sections([frame])[0] for frame in frames]
+
+
+# Picklable function, modal and TH of a design
+def run_design_analysis(task) -> Tuple[List[float], Dict[str, npt.NDArray]]:
+    """
+    Runs the modal analysis and a time history of a design
+
+    Args:
+        task (tuple): input data, links, design folder, waveform folder and
+            time history of the design
+
+    Returns:
+        Tuple[List[float], Dict[str, npt.NDArray]]: modal periods and peak
+            response summary, None if the analysis failed
+    """
+    input_data, links, design_folder, waveform_folder, time_history = task
+    frame = build_frame(**input_data)
+    assign_frame_links(frame, links)
+    build_opensees_model(frame)
+    structure_periods = run_modal_analysis(frame)
+
+    save_dir = design_folder / f'TH_{time_history.id:04}'
+    success = run_time_history_analysis(
+        frame=frame,
+        time_history_analysis=time_history,
+        structure_periods=structure_periods,
+        waveform_folder=waveform_folder,
+        save_dir=save_dir,
+        ground_motion=shared_waveform(time_history.filename)
+    )
+    if not success:
+        return structure_periods, None
+
+    summary = summarize_case(
+        n_storeys=frame.n_storeys,
+        storey_height=frame.storey_height,
+        displacements=np.loadtxt(save_dir / pth.STOREY_DISPS_FILE, ndmin=2),
+        recorded_gaps=np.loadtxt(save_dir / pth.GAP_OPENINGS_FILE, ndmin=2)
+    )
+    return structure_periods, summary
+
+
+class DesignEvaluator:
+    """
+    Cached objective of the design optimization. A design is evaluated once
+    on the reduced record set, later requests of the same design are served
+    from the cache
+    """
+
+    def __init__(self,
+                 input_data: Dict[str, dict],
+                 optimization: DesignOptimizationInput,
+                 time_histories: List[TimeHistoryAnalysis],
+                 waveform_folder: Path,
+                 output_folder: Path,
+                 map_function: Callable = map):
+        """
+        Instanciate a DesignEvaluator object
+
+        Args:
+            input_data (Dict[str, dict]): base frame, steel, tendon and timber input data
+            optimization (DesignOptimizationInput): optimization input
+            time_histories (List[TimeHistoryAnalysis]): reduced record set
+            waveform_folder (Path): folder holding the waveform files
+            output_folder (Path): folder of the design analyses
+            map_function (Callable, optional): map running the analyses, e.g.
+                the map of a process pool. Defaults to map.
+        """
+        self.input_data = input_data
+        self.optimization = optimization
+        self.time_histories = time_histories
+        self.waveform_folder = waveform_folder
+        self.output_folder = output_folder
+        self.map_function = map_function
+        self.n_storeys = input_data['frame_data']['n_storeys']
+        self.labels = design_labels(self.n_storeys)
+        self.history: List[dict] = []
+        self._cache: Dict[bytes, dict] = {}
+
+    @property
+    def bounds(self) -> Tuple[npt.NDArray, npt.NDArray]:
+        return design_bounds(self.optimization, self.n_storeys)
+
+    @property
+    def designs(self) -> npt.NDArray:
+        return np.array([[evaluation[label] for label in self.labels] for evaluation in self.history])
+
+    def column(self, key: str) -> npt.NDArray:
+        """
+        Values of a history field for every evaluated design
+        """
+        return np.array([evaluation[key] for evaluation in self.history], dtype=float)
+
+    def __call__(self, designs: npt.ArrayLike, stage: str) -> List[dict]:
+        """
+        Evaluates the designs, the new ones together in a single batch
+
+        Args:
+            designs (npt.ArrayLike): designs (designs x variables)
+            stage (str): optimization stage stored in the history
+
+        Returns:
+            List[dict]: evaluation of each design
+        """
+        lower, upper = self.bounds
+        designs = round_designs(np.clip(designs, lower, upper), self.n_storeys)
+        new_designs = {}
+        for design in designs:
+            key = self._key(design)
+            if key not in self._cache:
+                new_designs[key] = design
+        if new_designs:
+            self._evaluate(list(new_designs.values()), stage)
+        return [self._cache[self._key(design)] for design in designs]
+
+    def _evaluate(self, designs: List[npt.NDArray], stage: str) -> None:
+        """
+        Runs the analyses of new designs and stores their evaluation
+        """
+        first_index = len(self.history) + 1
+        design_inputs = [
+            dict(self.input_data, frame_data=design_frame_data(self.input_data['frame_data'], design))
+            for design in designs
+        ]
+        frames = [build_frame(**input_data) for input_data in design_inputs]
+        frames_limit_states = solve_design_sections(frames)
+        design_folders = [
+            self.output_folder / f'D_{index:04}' for index in range(first_index, first_index + len(designs))
+        ]
+
+        # designs whose sections have no equilibrium are not analysed
+        solved = [index for index, limit_states in enumerate(frames_limit_states) if limit_states is not None]
+        for index in solved:
+            if design_folders[index].is_dir():
+                clean_directory(design_folders[index])
+            else:
+                design_folders[index].mkdir(parents=True)
+        tasks = [
+            (design_inputs[index], frame_links(frames[index]), design_folders[index], self.waveform_folder, time_history)
+            for time_history in self.time_histories
+            for index in solved
+        ]
+        results = list(self.map_function(run_design_analysis, tasks))
+        costs = design_costs(designs, self.optimization, self.input_data['frame_data'])
+
+        for index, design in enumerate(designs):
+            period = drift_ratio = gap_dcr = np.inf
+            failed_analyses = len(self.time_histories)
+            if index in solved:
+                design_results = results[solved.index(index)::len(solved)]
+                summaries = [summary for _, summary in design_results]
+                period = design_results[0][0][0]
+                failed_analyses = sum(summary is None for summary in summaries)
+            if failed_analyses == 0:
+                # mean of the peak responses over the record set
+                gap_limits = LimitStateTable.from_section_limit_states(
+                    frames_limit_states[index]
+                ).capacity(self.optimization.limit_state)
+                mean_drifts = np.mean([summary['peak_drift'] for summary in summaries], axis=0)
+                mean_gaps = np.mean([summary['peak_gap_opening'] for summary in summaries], axis=0)
+                drift_ratio = float(np.max(mean_drifts)) / self.optimization.drift_target
+                gap_dcr = float(np.nanmax(mean_gaps / gap_limits))
+            ratio = max(drift_ratio, gap_dcr / self.optimization.gap_dcr_target)
+
+            evaluation = dict(
+                design=f'D_{first_index + index:04}',
+                stage=stage,
+                **dict(zip(self.labels, design.tolist())),
+                cost=float(costs[index]),
+                T1=float(period),
+                drift_ratio=drift_ratio,
+                gap_dcr=gap_dcr,
+                ratio=ratio,
+                feasible=bool(ratio <= 1.),
+                sections_solved=index in solved,
+                failed_analyses=failed_analyses
+            )
+            self._cache[self._key(design)] = evaluation
+            self.history.append(evaluation)
+
+    @staticmethod
+    def _key(design: npt.NDArray) -> bytes:
+        return np.round(design, 6).tobytes()
+
+
+def propose_designs(evaluator: DesignEvaluator,
+                    n_designs: int,
+                    n_candidates: int,
+                    rng: np.random.Generator) -> npt.NDArray:
+    """
+    Proposes the next batch of designs on a radial basis function surrogate
+    of the performance ratio fitted on every evaluated design. Candidates are
+    drawn over the whole design space and around the current Pareto designs,
+    the cheapest ones predicted to meet the targets are chosen, or the best
+    performing ones if none is, keeping them apart from each other and from
+    the evaluated designs
+
+    Args:
+        evaluator (DesignEvaluator): evaluator holding the evaluated designs
+        n_designs (int): number of designs to propose
+        n_candidates (int): number of candidates ranked on the surrogate
+        rng (np.random.Generator): random generator
+
+    Returns:
+        npt.NDArray: proposed designs (designs x variables), may be fewer
+            than n_designs
+    """
+    lower, upper = evaluator.bounds
+    span = np.where(upper > lower, upper - lower, 1.)
+    evaluated = (evaluator.designs - lower) / span
+    ratios = evaluator.column('ratio')
+    n_variables = lower.shape[0]
+
+    # local candidates around the Pareto designs refine the front
+    pareto = evaluated[pareto_front(evaluator.column('cost'), ratios)]
+    n_global = n_candidates if pareto.shape[0] == 0 else n_candidates // 2
+    candidates = latin_hypercube(n_global, n_variables, rng)
+    if n_global < n_candidates:
+        centres = pareto[rng.integers(pareto.shape[0], size=n_candidates - n_global)]
+        local = centres + rng.normal(scale=0.1, size=centres.shape)
+        candidates = np.vstack([candidates, np.clip(local, 0., 1.)])
+    candidate_designs = round_designs(lower + candidates * span, evaluator.n_storeys)
+    candidates = (candidate_designs - lower) / span
+
+    log_ratios = np.log(np.clip(ratios, 1 / MAX_SURROGATE_RATIO, MAX_SURROGATE_RATIO))
+    if evaluated.shape[0] > n_variables:
+        surrogate = RBFInterpolator(evaluated, log_ratios, kernel='thin_plate_spline', smoothing=1e-8)
+        predicted_ratios = np.exp(surrogate(candidates))
+    else:
+        # too few designs for the surrogate, candidates are ranked on cost only
+        predicted_ratios = np.zeros(candidates.shape[0])
+
+    costs = design_costs(candidate_designs, evaluator.optimization, evaluator.input_data['frame_data'])
+    is_feasible = predicted_ratios <= 1.
+    order = np.lexsort((costs, np.where(is_feasible, 0., predicted_ratios)))
+
+    chosen = []
+    for index in order:
+        if len(chosen) == n_designs:
+            break
+        taken = np.vstack([evaluated] + [candidates[chosen]]) if chosen else evaluated
+        if np.min(np.linalg.norm(taken - candidates[index], axis=1)) >= MIN_CANDIDATE_DISTANCE:
+            chosen.append(index)
+    return candidate_designs[chosen]
+
+
+def optimize_design(evaluator: DesignEvaluator) -> List[dict]:
+    """
+    Searches the cheapest designs meeting the performance targets: a Latin
+    hypercube screening of the design space, then batches of designs
+    proposed on a surrogate of the evaluated ones
+
+    Args:
+        evaluator (DesignEvaluator): cached design objective
+
+    Returns:
+        List[dict]: evaluation of every design in search order
+    """
+    optimization = evaluator.optimization
+    rng = np.random.default_rng(optimization.seed)
+    lower, upper = evaluator.bounds
+
+    screening = lower + latin_hypercube(optimization.n_screening, lower.shape[0], rng) * (upper - lower)
+    evaluator(screening, stage='screening')
+    print(f'Screening: {len(evaluator.history)} designs, {sum(evaluator.column("feasible") > 0)} feasible')
+
+    for iteration in range(1, optimization.n_iterations + 1):
+        designs = propose_designs(evaluator, optimization.batch_size, optimization.n_candidates, rng)
+        if designs.shape[0] == 0:
+            break
+        evaluator(designs, stage=f'refinement_{iteration}')
+        print(f'Refinement {iteration}: {len(evaluator.history)} designs, {sum(evaluator.column("feasible") > 0)} feasible')
+    return evaluator.history
+
+
+def export_optimization_results(history: Sequence[dict], output_folder: Path) -> pd.DataFrame:
+    """
+    Saves the search history and the Pareto set of cost and performance ratio
+
+    Args:
+        history (Sequence[dict]): evaluation of every design in search order
+        output_folder (Path): folder of the csv files
+
+    Returns:
+        pd.DataFrame: Pareto designs sorted by cost
+    """
+    history = pd.DataFrame(list(history))
+    history['pareto'] = pareto_front(history['cost'], history['ratio'])
+    history.to_csv(output_folder / pth.OPTIMIZATION_HISTORY_FILE, index=False)
+
+    pareto = history[history['pareto']].sort_values('cost').drop(columns='pareto')
+    pareto.to_csv(output_folder / pth.OPTIMIZATION_PARETO_FILE, index=False)
+    return pareto
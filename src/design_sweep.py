@@ -0,0 +1,87 @@
+import copy
+import itertools
+from typing import Dict, List
+
+from model.enums import SweepParameter, SweepSections
+from model.validation import DesignSweepInput, SweepParameterInput
+
+
+# Section parameters taking integer values
+INTEGER_PARAMETERS = (SweepParameter.NTendons, SweepParameter.ReinforcementCount)
+
+
+def parameter_label(parameter: SweepParameterInput) -> str:
+    """
+    Name of a swept parameter in the variant tables, e.g. 'beams.tendons_pt'
+    or 'all.h_factor'
+
+    Args:
+        parameter (SweepParameterInput): swept parameter
+
+    Returns:
+        str: label
+    """
+    label = SweepParameter(parameter.parameter).value
+    if parameter.parameter != SweepParameter.Masses:
+        label = f'{SweepSections(parameter.sections).value}.{label}'
+    if parameter.factors is not None:
+        label += '_factor'
+    return label
+
+
+def expand_variants(sweep: DesignSweepInput) -> List[Dict[str, float]]:
+    """
+    Design variants of a sweep, all the combinations of the swept values
+
+    Args:
+        sweep (DesignSweepInput): sweep
+
+    Returns:
+        List[Dict[str, float]]: swept values of each variant by label
+    """
+    labels = [parameter_label(parameter) for parameter in sweep.parameters]
+    ranges = [
+        parameter.values if parameter.values is not None else parameter.factors
+        for parameter in sweep.parameters
+    ]
+    return [dict(zip(labels, combination)) for combination in itertools.product(*ranges)]
+
+
+def variant_frame_data(frame_data: dict, sweep: DesignSweepInput, variant: Dict[str, float]) -> dict:
+    """
+    Frame input data of a variant, the base frame data with the swept values
+    applied
+
+    Args:
+        frame_data (dict): base frame input data
+        sweep (DesignSweepInput): sweep
+        variant (Dict[str, float]): swept values of the variant by label
+
+    Returns:
+        dict: frame input data of the variant
+    """
+    frame_data = copy.deepcopy(frame_data)
+    sections = frame_data['sections']
+    for parameter in sweep.parameters:
+        value = variant[parameter_label(parameter)]
+        is_factor = parameter.factors is not None
+
+        if parameter.parameter == SweepParameter.Masses:
+            frame_data['masses'] = [
+                mass * value if is_factor else value for mass in frame_data['masses']
+            ]
+            continue
+
+        swept_sections = []
+        if parameter.sections in (SweepSections.Beams, SweepSections.All):
+            swept_sections += sections['beams']
+        if parameter.sections in (SweepSections.Columns, SweepSections.All):
+            swept_sections += [sections['internal_column'], sections['external_column']]
+
+        key = SweepParameter(parameter.parameter).value
+        for section in swept_sections:
+            section_value = section[key] * value if is_factor else value
+            if parameter.parameter in INTEGER_PARAMETERS:
+                section_value = int(round(section_value))
+            section[key] = section_value
+    return frame_data
@@ -1,10 +1,14 @@
 from pathlib import Path
 import csv
-import h5py
 
 import numpy as np
 import numpy.typing as npt
 
+from src.case_summary import absolute_accelerations, interstorey_drifts
+from src.results_store import ResultCase, ResultsStore
+
+G = 9.81  # Acceleration due to gravity in m/s^2
+
 
 def export_fema_edps(hdf5_path: Path, 
                      intenisty_dct: dict, 
@@ -24,146 +28,148 @@ def export_fema_edps(hdf5_path: Path,
     # Header first part 
     csv_body.append(['Intensity #', 'Name', '# Demand Vectors', 'Modeling Dispersion', 'SA(T)', 'SA(T1)', 'MAFE'])
 
-    # Body first part
-    # need to read T1
-    T1 = 1
-    for i, (intensity, sa_t1, mafe) in enumerate(zip(intenisty_dct['intensities'], intenisty_dct['SaT1'], intenisty_dct['mafe']), start=1):
-        csv_body.append(
-            [
-                i,
-                intensity,
-                intenisty_dct['cases'],
-                intenisty_dct['modeling_dispersion'],
-                sa_t1,
-                T1,
-                mafe
-            ]
-        )
-
-    # Add an empty line
-    csv_body.append([])
-
-    # Header second part
-    base_header = ['Intensity #', 'Demand Type', 'Floor', 'Dir']
-    dynamic_header = [f'EQ{i}' for i in range(1, intenisty_dct['cases'] + 1)]
-    csv_body.append(base_header + dynamic_header)
-
-    # Body second part
-    for i, th_ids in enumerate(intenisty_dct['map'], start=1):
-
-        # Get the EDPs from the HDF5 file
-        edp_dct = compute_edp_from_hdf5(
-            hdf5_path=hdf5_path,
-            th_ids=th_ids,
-            floor_height=floor_height
-        )
-        # Storey Drift Ratio and Accelerations
-        for key in ['Story Drift Ratio', 'Acceleration']:
-            for floor, edps in enumerate(edp_dct[key], start=1):
-                for dir_ in [1, 2]:  # Assuming dir 1 and 2 for two horizontal directions
-                    csv_body.append(
-                        [i, key, floor, dir_] + edps.tolist()
-                    )
-
-        # Residual Drift Ratio
-        csv_body.append(
-            [i, 'Residual Drift', '', ''] + edp_dct['Residual Drift']
-        )
-    
+    with ResultsStore(hdf5_path) as store:
+        # Body first part
+        for i, (intensity, th_ids, sa_t1, mafe) in enumerate(zip(intenisty_dct['intensities'], intenisty_dct['map'], intenisty_dct['SaT1'], intenisty_dct['mafe']), start=1):
+            csv_body.append(
+                [
+                    i,
+                    intensity,
+                    len(th_ids),
+                    intenisty_dct['modeling_dispersion'],
+                    sa_t1,
+                    achieved_sa_t1(store, th_ids),
+                    mafe
+                ]
+            )
+
+        # Add an empty line
+        csv_body.append([])
+
+        # Header second part, as wide as the largest stripe
+        base_header = ['Intensity #', 'Demand Type', 'Floor', 'Dir']
+        dynamic_header = [f'EQ{i}' for i in range(1, intenisty_dct['cases'] + 1)]
+        csv_body.append(base_header + dynamic_header)
+
+        # Body second part
+        # EDPs of each record are computed once and shared across intensities
+        edp_cache: dict[int, dict[str, npt.NDArray]] = {}
+        for i, th_ids in enumerate(intenisty_dct['map'], start=1):
+
+            # Get the EDPs from the HDF5 file
+            edp_dct = compute_edps(
+                store=store,
+                th_ids=th_ids,
+                floor_height=floor_height,
+                edp_cache=edp_cache
+            )
+            # Storey Drift Ratio and Accelerations
+            for key in ['Story Drift Ratio', 'Acceleration']:
+                # floors x records
+                for floor, edps in enumerate(edp_dct[key].T, start=1):
+                    for dir_ in [1, 2]:  # Assuming dir 1 and 2 for two horizontal directions
+                        csv_body.append(
+                            [i, key, floor, dir_] + edps.tolist()
+                        )
+
+            # Residual Drift Ratio
+            csv_body.append(
+                [i, 'Residual Drift', '', ''] + edp_dct['Residual Drift'].tolist()
+            )
+
     # Write to CSV file
     with open(output_path, 'w', newline='') as csvfile: 
         writer = csv.writer(csvfile)
         writer.writerows(csv_body)
     
 
-def get_idr_from_hdf5(hdf5_path: Path, group_name: str, floor_height: float) -> tuple[npt.NDArray, float]:
+def achieved_sa_t1(store: ResultsStore, th_ids: list[int]) -> float:
     """
-    Extracts inter-story drift ratios (IDRs) from an HDF5 file.
-    :param hdf5_path: Path to the HDF5 file.
-    :param group_name: Name of the group in the HDF5 file containing the displacements.
-    :param floor_height: Height of each floor in meters.
-    :return: A tuple containing the maximum IDRs for each floor and the last IDR (residual drift ratio).
+    Geometric mean Sa(T1) of the scaled records of an intensity, at the T1 of
+    the modal analysis stored with the results.
+    :param store: results file.
+    :param th_ids: time history ids of the intensity.
+    :return: achieved SaT1 in g, NaN if the intensity measures were not stored.
     """
-    G = 9.81  # Acceleration due to gravity in m/s^2
+    sa_t1 = []
+    for th_id in th_ids:
+        case = store.case(th_id)
+        if 'intensity_measures' not in case:
+            return np.nan
+        sa_t1.append(case.intensity_measures['SaT1'])
+    return float(np.exp(np.mean(np.log(sa_t1))))
 
-    with h5py.File(hdf5_path, 'r') as f:
-        group = f[group_name]
-        assert isinstance(group, h5py.Group), "Expected a group in the HDF5 file"
-        disps = group['displacements']
-        # Drop first column which is time
-        assert isinstance(disps, h5py.Dataset), "Expected 'displacements' to be a dataset"
-        disps = disps[:, 1:]  # Drop the first column which is time
 
-    # Calculate the delta displacement between floors
-    delta_disp = np.diff(disps, axis=1)
-
-    # Compute idrs
-    idrs = np.abs(delta_disp) / floor_height
-
-    # Compute the maximum idrs
-    max_idrs = np.max(idrs, axis=0)
-
-    # Compute last idrs (residual drift ratio)
-    last_idrs = np.max(idrs[-1, :])
+def get_idr_from_case(case: ResultCase, floor_height: float) -> tuple[npt.NDArray, float]:
+    """
+    Extracts inter-story drift ratios (IDRs) from the displacements of a result case.
+    :param case: result case holding the displacements.
+    :param floor_height: Height of each floor in meters.
+    :return: A tuple containing the maximum IDRs for each floor and the last IDR (residual drift ratio).
+    """
+    idrs = interstorey_drifts(case.displacements, floor_height)
 
-    return max_idrs, last_idrs
+    # Compute the maximum idrs and the last idrs (residual drift ratio)
+    return np.max(idrs, axis=0), np.max(idrs[-1, :])
 
 
-def get_acc_from_hdf5(hdf5_path: Path, group_name: str) -> npt.NDArray:
+def get_acc_from_case(case: ResultCase) -> npt.NDArray:
     """
-    Retrieves all acceleration values from the 'accelerations' table in the specified group of an HDF5 file.
-    :param hdf5_path: Path to the HDF5 file.
-    :param group_name: Name of the group in the HDF5 file containing the accelerations.
-    :return: A NumPy array containing the acceleration values.
+    Retrieves the peak absolute floor accelerations of a result case.
+    :param case: result case holding the relative accelerations and the time series.
+    :return: A NumPy array containing the peak accelerations in g.
     """
-    G = 9.81  # Acceleration due to gravity in m/s^2
-
-    with h5py.File(hdf5_path, 'r') as f:
-        group = f[group_name]
-        assert isinstance(group, h5py.Group), "Expected a group in the HDF5 file"
-
-        # Relative accelerations
-        accs = group['accelerations']
-        assert isinstance(accs, h5py.Dataset), "Expected 'accelerations' to be a dataset"
-        # Drop first column which is time
-        accs = accs[:, 1:]
-        
-        # Get the time series from the group
-        time_series = group['time_series']
-        assert isinstance(time_series, h5py.Dataset), "Expected 'time_series' to be a dataset"
-        time_series = time_series[:]
-
-    # Add time series to the accelerations to have absolute ones
-    # Make the time series to a broadcastable shape
-    pad_width = accs.shape[0] - time_series.shape[0]
-    time_series = np.pad(time_series, (0, pad_width), mode='constant')
-    # Get absolute accelerations
-    abs_accs = np.abs(accs + time_series[:, np.newaxis])
-
-    # Compute max accelerations
-    max_accs = np.max(abs_accs, axis=0)
+    # Add the scaled time series to the relative accelerations to have absolute ones
+    abs_accs = absolute_accelerations(
+        case.accelerations,
+        case.time_series,
+        case.attrs['time_step'],
+        scale_factor=case.attrs.get('scale_factor', 1.),
+        time_offset=case.attrs.get('time_offset', 0.)
+    )
 
     # Make sure to convert to g's
-    max_accs_g = max_accs / G
-
-    return max_accs_g
-
-
+    return np.max(np.abs(abs_accs), axis=0) / G
 
-def compute_edp_from_hdf5(hdf5_path: Path, th_ids: list[int], floor_height: float) -> dict[str, list]:
-    groups = [f'TH_{th_id:04d}' for th_id in th_ids]
 
-    # Get edps fro  hdf5
-    accs = [
-    get_acc_from_hdf5(hdf5_path, group) for group in groups
-    ]
-    idrs, last_idrs = zip(*list(get_idr_from_hdf5(hdf5_path, group, floor_height=floor_height) for group in groups))
-
-    # Create a dictionary to hold the EDPs
-    edp_dct = {
-        'Story Drift Ratio': list(np.array(idrs).T),
-        'Acceleration': list(np.array(accs).T),
-        'Residual Drift': list(last_idrs),
+def compute_edps(store: ResultsStore,
+                 th_ids: list[int],
+                 floor_height: float,
+                 edp_cache: dict[int, dict[str, npt.NDArray]] = None) -> dict[str, npt.NDArray]:
+    """
+    Computes the EDPs of a set of time histories from an open results file.
+    The /summary table is used when present, the histories are read otherwise.
+    :param store: results file.
+    :param th_ids: time history ids of the intensity.
+    :param floor_height: Height of each floor in meters.
+    :param edp_cache: EDPs of the records already read from the histories, updated in place.
+    :return: EDPs stacked as records x floors arrays.
+    """
+    if 'summary' in store.file:
+        rows = store.case_rows([f'TH_{th_id:04}' for th_id in th_ids])
+        # Summary drifts are stored with the storey height used at export time
+        height_ratio = store.file['summary'].attrs['storey_height'] / floor_height
+        return {
+            'Story Drift Ratio': store.summary('peak_drift')[rows] * height_ratio,
+            'Acceleration': store.summary('peak_acceleration')[rows] / G,
+            'Residual Drift': np.max(store.summary('residual_drift')[rows], axis=1) * height_ratio
+        }
+
+    if edp_cache is None:
+        edp_cache = {}
+
+    for th_id in th_ids:
+        if th_id in edp_cache:
+            continue
+        case = store.case(th_id)
+        max_idrs, last_idr = get_idr_from_case(case, floor_height)
+        edp_cache[th_id] = {
+            'Story Drift Ratio': max_idrs,
+            'Acceleration': get_acc_from_case(case),
+            'Residual Drift': last_idr
+        }
+
+    return {
+        key: np.stack([edp_cache[th_id][key] for th_id in th_ids])
+        for key in ['Story Drift Ratio', 'Acceleration', 'Residual Drift']
     }
-
-    return edp_dct
@@ -2,25 +2,61 @@ import h5py
 import os
 import numpy as np
 import pandas as pd
+from multiprocessing import Pool
 from pathlib import Path
+from typing import Iterator
+
+from src.case_summary import connection_names, summarize_case
+from src.intensity_measures import INTENSITY_MEASURES, intensity_measures, scale_intensity_measures
+from src.waveform_library import load_waveform
+
+
+RECORDER_DATASETS_METADATA = {
+    'displacements': {'units': 'meters', 'type': 'absolute'},
+    'accelerations': {'units': 'meters/seconds^2', 'type': 'relative'},
+    'gap_openings': {'units': 'rad'},
+    'base_reactions': {'units': 'kilo newtons'}
+}
+
+SUMMARY_DATASETS_METADATA = {
+    'success': {},
+    'runtime': {'units': 'seconds'},
+    'peak_drift': {'units': 'rad', 'columns': 'storeys'},
+    'residual_drift': {'units': 'rad', 'columns': 'storeys'},
+    'peak_acceleration': {'units': 'meters/seconds^2', 'type': 'absolute', 'columns': 'floors'},
+    'peak_gap_opening': {'units': 'rad', 'columns': 'connections'},
+    'peak_gap_opening_time': {'units': 'seconds', 'columns': 'connections'},
+    'peak_base_shear': {'units': 'kilo newtons'}
+}
 
 
 def hdf5_create_dataset(hdf5file: h5py.File,
                         dataset_path: str,
                         data: np.ndarray,
-                        metadata: dict = None) -> h5py.Dataset:
+                        metadata: dict = None,
+                        compression: str = None) -> h5py.Dataset:
     """
     Creates an hdf5 dataset with attributes
     :param hdf5file: file hdf5
     :param dataset_path: path to dataset in hdf5
     :param data: data as ndarray
     :param metadata: metadata as dictionary
+    :param compression: hdf5 compression filter (e.g. 'gzip'), scalar and
+        empty datasets are never compressed
     :return: dataset created
     """
-    dataset = hdf5file.create_dataset(
-        dataset_path,
-        data=data
-    )
+    if compression is not None and np.ndim(data) > 0 and np.size(data) > 0:
+        dataset = hdf5file.create_dataset(
+            dataset_path,
+            data=data,
+            compression=compression,
+            shuffle=True
+        )
+    else:
+        dataset = hdf5file.create_dataset(
+            dataset_path,
+            data=data
+        )
     if metadata is not None:
         for key, value in metadata.items():
             dataset.attrs[key] = value
@@ -48,60 +84,574 @@ def hdf5_create_group(hdf5file: h5py.File,
     return group
 
 
+def hdf5_write_dataset(hdf5file: h5py.File,
+                       dataset_path: str,
+                       data: np.ndarray,
+                       metadata: dict = None) -> h5py.Dataset:
+    """
+    Writes a shared dataset, in place if it already exists with the same shape.
+    The write is tracked in the manifest
+    :param hdf5file: hdf5 file
+    :param dataset_path: path to dataset in hdf5
+    :param data: data as ndarray
+    :param metadata: metadata as dictionary
+    :return: dataset written
+    """
+    data = np.asarray(data)
+    manifest = hdf5file.require_group('manifest')
+    manifest.attrs[dataset_path] = 'pending'
+    hdf5file.flush()
+
+    dataset = hdf5file.get(dataset_path)
+    if (isinstance(dataset, h5py.Dataset) and dataset.shape == data.shape
+            and dataset.dtype == data.dtype):
+        dataset[...] = data
+        if metadata is not None:
+            for key, value in metadata.items():
+                dataset.attrs[key] = value
+    else:
+        if dataset_path in hdf5file:
+            del hdf5file[dataset_path]
+        dataset = hdf5_create_dataset(hdf5file, dataset_path, data, metadata)
+
+    manifest.attrs[dataset_path] = 'complete'
+    hdf5file.flush()
+    return dataset
+
+
+def hdf5_begin_entry(hdf5file: h5py.File, entry_path: str) -> None:
+    """
+    Marks an entry as being written in the manifest, removing its previous version
+    :param hdf5file: hdf5 file
+    :param entry_path: path to group or dataset in hdf5
+    :return: None
+    """
+    manifest = hdf5file.require_group('manifest')
+    if entry_path in hdf5file:
+        del hdf5file[entry_path]
+    manifest.attrs[entry_path] = 'pending'
+    hdf5file.flush()
+
+
+def hdf5_complete_entry(hdf5file: h5py.File, entry_path: str) -> None:
+    """
+    Marks an entry as completely written in the manifest
+    :param hdf5file: hdf5 file
+    :param entry_path: path to group or dataset in hdf5
+    :return: None
+    """
+    hdf5file['manifest'].attrs[entry_path] = 'complete'
+    hdf5file.flush()
+
+
+def repair_HDF5(hdf5file: h5py.File) -> list[str]:
+    """
+    Removes the entries left incomplete by an interrupted write, so that the
+    next export writes them again
+    :param hdf5file: hdf5 file opened in append mode
+    :return: paths of the removed entries
+    """
+    if 'manifest' not in hdf5file:
+        return []
+    manifest = hdf5file['manifest']
+    incomplete = [
+        entry_path for entry_path, state in manifest.attrs.items()
+        if state != 'complete'
+    ]
+    for entry_path in incomplete:
+        if entry_path in hdf5file:
+            del hdf5file[entry_path]
+        del manifest.attrs[entry_path]
+        print(f'Removed incomplete entry {entry_path} from {hdf5file.filename}')
+    hdf5file.flush()
+    return incomplete
+
+
+def hdf5_case_is_current(hdf5file: h5py.File, case_path: str, metadata: dict) -> bool:
+    """
+    Checks if a case is already stored, complete and with the same metadata
+    :param hdf5file: hdf5 file
+    :param case_path: path to case group in hdf5
+    :param metadata: metadata the case would be written with
+    :return: True if the case does not need to be written again
+    """
+    if case_path not in hdf5file or 'manifest' not in hdf5file:
+        return False
+    if hdf5file['manifest'].attrs.get(case_path) != 'complete':
+        return False
+    # cases written before the intensity measures are written again
+    if 'modal' in hdf5file and case_path + '/intensity_measures' not in hdf5file:
+        return False
+    stored_metadata = hdf5file[case_path].attrs
+    return all(
+        key in stored_metadata and np.array_equal(stored_metadata[key], value)
+        for key, value in metadata.items()
+    )
+
+
+def hdf5_read_summary(hdf5file: h5py.File) -> dict[str, dict]:
+    """
+    Reads the rows of an existing /summary table
+    :param hdf5file: hdf5 file
+    :return: summary rows by case path
+    """
+    if 'summary/cases' not in hdf5file:
+        return {}
+    summary = hdf5file['summary']
+    case_names = summary['cases'].asstr()[()]
+    columns = {key: summary[key][()] for key in SUMMARY_DATASETS_METADATA}
+    return {
+        case_name: {key: values[row] for key, values in columns.items()}
+        for row, case_name in enumerate(case_names)
+    }
+
+
+def hdf5_summarize_stored_case(hdf5file: h5py.File,
+                               case_path: str,
+                               n_storeys: int,
+                               storey_height: float) -> dict:
+    """
+    Summary row of a case already stored in the file, for files written
+    before the /summary table existed
+    :param hdf5file: hdf5 file
+    :param case_path: path to case group in hdf5
+    :param n_storeys: number of storeys of the frame
+    :param storey_height: interstorey height
+    :return: summary row
+    """
+    group = hdf5file[case_path]
+    # IDA runs share the time series of the parent record group
+    record = group if 'time_series' in group else group.parent
+    scale_factor = group.attrs.get('scale_factor')
+    case_summary = summarize_case(
+        n_storeys=n_storeys,
+        storey_height=storey_height,
+        displacements=group['displacements'][()] if 'displacements' in group else None,
+        accelerations=group['accelerations'][()] if 'accelerations' in group else None,
+        recorded_gaps=group['gap_openings'][()] if 'gap_openings' in group else None,
+        base_reactions=group['base_reactions'][()] if 'base_reactions' in group else None,
+        time_series=record['time_series'][()] if scale_factor is not None else None,
+        time_step=record.attrs.get('time_step'),
+        scale_factor=scale_factor,
+        time_offset=group.attrs.get('time_offset', record.attrs.get('time_offset', 0.))
+    )
+    case_summary['success'] = bool(group.attrs.get('success', True))
+    case_summary['runtime'] = group.attrs.get('runtime', np.nan)
+    return case_summary
+
+
+def hdf5_create_summary(hdf5file: h5py.File,
+                        summary_rows: dict[str, dict],
+                        n_storeys: int,
+                        storey_height: float) -> h5py.Group:
+    """
+    Creates the /summary group holding the peak response of every case.
+    Row i of every dataset refers to the case in row i of 'cases'
+    :param hdf5file: hdf5 file
+    :param summary_rows: summary of each case as returned by summarize_case, by case path
+    :param n_storeys: number of storeys of the frame
+    :param storey_height: interstorey height
+    :return: created group
+    """
+    case_names = sorted(summary_rows)
+    SUMMARY_METADATA = {
+        'storey_height': storey_height,
+        'floors': list(range(n_storeys + 1)),
+        'connections': connection_names(n_storeys)
+    }
+    hdf5_begin_entry(hdf5file, 'summary')
+    summary = hdf5_create_group(
+        hdf5file=hdf5file,
+        group_path='summary',
+        metadata=SUMMARY_METADATA
+    )
+    hdf5_create_dataset(
+        hdf5file=hdf5file,
+        dataset_path='summary/cases',
+        data=np.array(case_names, dtype=h5py.string_dtype())
+    )
+    for key, metadata in SUMMARY_DATASETS_METADATA.items():
+        hdf5_create_dataset(
+            hdf5file=hdf5file,
+            dataset_path='summary/' + key,
+            data=np.array([summary_rows[case_name][key] for case_name in case_names]),
+            metadata=metadata
+        )
+    hdf5_complete_entry(hdf5file, 'summary')
+
+    return summary
+
+
+def load_recorder(file_path: Path) -> np.ndarray:
+    """
+    Loads an OpenSees recorder file with the pandas C parser, much faster than
+    np.loadtxt on long histories. None if the file is missing
+    :param file_path: path to recorder file
+    :return: recorded data, one row per step
+    """
+    if not file_path.exists():
+        return None
+    try:
+        return pd.read_csv(
+            file_path,
+            sep=r'\s+',
+            header=None,
+            dtype=float,
+            engine='c'
+        ).to_numpy()
+    except pd.errors.EmptyDataError:
+        return np.empty((0, 0))
+
+
+def load_case(results_folder: Path) -> tuple[dict[str, np.ndarray], dict]:
+    """
+    Loads the recorder files and the stats of an analysis case
+    :param results_folder: folder holding the recorder files
+    :return: recorded data by dataset name and analysis stats (None if missing)
+    """
+    import model.paths as pth
+    from src.utils import import_from_json
+
+    RECORDER_FILES = {
+        'displacements': pth.STOREY_DISPS_FILE,
+        'accelerations': pth.STOREY_REL_ACC_FILE,
+        'gap_openings': pth.GAP_OPENINGS_FILE,
+        'base_reactions': pth.BASE_REACTIONS_FILE
+    }
+    recorders = {
+        dataset_name: load_recorder(results_folder / file_name)
+        for dataset_name, file_name in RECORDER_FILES.items()
+    }
+    stats_path = results_folder / pth.TH_STATS_FILE
+    stats = import_from_json(stats_path) if stats_path.exists() else None
+    return recorders, stats
+
+
+def load_cases(results_folders: list[Path],
+               processes: int = 1) -> Iterator[tuple[dict[str, np.ndarray], dict]]:
+    """
+    Loads many analysis cases, in parallel if processes > 1. Cases are
+    yielded in order as soon as they are parsed
+    :param results_folders: folders holding the recorder files
+    :param processes: number of parsing processes
+    :return: iterator over the loaded cases
+    """
+    if processes > 1 and len(results_folders) > 1:
+        with Pool(processes=min(processes, len(results_folders))) as pool:
+            yield from pool.imap(load_case, results_folders)
+    else:
+        yield from map(load_case, results_folders)
+
+
+def recorder_row_errors(recorders: dict[str, np.ndarray], stats: dict = None) -> list[str]:
+    """
+    Checks that the recorders of a case are complete: all files must hold the
+    same number of rows, equal to the steps in stats when recorded
+    :param recorders: recorded data by dataset name
+    :param stats: analysis stats
+    :return: description of each inconsistency, empty if the case is complete
+    """
+    rows = {
+        dataset_name: data.shape[0]
+        for dataset_name, data in recorders.items() if data is not None
+    }
+    errors = []
+    if len(set(rows.values())) > 1:
+        errors.append(f'recorders hold different row counts {rows}')
+    steps = None if stats is None else stats.get('steps')
+    if steps is not None:
+        errors += [
+            f'{dataset_name} holds {n_rows} rows, {steps} steps were recorded'
+            for dataset_name, n_rows in rows.items() if n_rows != steps
+        ]
+    return errors
+
+
+def hdf5_write_recorders(hdf5file: h5py.File,
+                         group_path: str,
+                         recorders: dict[str, np.ndarray],
+                         compression: str = None) -> None:
+    """
+    Writes the recorded data of an analysis case in its group
+    :param hdf5file: hdf5 file
+    :param group_path: path to case group in hdf5
+    :param recorders: recorded data by dataset name, missing files are None
+    :param compression: hdf5 compression filter
+    :return: None
+    """
+    for dataset_name, data in recorders.items():
+        if data is not None:
+            hdf5_create_dataset(
+                hdf5file=hdf5file,
+                dataset_path=group_path + '/' + dataset_name,
+                data=data,
+                metadata=RECORDER_DATASETS_METADATA[dataset_name],
+                compression=compression
+            )
+
+
+def record_intensity_measures(hdf5file: h5py.File,
+                              records: dict[tuple[str, float], np.ndarray]) -> dict[tuple[str, float], dict]:
+    """
+    Computes the intensity measures of the unscaled records, all in one batch.
+    Nothing is computed if the file holds no modal periods
+    :param hdf5file: hdf5 file
+    :param records: unscaled record by record name and time step
+    :return: intensity measures by record name and time step
+    """
+    from src.intensity_measure_cache import default_intensity_measure_cache
+
+    if not records or 'modal' not in hdf5file:
+        return {}
+    measures = intensity_measures(
+        time_series=list(records.values()),
+        time_step=[time_step for _, time_step in records],
+        first_period=float(hdf5file['modal'][0, 0]),
+        cache=default_intensity_measure_cache()
+    )
+    return {
+        record_key: {name: values[row] for name, values in measures.items()}
+        for row, record_key in enumerate(records)
+    }
+
+
+def hdf5_write_intensity_measures(hdf5file: h5py.File,
+                                  case_path: str,
+                                  record_measures: dict,
+                                  scale_factor: float) -> None:
+    """
+    Writes the intensity measures of the scaled ground motion of a case in its group
+    :param hdf5file: hdf5 file
+    :param case_path: path to case group in hdf5
+    :param record_measures: intensity measures of the unscaled record, see record_intensity_measures
+    :param scale_factor: scale factor of the ground motion
+    :return: None
+    """
+    case_measures = scale_intensity_measures(
+        {name: np.array([value]) for name, value in record_measures.items()},
+        [scale_factor]
+    )
+    IM_METADATA = {
+        'columns': list(case_measures.keys()),
+        'units': [INTENSITY_MEASURES[name][0] for name in case_measures],
+        'first_period': float(hdf5file['modal'][0, 0])
+    }
+    hdf5_write_dataset(
+        hdf5file=hdf5file,
+        dataset_path=case_path + '/intensity_measures',
+        data=np.array([values[0] for values in case_measures.values()]),
+        metadata=IM_METADATA
+    )
+
+
+def hdf5_intensity_measures_table(hdf5file: h5py.File) -> pd.DataFrame:
+    """
+    Table of the intensity measures of all the cases stored in the file
+    :param hdf5file: hdf5 file
+    :return: table indexed by case path, None if no case holds intensity measures
+    """
+    rows = {}
+
+    def collect(name: str, item) -> None:
+        if name.endswith('/intensity_measures') and isinstance(item, h5py.Dataset):
+            rows[name.rsplit('/', 1)[0]] = pd.Series(item[()], index=item.attrs['columns'])
+
+    hdf5file.visititems(collect)
+    if not rows:
+        return None
+    table = pd.DataFrame.from_dict(rows, orient='index').sort_index()
+    table.index.name = 'case'
+    return table
+
+
+def export_intensity_measures_table(hdf5file: h5py.File, hdf5_save_path: Path) -> None:
+    """
+    Writes the intensity measures table next to the hdf5 file, as <name>_intensity_measures.csv
+    :param hdf5file: hdf5 file
+    :param hdf5_save_path: path to hdf5 file
+    :return: None
+    """
+    table = hdf5_intensity_measures_table(hdf5file)
+    if table is not None:
+        table.to_csv(hdf5_save_path.with_name(hdf5_save_path.stem + '_intensity_measures.csv'))
+
+
+def hdf5_write_shared_data(hdf5file: h5py.File,
+                           output_folder: Path,
+                           modal: bool = True,
+                           limit_states: bool = True) -> None:
+    """
+    Writes the modal periods and limit states shared by all the cases
+    :param hdf5file: hdf5 file
+    :param output_folder: folder holding modal.csv and section_limit_states.csv
+    :param modal: write modal data
+    :param limit_states: write limit states
+    :return: None
+    """
+    # Modal data
+    modal_path = output_folder / 'modal.csv'
+    if modal and modal_path.exists():
+        modal_data = pd.read_csv(modal_path).to_numpy()
+        MODAL_METADATA = {
+            'units': 'seconds'
+        }
+        hdf5_write_dataset(
+            hdf5file=hdf5file,
+            dataset_path='modal',
+            data=modal_data.astype(float),
+            metadata=MODAL_METADATA
+        )
+
+    # Limit States
+    limit_states_path = output_folder / 'section_limit_states.csv'
+    if limit_states and limit_states_path.exists():
+        limit_states_dataframe = pd.read_csv(limit_states_path)
+        LS_METADATA = {
+            'units': 'rad',
+            'columns': list(limit_states_dataframe.keys().values)
+        }
+        hdf5_write_dataset(
+            hdf5file=hdf5file,
+            dataset_path='limit_states',
+            data=limit_states_dataframe.to_numpy().astype(float),
+            metadata=LS_METADATA
+        )
+
+
+def hdf5_write_realizations(hdf5file: h5py.File,
+                            realizations: dict[str, np.ndarray],
+                            limit_states: np.ndarray,
+                            case_realizations: dict[str, int]) -> None:
+    """
+    Writes the material realizations of a Monte Carlo analysis: the sampled
+    parameters and section limit states of each realization, and the
+    realization of each case as a case attribute
+    :param hdf5file: hdf5 file
+    :param realizations: values of each realization by parameter name
+    :param limit_states: limit states (realizations x sections x limit states)
+    :param case_realizations: realization index by case path
+    :return: None
+    """
+    hdf5_write_dataset(
+        hdf5file=hdf5file,
+        dataset_path='realizations/parameters',
+        data=np.column_stack(list(realizations.values())).astype(float),
+        metadata={'columns': list(realizations.keys())}
+    )
+    hdf5_write_dataset(
+        hdf5file=hdf5file,
+        dataset_path='realizations/limit_states',
+        data=np.asarray(limit_states, dtype=float),
+        metadata={
+            'units': 'rad',
+            'columns': ['DS1', 'DS2', 'DST'],
+            'sections': 'external column, internal column, beams'
+        }
+    )
+    for case_path, realization in case_realizations.items():
+        if case_path in hdf5file:
+            hdf5file[case_path].attrs['realization'] = realization
+
+
+def case_statuses(th_status: dict, time_histories: list[dict]) -> list:
+    """
+    Status of each time history, status.json is keyed by case id or, in older
+    output folders, by position. Keyed files may hold a subset of the cases
+    :param th_status: content of status.json
+    :param time_histories: time history cases
+    :return: status of each case, None if the case was not run
+    """
+    case_ids = [str(time_history['id']) for time_history in time_histories]
+    if set(th_status) <= set(case_ids):
+        return [th_status.get(case_id) for case_id in case_ids]
+    statuses = list(th_status.values())
+    return statuses + [None] * (len(time_histories) - len(statuses))
+
+
 def export_CLOUD_to_HDF5(time_history_folder: Path,
                          hdf5_save_path: Path,
-                         time_history_input_data: Path) -> None:
+                         time_history_input_data: Path,
+                         n_storeys: int,
+                         storey_height: float,
+                         append: bool = False,
+                         waveform_folder: Path = None,
+                         compression: str = None,
+                         processes: int = 1,
+                         verify: bool = False) -> list[str]:
     """
-    Exports time history result data from cloud analysis to hdf5 format
+    Exports time history result data from cloud analysis to hdf5 format.
+    In append mode only new or changed cases are written, the others are kept
     :param time_history_folder: path to time history output folder
     :param hdf5_save_path: path to hdf5 file
     :param time_history_input_data: path to time history input folder
-    :return: None
+    :param n_storeys: number of storeys of the frame
+    :param storey_height: interstorey height, used for the summary drifts
+    :param append: update an existing file instead of rewriting it
+    :param waveform_folder: path to waveform input folder, defaults to model.paths
+    :param compression: hdf5 compression filter of the recorded datasets
+    :param processes: number of processes parsing the recorder files
+    :param verify: skip the cases whose recorder row counts are inconsistent
+    :return: hdf5 paths of the written cases
     """
     import model.paths as pth
     from src.utils import import_from_json
 
+    if waveform_folder is None:
+        waveform_folder = Path(pth.TIMESERIES_INPUT_FOLDER)
+
     # removes existing file if present
-    if hdf5_save_path.exists():
+    if hdf5_save_path.exists() and not append:
         os.remove(hdf5_save_path)
-    with h5py.File(hdf5_save_path, 'w') as hdf5_file:
-
-        # Modal data
-        modal_path = time_history_folder.parent / 'modal.csv'
-        if modal_path.exists():
-            modal = pd.read_csv(modal_path).to_numpy()
-            MODAL_METADATA = {
-                'units': 'seconds'
-            }
-            hdf5_create_dataset(
-                hdf5file=hdf5_file,
-                dataset_path='modal',
-                data=modal.astype(float),
-                metadata=MODAL_METADATA
-            )
+    with h5py.File(hdf5_save_path, 'a') as hdf5_file:
+        repair_HDF5(hdf5_file)
 
-        # Limit States
-        limit_states_path = time_history_folder.parent / 'section_limit_states.csv'
-        if limit_states_path.exists():
-            limit_states_dataframe = pd.read_csv(limit_states_path)
-            LS_METADATA = {
-                'units': 'rad',
-                'columns': list(limit_states_dataframe.keys().values)
-            }
-            hdf5_create_dataset(
-                hdf5file=hdf5_file,
-                dataset_path='limit_states',
-                data=limit_states_dataframe.to_numpy().astype(float),
-                metadata=LS_METADATA
-            )
+        hdf5_write_shared_data(hdf5_file, time_history_folder.parent)
 
-        # Time history cases
+        # Time history cases to be written
         time_histories = import_from_json(time_history_input_data)['NLTHCases']
         th_status = import_from_json(time_history_folder / 'status.json')
-        for (key, status), time_history in zip(th_status.items(), time_histories):
-            time_history['success'] = status
-            th_case_name = f'TH_{int(key):04}'
+        pending_cases = []
+        for status, time_history in zip(case_statuses(th_status, time_histories), time_histories):
+            th_case_name = f'TH_{int(time_history["id"]):04}'
             folder_path = time_history_folder / th_case_name
+            if status is None or not folder_path.exists():
+                continue
+
+            stats_path = folder_path / pth.TH_STATS_FILE
+            time_history['success'] = status
+            if stats_path.exists():
+                stats = import_from_json(stats_path)
+                time_history['runtime'] = stats['time']
+                # trimmed records start later within the waveform and are shorter
+                if 'time_offset' in stats:
+                    time_history['time_offset'] = stats['time_offset']
+                    time_history['duration'] = stats['duration']
+            if append and hdf5_case_is_current(hdf5_file, th_case_name, time_history):
+                continue
+            pending_cases.append((th_case_name, folder_path, time_history))
+
+        # Unscaled ground motions and their intensity measures
+        records = {}
+        for _, _, time_history in pending_cases:
+            record_key = (time_history['filename'], time_history['time_step'])
+            if record_key not in records:
+                records[record_key] = load_waveform(waveform_folder, time_history['filename'])
+        measures = record_intensity_measures(hdf5_file, records)
+
+        summary_rows = hdf5_read_summary(hdf5_file)
+        written_cases = []
+        loaded_cases = load_cases(
+            [folder_path for _, folder_path, _ in pending_cases],
+            processes=processes
+        )
+        for (th_case_name, _, time_history), (recorders, stats) in zip(pending_cases, loaded_cases):
+            row_errors = recorder_row_errors(recorders, stats)
+            for error in row_errors:
+                print(f'{th_case_name}: {error}')
+            if verify and row_errors:
+                continue
+
+            hdf5_begin_entry(hdf5_file, th_case_name)
             hdf5_create_group(
                 hdf5file=hdf5_file,
                 group_path=th_case_name,
@@ -109,7 +659,8 @@ def export_CLOUD_to_HDF5(time_history_folder: Path,
             )
 
             # Time history timeseries
-            time_series_path = Path(pth.TIMESERIES_INPUT_FOLDER) / time_history['filename']
+            record_key = (time_history['filename'], time_history['time_step'])
+            time_series = records[record_key]
             TIMESERIES_METADATA = {
                 'units': 'meters/seconds^2',
                 'type': 'absolute'
@@ -117,102 +668,132 @@ def export_CLOUD_to_HDF5(time_history_folder: Path,
             hdf5_create_dataset(
                 hdf5file=hdf5_file,
                 dataset_path=th_case_name + '/time_series',
-                data=np.loadtxt(time_series_path),
-                metadata=TIMESERIES_METADATA
+                data=time_series,
+                metadata=TIMESERIES_METADATA,
+                compression=compression
             )
 
-            # Displacements
-            displacements_file_path = folder_path / Path(pth.STOREY_DISPS_FILE)
-            if displacements_file_path.exists():
-                DISP_METADATA = {
-                    'units': 'meters',
-                    'type': 'absolute'
-                }
-                hdf5_create_dataset(
-                    hdf5file=hdf5_file,
-                    dataset_path=th_case_name + '/displacements',
-                    data=np.loadtxt(displacements_file_path),
-                    metadata=DISP_METADATA
-                )
+            # Displacements, accelerations, gap openings and base reactions
+            hdf5_write_recorders(hdf5_file, th_case_name, recorders, compression)
 
-            # Accelerations
-            accelerations_file_path = folder_path / Path(pth.STOREY_REL_ACC_FILE)
-            if accelerations_file_path.exists():
-                ACC_METADATA = {
-                    'units': 'meters/seconds^2',
-                    'type': 'relative'
-                }
-                hdf5_create_dataset(
-                    hdf5file=hdf5_file,
-                    dataset_path=th_case_name + '/accelerations',
-                    data=np.loadtxt(accelerations_file_path),
-                    metadata=ACC_METADATA
-                )
+            # Summary row
+            case_summary = summarize_case(
+                n_storeys=n_storeys,
+                storey_height=storey_height,
+                displacements=recorders['displacements'],
+                accelerations=recorders['accelerations'],
+                recorded_gaps=recorders['gap_openings'],
+                base_reactions=recorders['base_reactions'],
+                time_series=time_series,
+                time_step=time_history['time_step'],
+                scale_factor=time_history['scale_factor'],
+                time_offset=time_history.get('time_offset', 0.)
+            )
+            case_summary['success'] = time_history['success']
+            case_summary['runtime'] = time_history.get('runtime', np.nan)
+            summary_rows[th_case_name] = case_summary
 
-            # Gap Openings
-            gap_openings_file_path = folder_path / Path(pth.GAP_OPENINGS_FILE)
-            if gap_openings_file_path.exists():
-                GAP_OPENINGS_METADATA = {
-                    'units': 'rad'
-                }
-                hdf5_create_dataset(
-                    hdf5file=hdf5_file,
-                    dataset_path=th_case_name + '/gap_openings',
-                    data=np.loadtxt(gap_openings_file_path),
-                    metadata=GAP_OPENINGS_METADATA
+            # Intensity measures of the scaled ground motion
+            if record_key in measures:
+                hdf5_write_intensity_measures(
+                    hdf5_file, th_case_name, measures[record_key], time_history['scale_factor']
                 )
+            hdf5_complete_entry(hdf5_file, th_case_name)
+            written_cases.append(th_case_name)
 
-            # Base Reactions
-            base_reactions_file_path = folder_path / Path(pth.BASE_REACTIONS_FILE)
-            if base_reactions_file_path.exists():
-                BASE_REACTIONS_METADATA = {
-                    'units': 'kilo newtons'
-                }
-                hdf5_create_dataset(
-                    hdf5file=hdf5_file,
-                    dataset_path=th_case_name + '/base_reactions',
-                    data=np.loadtxt(base_reactions_file_path),
-                    metadata=BASE_REACTIONS_METADATA
+        # Cases stored before the summary table existed
+        for th_case_name in hdf5_file.keys():
+            if th_case_name.startswith('TH_') and th_case_name not in summary_rows:
+                summary_rows[th_case_name] = hdf5_summarize_stored_case(
+                    hdf5_file, th_case_name, n_storeys, storey_height
                 )
 
+        hdf5_create_summary(
+            hdf5file=hdf5_file,
+            summary_rows=summary_rows,
+            n_storeys=n_storeys,
+            storey_height=storey_height
+        )
+
+        export_intensity_measures_table(hdf5_file, hdf5_save_path)
+
+    return written_cases
+
 
 def export_IDA_to_HDF5(time_history_folder: Path,
                        hdf5_save_path: Path,
-                       time_history_input_data: Path) -> None:
+                       time_history_input_data: Path,
+                       n_storeys: int,
+                       storey_height: float,
+                       append: bool = False,
+                       waveform_folder: Path = None,
+                       compression: str = None,
+                       processes: int = 1,
+                       verify: bool = False) -> list[str]:
     """
-    Exports time history result data from IDA analysis to hdf5 format
+    Exports time history result data from IDA analysis to hdf5 format.
+    In append mode only the records found in the output folder are written,
+    the others are kept
     :param time_history_folder: path to time history output folder
     :param hdf5_save_path: path to hdf5 file
     :param time_history_input_data: path to time history input folder
-    :return: None
+    :param n_storeys: number of storeys of the frame
+    :param storey_height: interstorey height, used for the summary drifts
+    :param append: update an existing file instead of rewriting it
+    :param waveform_folder: path to waveform input folder, defaults to model.paths
+    :param compression: hdf5 compression filter of the recorded datasets
+    :param processes: number of processes parsing the recorder files
+    :param verify: skip the runs whose recorder row counts are inconsistent
+    :return: hdf5 paths of the written runs
     """
     import model.paths as pth
     from src.utils import import_from_json
 
+    if waveform_folder is None:
+        waveform_folder = Path(pth.IDA_TIMESERIES_INPUT_FOLDER)
+
     # removes existing file if present
-    if hdf5_save_path.exists():
+    if hdf5_save_path.exists() and not append:
         os.remove(hdf5_save_path)
-    with h5py.File(hdf5_save_path, 'w') as hdf5_file:
-
-        # Modal data
-        modal_path = time_history_folder.parent / 'modal.csv'
-        if modal_path.exists():
-            modal = pd.read_csv(modal_path).to_numpy()
-            MODAL_METADATA = {
-                'units': 'seconds'
-            }
-            hdf5_create_dataset(
-                hdf5file=hdf5_file,
-                dataset_path='modal',
-                data=modal.astype(float),
-                metadata=MODAL_METADATA
-            )
+    with h5py.File(hdf5_save_path, 'a') as hdf5_file:
+        repair_HDF5(hdf5_file)
+
+        hdf5_write_shared_data(hdf5_file, time_history_folder.parent, limit_states=False)
 
-        # Time history cases
+        # Records to be written, with their scaled runs
         time_histories = import_from_json(time_history_input_data)['NLTHCases']
-        for i, time_history in enumerate(time_histories):
-            th_case_name = f'TH_{int(i + 1):04}'
+        pending_records = []
+        for time_history in time_histories:
+            th_case_name = f'TH_{int(time_history["id"]):04}'
             folder_path = time_history_folder / th_case_name
+            if not folder_path.exists():
+                continue
+            run_folders = sorted(
+                path for path in folder_path.iterdir()
+                if path.is_dir() and path.name.startswith('run_')
+            )
+            pending_records.append((th_case_name, folder_path, time_history, run_folders))
+
+        # Unscaled ground motions and their intensity measures
+        records = {
+            (time_history['filename'], time_history['time_step']):
+                load_waveform(waveform_folder, time_history['filename'])
+            for _, _, time_history, _ in pending_records
+        }
+        measures = record_intensity_measures(hdf5_file, records)
+
+        summary_rows = hdf5_read_summary(hdf5_file)
+        written_cases = []
+        loaded_runs = load_cases(
+            [run_folder for *_, run_folders in pending_records for run_folder in run_folders],
+            processes=processes
+        )
+        for th_case_name, folder_path, time_history, run_folders in pending_records:
+            hdf5_begin_entry(hdf5_file, th_case_name)
+            summary_rows = {
+                case_name: row for case_name, row in summary_rows.items()
+                if not case_name.startswith(th_case_name + '/')
+            }
             hdf5_create_group(
                 hdf5file=hdf5_file,
                 group_path=th_case_name,
@@ -220,7 +801,8 @@ def export_IDA_to_HDF5(time_history_folder: Path,
             )
 
             # Time history timeseries
-            time_series_path = Path(pth.IDA_TIMESERIES_INPUT_FOLDER) / time_history['filename']
+            record_key = (time_history['filename'], time_history['time_step'])
+            time_series = records[record_key]
             TIMESERIES_METADATA = {
                 'columns': 'meters/seconds^2',
                 'type': 'absolute'
@@ -228,12 +810,13 @@ def export_IDA_to_HDF5(time_history_folder: Path,
             hdf5_create_dataset(
                 hdf5file=hdf5_file,
                 dataset_path=th_case_name + '/time_series',
-                data=np.loadtxt(time_series_path),
-                metadata=TIMESERIES_METADATA
+                data=time_series,
+                metadata=TIMESERIES_METADATA,
+                compression=compression
             )
 
             # IDA results
-            ida_results_path = Path('./output/IDA') / th_case_name / 'ida_results.csv'
+            ida_results_path = folder_path / 'ida_results.csv'
             if ida_results_path.exists():
                 ida_dataframe = pd.read_csv(ida_results_path, index_col=0)
                 IDA_METADATA = {
@@ -246,146 +829,254 @@ def export_IDA_to_HDF5(time_history_folder: Path,
                     metadata=IDA_METADATA
                 )
 
-            for j, case_folder in enumerate(os.listdir(folder_path)):
-                # Skips the 0 case which is related to json file
-                if j == 0:
+            for case_path, (recorders, case_stats) in zip(run_folders, loaded_runs):
+                scale_case_hdf5_path = th_case_name + '/' + case_path.name
+                row_errors = recorder_row_errors(recorders, case_stats)
+                for error in row_errors:
+                    print(f'{scale_case_hdf5_path}: {error}')
+                if verify and row_errors:
                     continue
 
-                scale_case_name = f'run_{int(j):04}'
-                scale_case_hdf5_path = th_case_name + '/' + scale_case_name
-                case_path = folder_path / scale_case_name
-                case_stats = import_from_json(case_path / 'stats.json')
                 IDA_CASE_METADATA = {
                     'runtime': case_stats['time'],
                     'success': case_stats['success'],
                 }
+                # Absolute accelerations need the run scale factor
+                scale_factor = case_stats.get('scale_factor')
+                if scale_factor is not None:
+                    IDA_CASE_METADATA['scale_factor'] = scale_factor
+                time_offset = case_stats.get('time_offset', 0.)
+                if 'time_offset' in case_stats:
+                    IDA_CASE_METADATA['time_offset'] = time_offset
+                    IDA_CASE_METADATA['duration'] = case_stats['duration']
                 hdf5_create_group(
                     hdf5file=hdf5_file,
                     group_path=scale_case_hdf5_path,
                     metadata=IDA_CASE_METADATA
                 )
 
-                # Displacements
-                displacements_file_path = case_path / Path(pth.STOREY_DISPS_FILE)
-                if displacements_file_path.exists():
-                    DISP_METADATA = {
-                        'units': 'meters',
-                        'type': 'absolute'
-                    }
-                    hdf5_create_dataset(
-                        hdf5file=hdf5_file,
-                        dataset_path=scale_case_hdf5_path + '/displacements',
-                        data=np.loadtxt(displacements_file_path),
-                        metadata=DISP_METADATA
-                    )
+                # Displacements, accelerations, gap openings and base reactions
+                hdf5_write_recorders(hdf5_file, scale_case_hdf5_path, recorders, compression)
 
-                # Accelerations
-                accelerations_file_path = case_path / Path(pth.STOREY_REL_ACC_FILE)
-                if accelerations_file_path.exists():
-                    ACC_METADATA = {
-                        'units': 'meters/seconds^2',
-                        'type': 'relative'
-                    }
-                    hdf5_create_dataset(
-                        hdf5file=hdf5_file,
-                        dataset_path=scale_case_hdf5_path + '/accelerations',
-                        data=np.loadtxt(accelerations_file_path),
-                        metadata=ACC_METADATA
-                    )
+                # Summary row
+                case_summary = summarize_case(
+                    n_storeys=n_storeys,
+                    storey_height=storey_height,
+                    displacements=recorders['displacements'],
+                    accelerations=recorders['accelerations'],
+                    recorded_gaps=recorders['gap_openings'],
+                    base_reactions=recorders['base_reactions'],
+                    time_series=time_series if scale_factor is not None else None,
+                    time_step=time_history['time_step'],
+                    scale_factor=scale_factor,
+                    time_offset=time_offset
+                )
+                case_summary['success'] = case_stats['success']
+                case_summary['runtime'] = case_stats['time']
+                summary_rows[scale_case_hdf5_path] = case_summary
+                written_cases.append(scale_case_hdf5_path)
 
-                # Gap Openings
-                gap_openings_file_path = case_path / Path(pth.GAP_OPENINGS_FILE)
-                if gap_openings_file_path.exists():
-                    GAP_OPENINGS_METADATA = {
-                        'units': 'rad'
-                    }
-                    hdf5_create_dataset(
-                        hdf5file=hdf5_file,
-                        dataset_path=scale_case_hdf5_path + '/gap_openings',
-                        data=np.loadtxt(gap_openings_file_path),
-                        metadata=GAP_OPENINGS_METADATA
+                # Intensity measures of the scaled ground motion
+                if scale_factor is not None and record_key in measures:
+                    hdf5_write_intensity_measures(
+                        hdf5_file, scale_case_hdf5_path, measures[record_key], scale_factor
                     )
 
-                # Base Reactions
-                base_reactions_file_path = case_path / Path(pth.BASE_REACTIONS_FILE)
-                if base_reactions_file_path.exists():
-                    BASE_REACTIONS_METADATA = {
-                        'units': 'kilo newton'
-                    }
-                    hdf5_create_dataset(
-                        hdf5file=hdf5_file,
-                        dataset_path=scale_case_hdf5_path + '/base_reactions',
-                        data=np.loadtxt(base_reactions_file_path),
-                        metadata=BASE_REACTIONS_METADATA
+            hdf5_complete_entry(hdf5_file, th_case_name)
+
+        # Cases stored before the summary table existed
+        for th_case_name, th_group in hdf5_file.items():
+            if not th_case_name.startswith('TH_'):
+                continue
+            for run_name in th_group.keys():
+                run_path = th_case_name + '/' + run_name
+                if run_name.startswith('run_') and run_path not in summary_rows:
+                    summary_rows[run_path] = hdf5_summarize_stored_case(
+                        hdf5_file, run_path, n_storeys, storey_height
                     )
 
+        hdf5_create_summary(
+            hdf5file=hdf5_file,
+            summary_rows=summary_rows,
+            n_storeys=n_storeys,
+            storey_height=storey_height
+        )
 
-def export_PH_to_HDF5(pushover_folder: Path,
-                      hdf5_save_path: Path) -> None:
+        export_intensity_measures_table(hdf5_file, hdf5_save_path)
+
+    return written_cases
+
+
+def export_SWEEP_to_HDF5(sweep_folder: Path,
+                         hdf5_save_path: Path,
+                         variants: list[dict],
+                         periods: list[list[float]],
+                         limit_states: np.ndarray,
+                         time_histories: list[dict],
+                         th_status: dict,
+                         n_storeys: int,
+                         storey_height: float,
+                         waveform_folder: Path = None,
+                         compression: str = None) -> list[str]:
     """
-    Exports pushover analysis results to hdf5 format
-    :param pushover_folder: path to pushover-pushpull output folder
+    Exports the results of a design variant sweep to a single hdf5 file.
+    Each variant is a group V_<index> holding its swept values as attributes,
+    its modal periods, limit states, pushpull datasets and time history cases.
+    Records are stored once and linked by the cases running them, the
+    summary table covers the cases of every variant
+    :param sweep_folder: folder holding the V_<index> output folders
     :param hdf5_save_path: path to hdf5 file
-    :return: None
+    :param variants: swept values of each variant by label
+    :param periods: modal periods of each variant
+    :param limit_states: limit states (variants x sections x limit states)
+    :param time_histories: time history cases run on every variant
+    :param th_status: success of each case path
+    :param n_storeys: number of storeys of the frame
+    :param storey_height: interstorey height, used for the summary drifts
+    :param waveform_folder: path to waveform input folder
+    :param compression: hdf5 compression filter of the recorded datasets
+    :return: hdf5 paths of the written cases
     """
     import model.paths as pth
     from src.utils import import_from_json
 
-    # removes existing file if present
+    if waveform_folder is None:
+        waveform_folder = Path(pth.TIMESERIES_INPUT_FOLDER)
+
     if hdf5_save_path.exists():
         os.remove(hdf5_save_path)
-    with h5py.File(hdf5_save_path, 'w') as hdf5_file:
-        # Limit States
-        limit_states_path = pushover_folder.parent / 'section_limit_states.csv'
-        if limit_states_path.exists():
-            limit_states_dataframe = pd.read_csv(limit_states_path)
-            LS_METADATA = {
-                'units': 'rad',
-                'columns': list(limit_states_dataframe.keys().values)
-            }
-            hdf5_create_dataset(
+    with h5py.File(hdf5_save_path, 'a') as hdf5_file:
+        labels = list(variants[0].keys()) if variants else []
+        variant_names = [f'V_{index:04}' for index in range(1, len(variants) + 1)]
+        hdf5_write_dataset(
+            hdf5file=hdf5_file,
+            dataset_path='variants/names',
+            data=np.array(variant_names, dtype=h5py.string_dtype())
+        )
+        hdf5_write_dataset(
+            hdf5file=hdf5_file,
+            dataset_path='variants/parameters',
+            data=np.array([[variant[label] for label in labels] for variant in variants], dtype=float),
+            metadata={'columns': labels}
+        )
+
+        # Records, stored once
+        for time_history in time_histories:
+            hdf5_write_dataset(
                 hdf5file=hdf5_file,
-                dataset_path='limit_states',
-                data=limit_states_dataframe.to_numpy().astype(float),
-                metadata=LS_METADATA
+                dataset_path=f'records/TH_{int(time_history["id"]):04}',
+                data=load_waveform(waveform_folder, time_history['filename']),
+                metadata={'units': 'meters/seconds^2', 'type': 'absolute'}
             )
 
-        # Displacements
-        displacements_file_path = pushover_folder / Path(pth.STOREY_DISPS_FILE)
-        if displacements_file_path.exists():
-            DISP_METADATA = {
-                'units': 'meters',
-                'type': 'absolute'
-            }
+        summary_rows = {}
+        written_cases = []
+        for variant_name, variant, variant_periods, variant_limit_states in zip(
+                variant_names, variants, periods, limit_states):
+            variant_folder = sweep_folder / variant_name
+            hdf5_begin_entry(hdf5_file, variant_name)
+            hdf5_create_group(
+                hdf5file=hdf5_file,
+                group_path=variant_name,
+                metadata=variant
+            )
             hdf5_create_dataset(
                 hdf5file=hdf5_file,
-                dataset_path='displacements',
-                data=np.loadtxt(displacements_file_path),
-                metadata=DISP_METADATA
+                dataset_path=variant_name + '/modal',
+                data=np.array(variant_periods, dtype=float)[:, np.newaxis],
+                metadata={'units': 'seconds'}
             )
-
-        # Gap Openings
-        gap_openings_file_path = pushover_folder / Path(pth.GAP_OPENINGS_FILE)
-        if gap_openings_file_path.exists():
-            GAP_OPENINGS_METADATA = {
-                'units': 'rad'
-            }
             hdf5_create_dataset(
                 hdf5file=hdf5_file,
-                dataset_path='gap_openings',
-                data=np.loadtxt(gap_openings_file_path),
-                metadata=GAP_OPENINGS_METADATA
+                dataset_path=variant_name + '/limit_states',
+                data=np.asarray(variant_limit_states, dtype=float),
+                metadata={'units': 'rad', 'columns': ['DS1', 'DS2', 'DST']}
             )
 
-        # Base Reactions
-        base_reactions_file_path = pushover_folder / Path(pth.BASE_REACTIONS_FILE)
-        if base_reactions_file_path.exists():
-            BASE_REACTIONS_METADATA = {
-                'units': 'kilo newtons'
-            }
-            hdf5_create_dataset(
+            pushpull_folder = variant_folder / 'pushpull'
+            if pushpull_folder.exists():
+                recorders, _ = load_case(pushpull_folder)
+                hdf5_write_recorders(hdf5_file, variant_name + '/pushpull', recorders, compression)
+
+            for time_history in time_histories:
+                th_case_name = f'TH_{int(time_history["id"]):04}'
+                case_path = f'{variant_name}/{th_case_name}'
+                folder_path = variant_folder / th_case_name
+                if th_status.get(case_path) is None or not folder_path.exists():
+                    continue
+
+                case_metadata = dict(time_history, success=th_status[case_path])
+                stats_path = folder_path / pth.TH_STATS_FILE
+                if stats_path.exists():
+                    stats = import_from_json(stats_path)
+                    case_metadata['runtime'] = stats['time']
+                    case_metadata['time_offset'] = stats.get('time_offset', 0.)
+                    case_metadata['duration'] = stats.get('duration', time_history['duration'])
+                recorders, stats = load_case(folder_path)
+                for error in recorder_row_errors(recorders, stats):
+                    print(f'{case_path}: {error}')
+
+                hdf5_create_group(
+                    hdf5file=hdf5_file,
+                    group_path=case_path,
+                    metadata=case_metadata
+                )
+                hdf5_file[case_path + '/time_series'] = h5py.SoftLink('/records/' + th_case_name)
+                hdf5_write_recorders(hdf5_file, case_path, recorders, compression)
+
+                case_summary = summarize_case(
+                    n_storeys=n_storeys,
+                    storey_height=storey_height,
+                    displacements=recorders['displacements'],
+                    accelerations=recorders['accelerations'],
+                    recorded_gaps=recorders['gap_openings'],
+                    base_reactions=recorders['base_reactions'],
+                    time_series=hdf5_file['records/' + th_case_name][()],
+                    time_step=time_history['time_step'],
+                    scale_factor=time_history['scale_factor'],
+                    time_offset=case_metadata.get('time_offset', 0.)
+                )
+                case_summary['success'] = case_metadata['success']
+                case_summary['runtime'] = case_metadata.get('runtime', np.nan)
+                summary_rows[case_path] = case_summary
+                written_cases.append(case_path)
+            hdf5_complete_entry(hdf5_file, variant_name)
+
+        if summary_rows:
+            hdf5_create_summary(
                 hdf5file=hdf5_file,
-                dataset_path='base_reactions',
-                data=np.loadtxt(base_reactions_file_path),
-                metadata=BASE_REACTIONS_METADATA
+                summary_rows=summary_rows,
+                n_storeys=n_storeys,
+                storey_height=storey_height
             )
+
+    return written_cases
+
+
+def export_PH_to_HDF5(pushover_folder: Path,
+                      hdf5_save_path: Path,
+                      append: bool = False) -> None:
+    """
+    Exports pushover analysis results to hdf5 format
+    :param pushover_folder: path to pushover-pushpull output folder
+    :param hdf5_save_path: path to hdf5 file
+    :param append: update the datasets of an existing file instead of rewriting it
+    :return: None
+    """
+    # removes existing file if present
+    if hdf5_save_path.exists() and not append:
+        os.remove(hdf5_save_path)
+    with h5py.File(hdf5_save_path, 'a') as hdf5_file:
+        repair_HDF5(hdf5_file)
+
+        hdf5_write_shared_data(hdf5_file, pushover_folder.parent, modal=False)
+
+        recorders, _ = load_case(pushover_folder)
+        for dataset_name, data in recorders.items():
+            if data is not None:
+                hdf5_write_dataset(
+                    hdf5file=hdf5_file,
+                    dataset_path=dataset_name,
+                    data=data,
+                    metadata=RECORDER_DATASETS_METADATA[dataset_name]
+                )
@@ -0,0 +1,257 @@
+import hashlib
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Sequence, Union
+
+import numpy as np
+import numpy.typing as npt
+
+from src.time_series_tools import ResponseSpectra, response_spectrum
+
+
+SPECTRAL_VALUES = ('Sa', 'Sv', 'Sd')
+
+
+def waveform_hash(time_series: npt.ArrayLike) -> str:
+    """
+    Content hash of a record, independent from its file
+
+    Args:
+        time_series (npt.ArrayLike): record values
+
+    Returns:
+        str: sha1 hex digest of the float64 values
+    """
+    values = np.ascontiguousarray(time_series, dtype=np.float64)
+    return hashlib.sha1(values.tobytes()).hexdigest()
+
+
+class IntensityMeasureCache:
+    """
+    Disk cache of response spectra keyed by record content hash, time step and
+    damping. Each entry holds a dense log-spaced spectrum, periods not stored
+    yet are integrated and merged in. Entries above the size limit are evicted
+    least recently used first
+    """
+
+    def __init__(self, cache_folder: Path,
+                 max_size_mb: float,
+                 periods: npt.ArrayLike,
+                 interpolate: bool = False):
+        """
+        Opens a cache folder, created if missing
+
+        Args:
+            cache_folder (Path): folder holding the cached spectra
+            max_size_mb (float): size limit of the folder [MB]
+            periods (npt.ArrayLike): periods of the dense spectra
+            interpolate (bool, optional): interpolate in log period the periods
+                within the dense spectra instead of integrating them. Approximate,
+                a few percent off between the stored periods. Defaults to False.
+        """
+        self.cache_folder = Path(cache_folder)
+        self.cache_folder.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size_mb * 1024**2
+        self.periods = np.sort(np.asarray(periods, dtype=float))
+        self.interpolate = interpolate
+
+    def _entry_path(self, record_hash: str, time_step: float, csi: float) -> Path:
+        key = f'{record_hash}_{time_step!r}_{csi!r}'
+        return self.cache_folder / (hashlib.sha1(key.encode()).hexdigest() + '.npz')
+
+    def _read_entry(self, entry_path: Path) -> dict:
+        """
+        Reads a cache entry and marks it as recently used, None if missing
+        """
+        try:
+            with np.load(entry_path) as entry:
+                data = {key: entry[key] for key in entry.files}
+        except (FileNotFoundError, OSError, ValueError):
+            return None
+        os.utime(entry_path)
+        return data
+
+    def _write_entry(self, entry_path: Path, data: dict) -> None:
+        # written aside and renamed, concurrent workers never read a partial entry
+        temporary_path = entry_path.with_name(f'{entry_path.stem}_{os.getpid()}.tmp')
+        with open(temporary_path, 'wb') as entry_file:
+            np.savez(entry_file, **data)
+        os.replace(temporary_path, entry_path)
+
+    def evict(self) -> int:
+        """
+        Deletes the least recently used entries until the folder is within the size limit
+
+        Returns:
+            int: number of deleted entries
+        """
+        entries = []
+        for entry_path in self.cache_folder.glob('*.npz'):
+            try:
+                stats = entry_path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stats.st_mtime_ns, stats.st_size, entry_path))
+        total_size = sum(size for _, size, _ in entries)
+        deleted_entries = 0
+        for _, size, entry_path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            entry_path.unlink(missing_ok=True)
+            total_size -= size
+            deleted_entries += 1
+        return deleted_entries
+
+    @staticmethod
+    def _covered(stored_periods: npt.NDArray,
+                 periods: npt.NDArray,
+                 interpolate: bool) -> bool:
+        """
+        Checks if the requested periods can be read from a stored spectrum
+        """
+        if np.all(np.isin(periods, stored_periods)):
+            return True
+        return (interpolate and
+                np.all((periods >= stored_periods[0]) & (periods <= stored_periods[-1])))
+
+    def response_spectra(self, time_series: Sequence[npt.ArrayLike],
+                         time_step: Union[float, Sequence[float]],
+                         periods: npt.ArrayLike,
+                         csi: Union[float, npt.ArrayLike] = 0.05,
+                         interpolate: bool = None) -> ResponseSpectra:
+        """
+        Response spectra of many records, as response_spectrum. Missing entries
+        and periods are integrated in a single batch and stored
+
+        Args:
+            time_series (Sequence[npt.ArrayLike]): records [m/s2]
+            time_step (Union[float, Sequence[float]]): time step of the records
+            periods (npt.ArrayLike): requested periods
+            csi (Union[float, npt.ArrayLike], optional): critical damping ratios.
+                Defaults to 0.05.
+            interpolate (bool, optional): interpolate the periods within the
+                stored spectra, for approximate queries such as dense plots.
+                Defaults to the option of the cache.
+
+        Returns:
+            ResponseSpectra: Sa [g], Sv [m/s], Sd [m] (records, dampings, periods)
+        """
+        if interpolate is None:
+            interpolate = self.interpolate
+        if np.ndim(time_series[0]) == 0:
+            time_series = [time_series]
+        time_steps = np.broadcast_to(np.asarray(time_step, dtype=float), (len(time_series),))
+        periods = np.atleast_1d(np.asarray(periods, dtype=float))
+        csi = np.atleast_1d(np.asarray(csi, dtype=float))
+        record_hashes = [waveform_hash(record) for record in time_series]
+
+        shape = (len(time_series), csi.size, periods.size)
+        spectra = ResponseSpectra(
+            periods=periods,
+            csi=csi,
+            Sa=np.zeros(shape),
+            Sv=np.zeros(shape),
+            Sd=np.zeros(shape)
+        )
+
+        for j, damping in enumerate(csi):
+            missing_records: List[int] = []
+            entries = {}
+            for i, (record_hash, dt) in enumerate(zip(record_hashes, time_steps)):
+                entry_path = self._entry_path(record_hash, float(dt), float(damping))
+                entry = self._read_entry(entry_path)
+                if entry is None or not self._covered(entry['periods'], periods, interpolate):
+                    missing_records.append(i)
+                entries[i] = (entry_path, entry)
+
+            # new entries get the dense grid, stored ones only the requested periods
+            new_records = [i for i in missing_records if entries[i][1] is None]
+            extended_records = [i for i in missing_records if entries[i][1] is not None]
+            for batch, computed_periods in ((new_records, np.union1d(self.periods, periods)),
+                                            (extended_records, periods)):
+                if not batch:
+                    continue
+                computed = response_spectrum(
+                    [time_series[i] for i in batch],
+                    [time_steps[i] for i in batch],
+                    computed_periods,
+                    damping
+                )
+                for row, i in enumerate(batch):
+                    entry_path, entry = entries[i]
+                    new_entry = {'periods': computed_periods}
+                    new_entry.update({
+                        key: getattr(computed, key)[row, 0] for key in SPECTRAL_VALUES
+                    })
+                    if entry is not None:
+                        new_entry = _merge_entries(entry, new_entry)
+                    self._write_entry(entry_path, new_entry)
+                    entries[i] = (entry_path, new_entry)
+
+            for i, (_, entry) in entries.items():
+                log_periods = np.log(np.maximum(entry['periods'], 1e-6))
+                for key in SPECTRAL_VALUES:
+                    getattr(spectra, key)[i, j] = np.interp(
+                        np.log(np.maximum(periods, 1e-6)),
+                        log_periods,
+                        entry[key]
+                    )
+
+        self.evict()
+        return spectra
+
+    def spectral_acceleration(self, time_series: npt.ArrayLike,
+                              time_step: float,
+                              period: float,
+                              csi: float = 0.05) -> float:
+        """
+        Cached spectral acceleration of a single record
+
+        Args:
+            time_series (npt.ArrayLike): record [m/s2]
+            time_step (float): time step of the record
+            period (float): period
+            csi (float, optional): critical damping ratio. Defaults to 0.05.
+
+        Returns:
+            float: spectral acceleration [g]
+        """
+        return float(self.response_spectra([time_series], time_step, period, csi).Sa[0, 0, 0])
+
+
+def _merge_entries(stored_entry: dict, new_entry: dict) -> dict:
+    """
+    Union of two spectra of the same record, the new values win on shared periods
+    """
+    periods = np.union1d(stored_entry['periods'], new_entry['periods'])
+    merged_entry = {'periods': periods}
+    for key in SPECTRAL_VALUES:
+        values = np.zeros(periods.size)
+        values[np.searchsorted(periods, stored_entry['periods'])] = stored_entry[key]
+        values[np.searchsorted(periods, new_entry['periods'])] = new_entry[key]
+        merged_entry[key] = values
+    return merged_entry
+
+
+@lru_cache(maxsize=None)
+def default_intensity_measure_cache() -> IntensityMeasureCache:
+    """
+    Cache configured in config.yaml, opened once per process
+    """
+    import model.config as config
+    from src.utils import import_configuration
+
+    cfg: config.MNINTConfig
+    cfg = import_configuration(config.CONFIG_PATH, object_hook=config.MNINTConfig)
+    cache_options = cfg.intensity_measure_cache
+    return IntensityMeasureCache(
+        cache_folder=cache_options.cache_folder,
+        max_size_mb=cache_options.max_size_mb,
+        periods=np.geomspace(
+            cache_options.min_period,
+            cache_options.max_period,
+            cache_options.n_periods
+        ),
+        interpolate=cache_options.interpolate
+    )
@@ -0,0 +1,159 @@
+from typing import Dict, Sequence, Union
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+from src.intensity_measure_cache import IntensityMeasureCache
+from src.time_series_tools import G, response_spectrum
+
+
+# name: (units, exponent of the scale factor)
+INTENSITY_MEASURES = {
+    'PGA': ('g', 1),
+    'PGV': ('meters/seconds', 1),
+    'PGD': ('meters', 1),
+    'arias_intensity': ('meters/seconds', 2),
+    'CAV': ('meters/seconds', 1),
+    'SaT1': ('g', 1),
+    'Sa_avg': ('g', 1),
+    'D5_95': ('seconds', 0)
+}
+
+
+def sa_avg_periods(first_period: float,
+                   min_ratio: float = 0.2,
+                   max_ratio: float = 3.0,
+                   n_periods: int = 10) -> npt.NDArray:
+    """
+    Periods of the average spectral acceleration, evenly spaced between
+    min_ratio * T1 and max_ratio * T1
+
+    Args:
+        first_period (float): first mode period T1
+        min_ratio (float, optional): lower period as ratio of T1. Defaults to 0.2.
+        max_ratio (float, optional): upper period as ratio of T1. Defaults to 3.0.
+        n_periods (int, optional): number of periods. Defaults to 10.
+
+    Returns:
+        npt.NDArray: periods
+    """
+    return np.linspace(min_ratio, max_ratio, n_periods) * first_period
+
+
+def _padded_records(time_series: Sequence[npt.ArrayLike]) -> tuple[npt.NDArray, npt.NDArray]:
+    """
+    Records stacked in a zero padded array, with the mask of the recorded samples
+    """
+    lengths = np.array([np.size(record) for record in time_series])
+    records = np.zeros((len(time_series), lengths.max()))
+    for row, record in enumerate(time_series):
+        records[row, :lengths[row]] = record
+    in_record = np.arange(lengths.max()) < lengths[:, np.newaxis]
+    return records, in_record
+
+
+def _cumulative_integral(values: npt.NDArray, time_steps: npt.NDArray) -> npt.NDArray:
+    """
+    Cumulative trapezoidal integral of each row, starting from zero
+    """
+    integral = np.zeros_like(values)
+    integral[:, 1:] = np.cumsum(values[:, 1:] + values[:, :-1], axis=1)
+    return integral * time_steps[:, np.newaxis] / 2
+
+
+def intensity_measures(time_series: Union[npt.ArrayLike, Sequence[npt.ArrayLike]],
+                       time_step: Union[float, Sequence[float]],
+                       first_period: float,
+                       averaging_periods: npt.ArrayLike = None,
+                       csi: float = 0.05,
+                       cache: IntensityMeasureCache = None) -> Dict[str, npt.NDArray]:
+    """
+    Computes the intensity measure suite of many records at once: PGA, PGV,
+    PGD, Arias intensity, CAV, Sa(T1), Sa_avg (geometric mean) and the 5-95%
+    significant duration. Velocities and displacements are integrated from
+    the records without baseline correction
+
+    Args:
+        time_series (Union[npt.ArrayLike, Sequence[npt.ArrayLike]]): a record or
+            a list of records of any length [m/s2]
+        time_step (Union[float, Sequence[float]]): time step of the records
+        first_period (float): first mode period T1
+        averaging_periods (npt.ArrayLike, optional): periods of Sa_avg. Defaults
+            to 10 periods between 0.2 T1 and 3 T1.
+        csi (float, optional): critical damping ratio. Defaults to 0.05.
+        cache (IntensityMeasureCache, optional): spectra cache. Defaults to
+            integrating the spectra directly.
+
+    Returns:
+        Dict[str, npt.NDArray]: one value per record for each intensity measure
+    """
+    if np.ndim(time_series[0]) == 0:
+        time_series = [time_series]
+    if averaging_periods is None:
+        averaging_periods = sa_avg_periods(first_period)
+    time_steps = np.broadcast_to(np.asarray(time_step, dtype=float), (len(time_series),))
+    records, in_record = _padded_records(time_series)
+
+    velocities = _cumulative_integral(records, time_steps) * in_record
+    displacements = _cumulative_integral(velocities, time_steps) * in_record
+    arias_history = np.pi / (2 * G) * _cumulative_integral(records**2, time_steps)
+    arias_intensity = arias_history[:, -1]
+
+    # significant duration between 5% and 95% of the Arias intensity
+    normalized_arias = arias_history / np.where(arias_intensity > 0, arias_intensity, 1.)[:, np.newaxis]
+    start_step = np.argmax(normalized_arias >= 0.05, axis=1)
+    end_step = np.argmax(normalized_arias >= 0.95, axis=1)
+
+    periods = np.append(first_period, averaging_periods)
+    if cache is None:
+        spectra = response_spectrum(list(time_series), time_steps, periods, csi)
+    else:
+        spectra = cache.response_spectra(list(time_series), time_steps, periods, csi)
+    spectral_accelerations = spectra.Sa[:, 0, :]
+
+    return {
+        'PGA': np.max(np.abs(records), axis=1) / G,
+        'PGV': np.max(np.abs(velocities), axis=1),
+        'PGD': np.max(np.abs(displacements), axis=1),
+        'arias_intensity': arias_intensity,
+        'CAV': _cumulative_integral(np.abs(records), time_steps)[:, -1],
+        'SaT1': spectral_accelerations[:, 0],
+        'Sa_avg': np.exp(np.mean(np.log(spectral_accelerations[:, 1:]), axis=1)),
+        'D5_95': (end_step - start_step) * time_steps
+    }
+
+
+def scale_intensity_measures(measures: Dict[str, npt.NDArray],
+                             scale_factors: npt.ArrayLike) -> Dict[str, npt.NDArray]:
+    """
+    Intensity measures of scaled records from the unscaled ones
+
+    Args:
+        measures (Dict[str, npt.NDArray]): unscaled intensity measures
+        scale_factors (npt.ArrayLike): scale factor of each record
+
+    Returns:
+        Dict[str, npt.NDArray]: scaled intensity measures
+    """
+    scale_factors = np.asarray(scale_factors, dtype=float)
+    return {
+        name: values * scale_factors**INTENSITY_MEASURES[name][1]
+        for name, values in measures.items()
+    }
+
+
+def intensity_measures_table(case_names: Sequence[str],
+                             measures: Dict[str, npt.NDArray]) -> pd.DataFrame:
+    """
+    Intensity measures as a table, one row per case
+
+    Args:
+        case_names (Sequence[str]): case or record names
+        measures (Dict[str, npt.NDArray]): intensity measures
+
+    Returns:
+        pd.DataFrame: table indexed by case
+    """
+    table = pd.DataFrame(measures, index=pd.Index(case_names, name='case'))
+    return table[[name for name in INTENSITY_MEASURES if name in table]]
@@ -0,0 +1,118 @@
+import os
+from pathlib import Path
+from typing import List
+
+import h5py
+
+import model.paths as pth
+
+from src.hdf5_exporter import export_CLOUD_to_HDF5, export_IDA_to_HDF5
+
+
+RECORDER_FILES = (
+    pth.STOREY_DISPS_FILE,
+    pth.STOREY_REL_ACC_FILE,
+    pth.GAP_OPENINGS_FILE,
+    pth.BASE_REACTIONS_FILE
+)
+
+
+def tree_layout(tree_folder: Path) -> str:
+    """
+    Layout of a text output tree, IDA trees hold run_xxxx folders in each record
+
+    Args:
+        tree_folder (Path): time history or IDA output folder
+
+    Returns:
+        str: 'IDA' or 'CLOUD'
+    """
+    if any(tree_folder.glob('TH_*/run_*')):
+        return 'IDA'
+    return 'CLOUD'
+
+
+def delete_recorder_files(case_folder: Path) -> int:
+    """
+    Deletes the recorder text files of an analysis case, stats are kept
+
+    Args:
+        case_folder (Path): folder holding the recorder files
+
+    Returns:
+        int: number of deleted files
+    """
+    deleted_files = 0
+    for file_name in RECORDER_FILES:
+        file_path = case_folder / file_name
+        if file_path.exists():
+            os.remove(file_path)
+            deleted_files += 1
+    return deleted_files
+
+
+def migrate_tree(tree_folder: Path,
+                 hdf5_save_path: Path,
+                 time_history_input_data: Path,
+                 waveform_folder: Path,
+                 n_storeys: int,
+                 storey_height: float,
+                 processes: int = 1,
+                 compression: str = 'gzip',
+                 append: bool = False,
+                 delete_text: bool = False) -> List[str]:
+    """
+    Converts a text output tree of time history or IDA analyses to the current
+    hdf5 layout. Recorder files are parsed in parallel and every case is checked
+    against its stats before being written, inconsistent cases are left as text
+
+    Args:
+        tree_folder (Path): time history or IDA output folder
+        hdf5_save_path (Path): path to hdf5 file
+        time_history_input_data (Path): time history input file used for the analyses
+        waveform_folder (Path): folder holding the input waveforms
+        n_storeys (int): number of storeys of the frame
+        storey_height (float): interstorey height
+        processes (int, optional): number of parsing processes. Defaults to 1.
+        compression (str, optional): hdf5 compression filter. Defaults to 'gzip'.
+        append (bool, optional): add the cases to an existing hdf5 file.
+            Defaults to False.
+        delete_text (bool, optional): delete the recorder files of the
+            migrated cases. Defaults to False.
+
+    Returns:
+        List[str]: hdf5 paths of the migrated cases
+    """
+    exporter = {
+        'CLOUD': export_CLOUD_to_HDF5,
+        'IDA': export_IDA_to_HDF5
+    }[tree_layout(tree_folder)]
+
+    migrated_cases = exporter(
+        time_history_folder=tree_folder,
+        hdf5_save_path=hdf5_save_path,
+        time_history_input_data=time_history_input_data,
+        n_storeys=n_storeys,
+        storey_height=storey_height,
+        append=append,
+        waveform_folder=waveform_folder,
+        compression=compression,
+        processes=processes,
+        verify=True
+    )
+
+    if delete_text:
+        # Text files are removed only once the case is complete in the file
+        with h5py.File(hdf5_save_path, 'r') as hdf5_file:
+            manifest = hdf5_file['manifest'].attrs
+            completed_cases = [
+                case_path for case_path in migrated_cases
+                if manifest.get(case_path.split('/')[0]) == 'complete'
+            ]
+        deleted_files = sum(
+            delete_recorder_files(tree_folder / case_path)
+            for case_path in completed_cases
+        )
+        print(f'Deleted {deleted_files} recorder files from {tree_folder}')
+
+    return migrated_cases
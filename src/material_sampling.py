@@ -0,0 +1,172 @@
+import copy
+from typing import Dict, Sequence
+
+import numpy as np
+import numpy.typing as npt
+from scipy.stats import lognorm, norm, uniform
+
+from model.enums import Distribution, UncertainParameter
+from model.validation import MaterialUncertaintyInput, RandomVariableInput
+
+
+def latin_hypercube(n_samples: int, n_variables: int, rng: np.random.Generator) -> npt.NDArray:
+    """
+    Latin hypercube of uniform samples, each variable has one sample in each
+    of n_samples strata of equal probability, strata are paired at random
+
+    Args:
+        n_samples (int): number of samples
+        n_variables (int): number of variables
+        rng (np.random.Generator): random generator
+
+    Returns:
+        npt.NDArray: probabilities (samples x variables)
+    """
+    strata = np.argsort(rng.random((n_samples, n_variables)), axis=0)
+    return (strata + rng.random((n_samples, n_variables))) / n_samples
+
+
+def impose_rank_correlation(samples: npt.NDArray,
+                            correlation: npt.ArrayLike,
+                            rng: np.random.Generator) -> npt.NDArray:
+    """
+    Reorders the samples of each variable so that their rank correlation
+    approaches the target one (Iman & Conover). The values of each variable
+    are not changed, so the Latin hypercube strata are kept
+
+    Args:
+        samples (npt.NDArray): samples (samples x variables)
+        correlation (npt.ArrayLike): target rank correlation matrix
+        rng (np.random.Generator): random generator
+
+    Returns:
+        npt.NDArray: reordered samples
+    """
+    n_samples, n_variables = samples.shape
+    if n_variables < 2:
+        return samples
+
+    scores = norm.ppf(np.arange(1, n_samples + 1) / (n_samples + 1))
+    score_matrix = np.column_stack([rng.permutation(scores) for _ in range(n_variables)])
+    # the spurious correlation of the random scores is removed first, it is
+    # singular with fewer samples than variables
+    score_correlation = np.corrcoef(score_matrix, rowvar=False)
+    if n_samples > n_variables and np.all(np.linalg.eigvalsh(score_correlation) > 0):
+        score_matrix = score_matrix @ np.linalg.inv(np.linalg.cholesky(score_correlation)).T
+    correlated_scores = score_matrix @ np.linalg.cholesky(np.asarray(correlation, dtype=float)).T
+
+    ranks = np.argsort(np.argsort(correlated_scores, axis=0), axis=0)
+    return np.take_along_axis(np.sort(samples, axis=0), ranks, axis=0)
+
+
+def variable_values(variable: RandomVariableInput, probabilities: npt.ArrayLike) -> npt.NDArray:
+    """
+    Values of a random variable at the given non exceedance probabilities,
+    within its bounds
+
+    Args:
+        variable (RandomVariableInput): random variable
+        probabilities (npt.ArrayLike): non exceedance probabilities
+
+    Returns:
+        npt.NDArray: values
+    """
+    probabilities = np.asarray(probabilities, dtype=float)
+    if variable.cov == 0:
+        return np.full(probabilities.shape, variable.mean)
+
+    if variable.distribution == Distribution.Normal:
+        distribution = norm(loc=variable.mean, scale=variable.cov * variable.mean)
+    elif variable.distribution == Distribution.Lognormal:
+        distribution = lognorm(
+            s=np.sqrt(np.log(1 + variable.cov**2)),
+            scale=variable.mean / np.sqrt(1 + variable.cov**2)
+        )
+    else:
+        half_width = np.sqrt(3) * variable.cov * variable.mean
+        distribution = uniform(loc=variable.mean - half_width, scale=2 * half_width)
+
+    # truncation, the probabilities are mapped within the bounds
+    lower = 0. if variable.lower is None else distribution.cdf(variable.lower)
+    upper = 1. if variable.upper is None else distribution.cdf(variable.upper)
+    return distribution.ppf(lower + probabilities * (upper - lower))
+
+
+def sample_realizations(uncertainty: MaterialUncertaintyInput,
+                        n_realizations: int,
+                        seed: int = None) -> Dict[str, npt.NDArray]:
+    """
+    Samples the uncertain parameters of n_realizations material and section
+    realizations, by Latin hypercube with rank correlation control
+
+    Args:
+        uncertainty (MaterialUncertaintyInput): random variables and correlation
+        n_realizations (int): number of realizations
+        seed (int, optional): random generator seed. Defaults to None.
+
+    Returns:
+        Dict[str, npt.NDArray]: values of each realization by parameter name
+    """
+    rng = np.random.default_rng(seed)
+    probabilities = impose_rank_correlation(
+        latin_hypercube(n_realizations, len(uncertainty.variables), rng),
+        uncertainty.correlation,
+        rng
+    )
+    return {
+        UncertainParameter(variable.parameter).value: variable_values(variable, probabilities[:, i])
+        for i, variable in enumerate(uncertainty.variables)
+    }
+
+
+def realization_inputs(input_data: Dict[str, dict], parameters: Dict[str, float]) -> Dict[str, dict]:
+    """
+    Input data of a realization, the nominal input data with the sampled
+    parameters applied. Parameters not given keep their nominal value
+
+    Args:
+        input_data (Dict[str, dict]): nominal frame_data, steel_data,
+            tendon_data and timber_data, as taken by build_frame
+        parameters (Dict[str, float]): parameter values of the realization
+
+    Returns:
+        Dict[str, dict]: input data of the realization
+    """
+    realization = copy.deepcopy(input_data)
+    timber_data = realization['timber_data']
+    steel_data = realization['steel_data']
+    timber_data['E'] *= parameters.get(UncertainParameter.TimberE.value, 1.)
+    timber_data['fc'] *= parameters.get(UncertainParameter.TimberFc.value, 1.)
+    steel_data['fy'] *= parameters.get(UncertainParameter.SteelFy.value, 1.)
+    steel_data['fu'] *= parameters.get(UncertainParameter.SteelFu.value, 1.)
+    if steel_data['fu'] <= steel_data['fy']:
+        raise ValueError(
+            f'steel realization with fu {steel_data["fu"]} not above fy {steel_data["fy"]}, '
+            'correlate or bound the steel strengths'
+        )
+
+    pt_retained = 1 - parameters.get(UncertainParameter.PTLoss.value, 0.)
+    stiffness_factor = parameters.get(UncertainParameter.ConnectionStiffness.value, 1.)
+    sections = realization['frame_data']['sections']
+    for section in [sections['internal_column'], sections['external_column']] + sections['beams']:
+        section['tendons_pt'] *= pt_retained
+        section['connection_stiffness_ratio'] *= stiffness_factor
+    return realization
+
+
+def pair_realizations(case_ids: Sequence[int], n_realizations: int, seed: int = None) -> Dict[int, int]:
+    """
+    Pairs each time history case with a realization, realizations are used
+    equally often and paired at random
+
+    Args:
+        case_ids (Sequence[int]): time history case ids
+        n_realizations (int): number of realizations
+        seed (int, optional): random generator seed. Defaults to None.
+
+    Returns:
+        Dict[int, int]: realization index of each case id
+    """
+    realizations = np.random.default_rng(seed).permutation(np.arange(len(case_ids)) % n_realizations)
+    return {int(case_id): int(realization) for case_id, realization in zip(case_ids, realizations)}
+
@@ -2,4 +2,9 @@ from .force_functions import force_inbalance, steel_force, tendon_force, timber_
 from .strain_functions import steel_strain, tendon_strain, timber_strain
 from .moment_functions import tendon_moment, steel_moment, axial_moment
 from .solver_functions import (steel_yielding, timber_yielding, steel_failure,
-                              tendon_failure, get_neutral_axis)
\ No newline at end of file
+                              tendon_failure, get_neutral_axis)
+from .section_solver import (SectionArrays, section_arrays, force_balance, solve_neutral_axis,
+                             solve_steel_strain, solve_tendon_strain, solve_timber_strain,
+                             trace_neutral_axis)
+from .equilibrium_cache import equilibrium_points, clear_equilibrium_points
+from .backbone import backbone_thetas, trace_backbone, simplify_backbone
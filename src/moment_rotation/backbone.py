@@ -0,0 +1,119 @@
+from typing import List, Sequence, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from ..classes import CompiledSection
+
+from .section_solver import section_arrays, solve_neutral_axis, trace_neutral_axis
+
+
+def backbone_thetas(start: npt.ArrayLike, end: npt.ArrayLike, n_points: int) -> npt.NDArray:
+    """
+    Geometric rotation grids, denser at the start where the neutral axis
+    changes the most
+
+    Args:
+        start (npt.ArrayLike): first rotation of each section
+        end (npt.ArrayLike): last rotation of each section
+        n_points (int): number of rotations of each grid
+
+    Returns:
+        npt.NDArray: rotations (sections x points)
+    """
+    start = np.asarray(start, dtype=float)[:, np.newaxis]
+    end = np.asarray(end, dtype=float)[:, np.newaxis]
+    thetas = start * (end / start)**np.linspace(0., 1., n_points)
+    thetas[:, -1:] = end
+    return thetas
+
+
+def trace_backbone(sections: List[CompiledSection],
+                   yielding_points: Tuple[npt.NDArray, npt.NDArray],
+                   failure_points: Tuple[npt.NDArray, npt.NDArray],
+                   tendon_points: Tuple[npt.NDArray, npt.NDArray],
+                   n_points: int) -> List[Tuple[npt.NDArray, npt.NDArray, int]]:
+    """
+    Traces the neutral axis of the sections from steel yielding to steel
+    failure, then with failed steel up to tendon failure for the sections
+    with tendon. All the sections are traced together
+
+    Args:
+        sections (List[CompiledSection]): sections
+        yielding_points (Tuple[npt.NDArray, npt.NDArray]): theta and neutral axis at steel yielding
+        failure_points (Tuple[npt.NDArray, npt.NDArray]): theta and neutral axis at steel failure
+        tendon_points (Tuple[npt.NDArray, npt.NDArray]): theta and neutral axis at
+            tendon failure, nan for sections without tendon
+        n_points (int): number of rotations of each segment
+
+    Returns:
+        List[Tuple[npt.NDArray, npt.NDArray, int]]: rotations, neutral axis
+            depths and index of the steel failure point of each section
+    """
+    arrays = section_arrays(sections)
+    intact_thetas = backbone_thetas(yielding_points[0], failure_points[0], n_points)
+    intact_axes = trace_neutral_axis(arrays, intact_thetas, yielding_points[1])
+
+    has_tendon = np.array([section.has_tendon for section in sections])
+    failed_thetas = backbone_thetas(failure_points[0], tendon_points[0], n_points)
+    failed_axes = np.full_like(failed_thetas, np.nan)
+    if np.any(has_tendon):
+        tendon_arrays = arrays.take(has_tendon)
+        failed_axes[has_tendon] = trace_neutral_axis(
+            tendon_arrays,
+            failed_thetas[has_tendon],
+            solve_neutral_axis(
+                tendon_arrays,
+                failure_points[0][has_tendon],
+                guess=failure_points[1][has_tendon],
+                steel_failure=True
+            ),
+            steel_failure=True
+        )
+
+    backbones = []
+    for i in range(len(sections)):
+        if has_tendon[i]:
+            # steel failure closes the intact segment, the failed one starts after it
+            backbones.append((
+                np.concatenate([intact_thetas[i], failed_thetas[i, 1:]]),
+                np.concatenate([intact_axes[i], failed_axes[i, 1:]]),
+                n_points - 1
+            ))
+        else:
+            backbones.append((intact_thetas[i], intact_axes[i], n_points - 1))
+    return backbones
+
+
+def simplify_backbone(thetas: npt.ArrayLike,
+                      moments: npt.ArrayLike,
+                      fixed_points: Sequence[int],
+                      max_points: int,
+                      tolerance: float) -> List[int]:
+    """
+    Picks the points of a multilinear approximation of a curve. Starting from
+    the fixed points, the point farthest from the multilinear is added until
+    the largest moment error is within tolerance times the peak moment or
+    max_points points are added
+
+    Args:
+        thetas (npt.ArrayLike): increasing rotations of the curve
+        moments (npt.ArrayLike): moments of the curve
+        fixed_points (Sequence[int]): indices of the points always kept
+        max_points (int): most points added to the fixed ones
+        tolerance (float): moment error relative to the peak moment
+
+    Returns:
+        List[int]: sorted indices of the points
+    """
+    thetas = np.asarray(thetas, dtype=float)
+    moments = np.asarray(moments, dtype=float)
+    points = sorted(set(fixed_points))
+    error_bound = tolerance * np.max(np.abs(moments))
+    for _ in range(max_points):
+        errors = np.abs(moments - np.interp(thetas, thetas[points], moments[points]))
+        farthest = int(np.argmax(errors))
+        if errors[farthest] <= error_bound:
+            break
+        points = sorted(points + [farthest])
+    return points
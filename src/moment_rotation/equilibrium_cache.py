@@ -0,0 +1,94 @@
+from typing import Dict, List, Tuple, Union
+
+import numpy as np
+import numpy.typing as npt
+
+from model.enums import EquilibriumState
+from ..classes import Section, Frame, CompiledSection
+
+from .section_solver import (SectionArrays, section_arrays, solve_neutral_axis,
+                             solve_steel_strain, solve_tendon_strain, solve_timber_strain)
+
+
+# Solved (theta, neutral axis) points, keyed by state and by section
+# constants, neutral axis guess and theta. The constants identify the
+# section and its frame, so frames imported again by each analysis share
+# the points
+_EQUILIBRIUM_POINTS: Dict[tuple, Tuple[float, float]] = {}
+
+
+def clear_equilibrium_points() -> None:
+    """
+    Empties the solved equilibrium points
+    """
+    _EQUILIBRIUM_POINTS.clear()
+
+
+def _solve_state(arrays: SectionArrays,
+                 state: EquilibriumState,
+                 guess: npt.NDArray,
+                 theta: npt.NDArray) -> Tuple[npt.NDArray, npt.NDArray]:
+    """
+    Solves a state for all the sections of arrays
+    """
+    if state == EquilibriumState.SteelYielding:
+        return solve_steel_strain(arrays, arrays.steel_epsilon_y, guess=guess)
+    if state == EquilibriumState.SteelFailure:
+        return solve_steel_strain(arrays, arrays.steel_epsilon_u, guess=guess)
+    if state == EquilibriumState.TendonFailure:
+        return solve_tendon_strain(arrays, arrays.tendon_epsilon_y, guess=guess)
+    if state == EquilibriumState.TimberYielding:
+        return solve_timber_strain(arrays, arrays.timber_limit_strain, guess=guess)
+    return theta, solve_neutral_axis(arrays, theta, guess=guess)
+
+
+def equilibrium_points(sections: List[Union[Section, CompiledSection]],
+                       frame: Frame,
+                       state: EquilibriumState,
+                       guess: npt.ArrayLike = None,
+                       theta: npt.ArrayLike = None) -> Tuple[npt.NDArray, npt.NDArray]:
+    """
+    Rotations and neutral axis depths of the sections at a state. Each point
+    is solved once, points not solved yet are solved together and stored
+
+    Args:
+        sections (List[Union[Section, CompiledSection]]): sections
+        frame (Frame): frame containing the sections
+        state (EquilibriumState): limit state, or the neutral axis at theta
+        guess (npt.ArrayLike, optional): neutral axis guess of each section.
+            Defaults to the shallowest root.
+        theta (npt.ArrayLike, optional): rotation of each section, for the
+            neutral axis state. Defaults to None.
+
+    Returns:
+        Tuple[npt.NDArray, npt.NDArray]: theta, neutral axis, nan where no
+            equilibrium is found
+    """
+    arrays = section_arrays(sections, frame)
+    size = len(sections)
+    guesses = np.full(size, np.nan) if guess is None else np.broadcast_to(
+        np.asarray(guess, dtype=float), (size,)
+    )
+    thetas = np.full(size, np.nan) if theta is None else np.broadcast_to(
+        np.asarray(theta, dtype=float), (size,)
+    )
+    # as bytes, so that sections without tendon (nan constants) match too
+    constants = np.column_stack(list(arrays.__dict__.values()) + [guesses, thetas])
+    state_name = EquilibriumState(state).value
+    keys = [(state_name, section_constants.tobytes()) for section_constants in constants]
+
+    missing = list({
+        key: index for index, key in enumerate(keys) if key not in _EQUILIBRIUM_POINTS
+    }.values())
+    if missing:
+        solved_thetas, solved_axes = _solve_state(
+            arrays.take(missing),
+            state,
+            guess=None if guess is None else guesses[missing],
+            theta=thetas[missing]
+        )
+        for index, solved_theta, solved_axis in zip(missing, solved_thetas, solved_axes):
+            _EQUILIBRIUM_POINTS[keys[index]] = (float(solved_theta), float(solved_axis))
+
+    points = np.array([_EQUILIBRIUM_POINTS[key] for key in keys]).reshape(size, 2)
+    return points[:, 0], points[:, 1]
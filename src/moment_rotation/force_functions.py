@@ -1,122 +1,130 @@
-from re import M
 from typing import Tuple
-from functools import cache
-from ..classes import Section, Frame
+
+import numpy as np
+import numpy.typing as npt
+
+from ..classes import Section, Frame, compile_section
+from .section_solver import SectionConstants
 from .strain_functions import steel_strain, tendon_strain, timber_strain
 
 
-def tendon_force(theta: float, neutral_axis: float,
-                 section: Section, frame: Frame) -> float:
+def tendon_force(theta: npt.ArrayLike, neutral_axis: npt.ArrayLike,
+                 section: SectionConstants, frame: Frame = None) -> npt.ArrayLike:
     """
     Computes the tendon force
 
     Args:
-        theta (float): rotation of connection
-        neutral_axis (float): neutral axis depth (from top)   
-        section (Section): section
-        frame (Frame): frame containing the section
+        theta (npt.ArrayLike): rotation of connection
+        neutral_axis (npt.ArrayLike): neutral axis depth (from top)   
+        section (SectionConstants): section, compiled section or section arrays
+        frame (Frame, optional): frame containing the section, not needed by
+            compiled sections. Defaults to None.
 
     Returns:
-        float: force value
+        npt.ArrayLike: force value
     """
-    if section.tendon is not None:
-        strain = tendon_strain(
-            theta=theta,
-            neutral_axis=neutral_axis,
-            section=section,
-            frame=frame
-        )
-        return strain * section.tendon.E * section.post_tensioning_area
-
-    else:
-        return 0
+    section = compile_section(section, frame)
+    strain = tendon_strain(
+        theta=theta,
+        neutral_axis=neutral_axis,
+        section=section
+    )
+    # the post tensioning stiffness is zero for sections without tendon
+    return strain * section.tendon_stiffness
 
 
-def steel_force(theta: float, neutral_axis: float,
-                 section: Section) -> Tuple[float]:
+def steel_force(theta: npt.ArrayLike, neutral_axis: npt.ArrayLike,
+                section: SectionConstants) -> Tuple[npt.ArrayLike]:
     """
     Computes the steel bar force for bottom and top reinforcement
 
     Args:
-        theta (float): rotation of connection
-        neutral_axis (float): neutral axis depth (from top)
-        section (Section): section
+        theta (npt.ArrayLike): rotation of connection
+        neutral_axis (npt.ArrayLike): neutral axis depth (from top)
+        section (SectionConstants): section, compiled section or section arrays
 
     Returns:
-        Tuple[float]: bottom force, top force
+        Tuple[npt.ArrayLike]: bottom force, top force
     """
     strains = steel_strain(
         theta=theta,
         neutral_axis=neutral_axis,
         section=section
     )
+    if isinstance(section, Section):
+        stress_from_strain = section.steel.stress_from_strain
+
+    else:
+        stress_from_strain = section.steel_stress
+
     return tuple(
-        section.steel.stress_from_strain(strain) * section.steel_area 
+        stress_from_strain(strain) * section.steel_area 
         for strain in strains
     )
 
 
-def timber_force(theta: float, neutral_axis: float,
-                 section: Section, frame: Frame) -> float:
+def timber_force(theta: npt.ArrayLike, neutral_axis: npt.ArrayLike,
+                 section: SectionConstants, frame: Frame = None) -> npt.ArrayLike:
     """
     Computes the timber force of the section
 
     Args:
-        theta (float): rotation of the connection
-        neutral_axis (float): neutral axis depth (from top)
-        section (Section): section
-        frame (Frame): frame containing the section
+        theta (npt.ArrayLike): rotation of the connection
+        neutral_axis (npt.ArrayLike): neutral axis depth (from top)
+        section (SectionConstants): section, compiled section or section arrays
+        frame (Frame, optional): frame containing the section, not needed by
+            compiled sections. Defaults to None.
 
 
     Returns:
-        float: timber max force
+        npt.ArrayLike: timber max force
     """
+    section = compile_section(section, frame)
     strain = timber_strain(
         theta=theta,
         neutral_axis=neutral_axis,
-        section=section,
-        frame=frame
+        section=section
     )
-    timber_limit_strain = section.timber.epsilon_lim(section.connection_stiffness_ratio)
-    if strain <= timber_limit_strain:
-        return .5 * section.connection_stiffness * strain * section.b * neutral_axis
-
-    else:
-        plastic_depth = max(
-            0, 
-            neutral_axis * (strain - timber_limit_strain)/timber_limit_strain
-        )
-        return (.5 * timber_limit_strain * section.connection_stiffness 
-                * section.b * (plastic_depth + neutral_axis))
+    timber_limit_strain = section.timber_limit_strain
+    plastic_depth = np.maximum(
+        0, 
+        neutral_axis * (strain - timber_limit_strain)/timber_limit_strain
+    )
+    return np.where(
+        strain <= timber_limit_strain,
+        .5 * section.connection_stiffness * strain * section.b * neutral_axis,
+        (.5 * timber_limit_strain * section.connection_stiffness 
+         * section.b * (plastic_depth + neutral_axis))
+    )[()]
 
 
-def force_inbalance(theta: float, neutral_axis: float,
-                    section: Section, frame: Frame,
-                    steel_failure: bool = False) -> float:
+def force_inbalance(theta: npt.ArrayLike, neutral_axis: npt.ArrayLike,
+                    section: SectionConstants, frame: Frame = None,
+                    steel_failure: bool = False) -> npt.ArrayLike:
     """
     Computes the relative inbalance of forces in the section
 
     Args:
-        theta (float): connection rotation
-        neutral_axis (float): neutral axis depth (from top)
-        section (Section): section
-        frame (Frame): frame containing the section
+        theta (npt.ArrayLike): connection rotation
+        neutral_axis (npt.ArrayLike): neutral axis depth (from top)
+        section (SectionConstants): section, compiled section or section arrays
+        frame (Frame, optional): frame containing the section, not needed by
+            compiled sections. Defaults to None.
         steel_failure (bool): consider the steel as failed
  
     Returns:
-        float: force inbalance
+        npt.ArrayLike: force inbalance
     """
+    section = compile_section(section, frame)
     timber_f = timber_force(
         theta=theta,
         neutral_axis=neutral_axis,
-        section=section,
-        frame=frame
+        section=section
     )
     tendon_f = tendon_force(
         theta=theta,
         neutral_axis=neutral_axis,
-        section=section,
-        frame=frame
+        section=section
     )
     if steel_failure:
         steel_fs = [0]
@@ -129,6 +137,3 @@ def force_inbalance(theta: float, neutral_axis: float,
         )
         
     return timber_f - sum(steel_fs) - tendon_f - section.axial_load
-
-
-
@@ -1,31 +1,37 @@
+import numpy as np
+import numpy.typing as npt
+
+from .section_solver import SectionConstants
 from .strain_functions import timber_strain
 from .force_functions import steel_force, tendon_force
 
-from ..classes import Section, Frame
+from ..classes import Frame, compile_section
 
 
-def timber_resultant_depth(theta: float, neutral_axis: float,
-                           section: Section, frame: Frame) -> float:
+def timber_resultant_depth(theta: npt.ArrayLike, neutral_axis: npt.ArrayLike,
+                           section: SectionConstants, frame: Frame = None) -> npt.ArrayLike:
     """
     Get the depth of the timber compression resultant force
 
     Args:
-        theta (float): theta
-        neutral_axis (float): neutral axis depth (from top)
-        section (Section): section
-        frame (Frame): frame containing the section
+        theta (npt.ArrayLike): theta
+        neutral_axis (npt.ArrayLike): neutral axis depth (from top)
+        section (SectionConstants): section, compiled section or section arrays
+        frame (Frame, optional): frame containing the section, not needed by
+            compiled sections. Defaults to None.
 
     Returns:
-        float: resultant depth
+        npt.ArrayLike: resultant depth
     """
+    section = compile_section(section, frame)
     timber_epsilon = timber_strain(
         theta=theta,
         neutral_axis=neutral_axis,
-        section=section,
-        frame=frame
+        section=section
     )
-    timber_epsilon_lim = section.timber.epsilon_lim(section.connection_stiffness_ratio)
-    plastic_depth = max(
+    timber_epsilon_lim = section.timber_limit_strain
+    neutral_axis = np.asarray(neutral_axis, dtype=float)
+    plastic_depth = np.maximum(
         0, 
         neutral_axis * (timber_epsilon - timber_epsilon_lim) / timber_epsilon_lim
     )
@@ -36,20 +42,22 @@ def timber_resultant_depth(theta: float, neutral_axis: float,
     )
 
 
-def steel_moment(theta: float, neutral_axis: float,
-                 section: Section, frame: Frame) -> float:
+def steel_moment(theta: npt.ArrayLike, neutral_axis: npt.ArrayLike,
+                 section: SectionConstants, frame: Frame = None) -> npt.ArrayLike:
     """
     Get the moment contribution of steel
 
     Args:
-        theta (float): theta
-        neutral_axis (float): neutral axis depth (from top)
-        section (Section): section
-        frame (Frame): frame containing the section
+        theta (npt.ArrayLike): theta
+        neutral_axis (npt.ArrayLike): neutral axis depth (from top)
+        section (SectionConstants): section, compiled section or section arrays
+        frame (Frame, optional): frame containing the section, not needed by
+            compiled sections. Defaults to None.
 
     Returns:
-        float: moment
+        npt.ArrayLike: moment
     """
+    section = compile_section(section, frame)
     steel_f_bot, steel_f_top = steel_force(
         theta=theta,
         neutral_axis=neutral_axis,
@@ -58,8 +66,7 @@ def steel_moment(theta: float, neutral_axis: float,
     moment_pole = timber_resultant_depth(
         theta=theta,
         neutral_axis=neutral_axis,
-        section=section,
-        frame=frame
+        section=section
     )
     return sum(
         [
@@ -69,54 +76,55 @@ def steel_moment(theta: float, neutral_axis: float,
     )
 
 
-def tendon_moment(theta: float, neutral_axis: float,
-                  section: Section, frame: Frame) -> float:
+def tendon_moment(theta: npt.ArrayLike, neutral_axis: npt.ArrayLike,
+                  section: SectionConstants, frame: Frame = None) -> npt.ArrayLike:
     """
     Get the moment contribution of tendon
 
     Args:
-        theta (float): theta
-        neutral_axis (float): neutral axis depth (from top)
-        section (Section): section
-        frame (Frame): frame containing the section
+        theta (npt.ArrayLike): theta
+        neutral_axis (npt.ArrayLike): neutral axis depth (from top)
+        section (SectionConstants): section, compiled section or section arrays
+        frame (Frame, optional): frame containing the section, not needed by
+            compiled sections. Defaults to None.
 
     Returns:
-        float: moment
+        npt.ArrayLike: moment
     """
+    section = compile_section(section, frame)
     tendon_f = tendon_force(
         theta=theta,
         neutral_axis=neutral_axis,
-        section=section,
-        frame=frame
+        section=section
     )
     moment_pole = timber_resultant_depth(
         theta=theta,
         neutral_axis=neutral_axis,
-        section=section,
-        frame=frame
+        section=section
     )
     return (.5*section.h - moment_pole) * tendon_f
 
 
-def axial_moment(theta: float, neutral_axis: float,
-                 section: Section, frame: Frame) -> float:
+def axial_moment(theta: npt.ArrayLike, neutral_axis: npt.ArrayLike,
+                 section: SectionConstants, frame: Frame = None) -> npt.ArrayLike:
     """
     Get the moment contribution of axial load
 
     Args:
-        theta (float): theta
-        neutral_axis (float): neutral axis depth (from top)
-        section (Section): section
-        frame (Frame): frame containing the section
+        theta (npt.ArrayLike): theta
+        neutral_axis (npt.ArrayLike): neutral axis depth (from top)
+        section (SectionConstants): section, compiled section or section arrays
+        frame (Frame, optional): frame containing the section, not needed by
+            compiled sections. Defaults to None.
 
     Returns:
-        float: moment
+        npt.ArrayLike: moment
     """
+    section = compile_section(section, frame)
     moment_pole = timber_resultant_depth(
         theta=theta,
         neutral_axis=neutral_axis,
-        section=section,
-        frame=frame
+        section=section
     )
     return (.5*section.h - moment_pole) * section.axial_load
 
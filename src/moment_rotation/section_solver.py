@@ -0,0 +1,426 @@
+from dataclasses import dataclass, fields
+from typing import Callable, List, Tuple, Union
+
+import numpy as np
+import numpy.typing as npt
+
+from ..classes import Section, Frame, CompiledSection, compile_section
+
+
+@dataclass(frozen=True)
+class SectionArrays:
+    """
+    Dataclass containing the constants of the force balance of a set of
+    sections, one value per section
+    """
+    b: npt.NDArray
+    h: npt.NDArray
+    axial_load: npt.NDArray
+    bottom_reinforcement_depth: npt.NDArray
+    top_reinforcement_depth: npt.NDArray
+    bar_length: npt.NDArray
+    steel_area: npt.NDArray
+    steel_E: npt.NDArray
+    steel_fy: npt.NDArray
+    steel_epsilon_y: npt.NDArray
+    steel_epsilon_u: npt.NDArray
+    steel_hardening_ratio: npt.NDArray
+    connection_stiffness: npt.NDArray
+    timber_limit_strain: npt.NDArray
+    cantilever_length: npt.NDArray
+    tendon_stiffness: npt.NDArray
+    tendon_initial_strain: npt.NDArray
+    tendon_epsilon_y: npt.NDArray
+    tendon_strain_ratio: npt.NDArray
+
+    def take(self, indices: npt.ArrayLike) -> 'SectionArrays':
+        """
+        Constants of a subset of the sections
+
+        Args:
+            indices (npt.ArrayLike): indices of the sections
+
+        Returns:
+            SectionArrays: section constants
+        """
+        return SectionArrays(**{
+            name: value[indices] for name, value in self.__dict__.items()
+        })
+
+    def steel_stress(self, strain: npt.ArrayLike) -> npt.NDArray:
+        """
+        Steel stress of each section given the strain, as Steel.stress_from_strain
+
+        Args:
+            strain (npt.ArrayLike): strain values, broadcast against the sections
+
+        Returns:
+            npt.NDArray: stress values
+        """
+        return _steel_stress(np.asarray(strain, dtype=float), self)[0]
+
+
+# Sections accepted by the strain, force and moment functions, SectionArrays
+# evaluate many sections at once
+SectionConstants = Union[Section, CompiledSection, SectionArrays]
+
+
+def section_arrays(sections: List[Union[Section, CompiledSection]],
+                   frame: Frame = None) -> SectionArrays:
+    """
+    Collects the constants of the force balance of the sections, a section
+    may be repeated to solve it for several targets at once
+
+    Args:
+        sections (List[Union[Section, CompiledSection]]): sections
+        frame (Frame, optional): frame containing the sections, not needed by
+            compiled sections. Defaults to None.
+
+    Returns:
+        SectionArrays: section constants
+    """
+    compiled_sections = [compile_section(section, frame) for section in sections]
+    return SectionArrays(**{
+        constant.name: np.array(
+            [getattr(compiled_section, constant.name) for compiled_section in compiled_sections],
+            dtype=float
+        )
+        for constant in fields(SectionArrays)
+    })
+
+
+def _steel_stress(strain: npt.NDArray,
+                  arrays: SectionArrays) -> Tuple[npt.NDArray, npt.NDArray]:
+    """
+    Steel stress and its derivative with respect to the strain, same law of
+    Steel.stress_from_strain
+    """
+    elastic = np.abs(strain) <= arrays.steel_epsilon_y
+    stress_sign = np.sign(strain)
+    stress = np.where(
+        elastic,
+        strain * arrays.steel_E,
+        stress_sign * arrays.steel_fy * (
+            1 + arrays.steel_hardening_ratio * (strain / arrays.steel_epsilon_y - 1)
+        )
+    )
+    tangent = np.where(
+        elastic,
+        arrays.steel_E,
+        stress_sign * arrays.steel_fy * arrays.steel_hardening_ratio / arrays.steel_epsilon_y
+    )
+    return stress, tangent
+
+
+def force_balance(theta: npt.ArrayLike,
+                  neutral_axis: npt.ArrayLike,
+                  arrays: SectionArrays,
+                  steel_failure: bool = False) -> Tuple[npt.NDArray, npt.NDArray, npt.NDArray]:
+    """
+    Force inbalance of the sections, as force_inbalance, with its closed form
+    derivatives. Arguments broadcast against the section constants
+
+    Args:
+        theta (npt.ArrayLike): connection rotation
+        neutral_axis (npt.ArrayLike): neutral axis depth (from top)
+        arrays (SectionArrays): section constants
+        steel_failure (bool, optional): consider the steel as failed. Defaults to False.
+
+    Returns:
+        Tuple[npt.NDArray, npt.NDArray, npt.NDArray]: force inbalance and its
+            derivatives with respect to theta and to the neutral axis
+    """
+    theta = np.asarray(theta, dtype=float)
+    neutral_axis = np.asarray(neutral_axis, dtype=float)
+
+    # timber, beyond the limit strain the plastic depth gives the same
+    # resultant of the elastic triangle .5 * k * strain * b * c
+    timber_coefficient = 1.5 * arrays.connection_stiffness * arrays.b / arrays.cantilever_length
+    balance = timber_coefficient * theta * neutral_axis**2
+    d_theta = timber_coefficient * neutral_axis**2
+    d_axis = 2 * timber_coefficient * theta * neutral_axis
+
+    # tendon
+    tendon_arm = .5 * arrays.h - neutral_axis
+    tendon_strain = theta * tendon_arm * arrays.tendon_strain_ratio + arrays.tendon_initial_strain
+    balance = balance - arrays.tendon_stiffness * tendon_strain
+    d_theta = d_theta - arrays.tendon_stiffness * arrays.tendon_strain_ratio * tendon_arm
+    d_axis = d_axis + arrays.tendon_stiffness * arrays.tendon_strain_ratio * theta
+
+    # steel bars
+    if not steel_failure:
+        for depth in (arrays.bottom_reinforcement_depth, arrays.top_reinforcement_depth):
+            bar_arm = (depth - neutral_axis) / arrays.bar_length
+            stress, tangent = _steel_stress(theta * bar_arm, arrays)
+            balance = balance - arrays.steel_area * stress
+            d_theta = d_theta - arrays.steel_area * tangent * bar_arm
+            d_axis = d_axis + arrays.steel_area * tangent * theta / arrays.bar_length
+
+    return balance - arrays.axial_load, d_theta, d_axis
+
+
+def _bracketed_newton(residual: Callable[[npt.NDArray], Tuple[npt.NDArray, npt.NDArray]],
+                      lower: npt.NDArray,
+                      upper: npt.NDArray,
+                      guess: npt.NDArray = None,
+                      samples: int = 64,
+                      xtol: float = 1e-12,
+                      max_iterations: int = 100) -> npt.NDArray:
+    """
+    Roots of a set of scalar functions, each within its own bounds. Every
+    function is sampled to bracket a sign change, the one nearest the guess,
+    then Newton steps falling back to bisection outside the bracket refine
+    all the roots together. residual takes the unknowns as (functions x points)
+    and returns values and derivatives, non finite values are skipped.
+    Functions without a sign change get nan
+    """
+    fractions = np.linspace(0., 1., samples)
+    grid = lower[:, np.newaxis] + (upper - lower)[:, np.newaxis] * fractions
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        values, _ = residual(grid)
+    finite = np.isfinite(values)
+    sign_change = (finite[:, :-1] & finite[:, 1:]
+                   & (np.sign(values[:, :-1]) != np.sign(values[:, 1:])))
+    found = np.any(sign_change, axis=1)
+
+    if guess is None:
+        interval = np.argmax(sign_change, axis=1)
+    else:
+        midpoints = .5 * (grid[:, :-1] + grid[:, 1:])
+        distance = np.where(sign_change, np.abs(midpoints - guess[:, np.newaxis]), np.inf)
+        interval = np.argmin(distance, axis=1)
+    rows = np.arange(grid.shape[0])
+    low, high = grid[rows, interval], grid[rows, interval + 1]
+    low_value = values[rows, interval]
+
+    root = .5 * (low + high)
+    for _ in range(max_iterations):
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            value, derivative = (array[:, 0] for array in residual(root[:, np.newaxis]))
+            same_side = np.sign(value) == np.sign(low_value)
+            low = np.where(same_side, root, low)
+            high = np.where(same_side, high, root)
+            newton = root - value / derivative
+        inside = np.isfinite(newton) & (newton > low) & (newton < high)
+        new_root = np.where(inside, newton, .5 * (low + high))
+        new_root = np.where(value == 0, root, new_root)
+        converged = np.abs(new_root - root) <= xtol
+        root = new_root
+        if np.all(converged | ~found):
+            break
+
+    return np.where(found, root, np.nan)
+
+
+def _column(arrays: SectionArrays) -> SectionArrays:
+    """
+    Section constants as columns, to broadcast against sampled unknowns
+    """
+    return SectionArrays(**{
+        name: value[:, np.newaxis] for name, value in arrays.__dict__.items()
+    })
+
+
+def solve_neutral_axis(arrays: SectionArrays,
+                       theta: npt.ArrayLike,
+                       guess: npt.ArrayLike = None,
+                       steel_failure: bool = False) -> npt.NDArray:
+    """
+    Neutral axis depths balancing the forces of the sections at given
+    rotations, searched between zero and the section depth
+
+    Args:
+        arrays (SectionArrays): section constants
+        theta (npt.ArrayLike): connection rotation of each section
+        guess (npt.ArrayLike, optional): neutral axis guess, selects the root
+            when more than one is found. Defaults to the shallowest root.
+        steel_failure (bool, optional): consider the steel as failed. Defaults to False.
+
+    Returns:
+        npt.NDArray: neutral axis depths, nan where no root is found
+    """
+    size = arrays.h.size
+    theta = np.broadcast_to(np.asarray(theta, dtype=float), (size,))[:, np.newaxis]
+    columns = _column(arrays)
+
+    def residual(neutral_axis: npt.NDArray) -> Tuple[npt.NDArray, npt.NDArray]:
+        balance, _, d_axis = force_balance(theta, neutral_axis, columns, steel_failure)
+        return balance, d_axis
+
+    return _bracketed_newton(
+        residual,
+        lower=np.zeros(size),
+        upper=arrays.h.copy(),
+        guess=None if guess is None else np.broadcast_to(np.asarray(guess, dtype=float), (size,))
+    )
+
+
+def trace_neutral_axis(arrays: SectionArrays,
+                       thetas: npt.NDArray,
+                       initial_axis: npt.ArrayLike,
+                       steel_failure: bool = False,
+                       xtol: float = 1e-9,
+                       max_iterations: int = 8) -> npt.NDArray:
+    """
+    Neutral axis depths along increasing rotations by continuation. Each point
+    starts from the tangent predictor of the previous one, -dF/dtheta / dF/dc
+    times the rotation step, and is corrected by Newton steps. The corrector
+    stops at a step within xtol, the error left being about its square.
+    Points whose corrector does not converge within the section are solved
+    with the bracketed solver
+
+    Args:
+        arrays (SectionArrays): section constants
+        thetas (npt.NDArray): rotations of each section (sections x points)
+        initial_axis (npt.ArrayLike): neutral axis at the first rotation of each section
+        steel_failure (bool, optional): consider the steel as failed. Defaults to False.
+        xtol (float, optional): last Newton step of the corrector. Defaults to 1e-9.
+        max_iterations (int, optional): Newton steps of each corrector. Defaults to 8.
+
+    Returns:
+        npt.NDArray: neutral axis depths (sections x points), nan where no
+            root is found
+    """
+    thetas = np.asarray(thetas, dtype=float)
+    neutral_axes = np.empty_like(thetas)
+    neutral_axes[:, 0] = initial_axis
+    with np.errstate(divide='ignore', invalid='ignore'):
+        _, d_theta, d_axis = force_balance(thetas[:, 0], neutral_axes[:, 0], arrays, steel_failure)
+        for point in range(1, thetas.shape[1]):
+            theta = thetas[:, point]
+            neutral_axis = neutral_axes[:, point - 1] - d_theta / d_axis * (theta - thetas[:, point - 1])
+            converged = np.zeros(theta.size, dtype=bool)
+            for _ in range(max_iterations):
+                balance, d_theta, d_axis = force_balance(theta, neutral_axis, arrays, steel_failure)
+                step = balance / d_axis
+                neutral_axis = neutral_axis - step
+                converged = np.abs(step) <= xtol
+                if np.all(converged | np.isnan(neutral_axis)):
+                    break
+
+            failed = ~(converged & (neutral_axis > 0) & (neutral_axis <= arrays.h))
+            if np.any(failed):
+                neutral_axis[failed] = solve_neutral_axis(
+                    arrays.take(failed),
+                    theta[failed],
+                    guess=neutral_axes[failed, point - 1],
+                    steel_failure=steel_failure
+                )
+                _, d_theta, d_axis = force_balance(theta, neutral_axis, arrays, steel_failure)
+            neutral_axes[:, point] = neutral_axis
+    return neutral_axes
+
+
+def _solve_strain_condition(arrays: SectionArrays,
+                            rotation_constant: npt.NDArray,
+                            arm_offset: npt.NDArray,
+                            arm_slope: float,
+                            upper: npt.NDArray,
+                            guess: npt.ArrayLike = None,
+                            steel_failure: bool = False) -> Tuple[npt.NDArray, npt.NDArray]:
+    """
+    Rotations and neutral axis depths balancing the forces under a strain
+    condition linear in the rotation, written as
+    theta = rotation_constant / (arm_offset + arm_slope * neutral_axis)
+    so that the force balance only depends on the neutral axis
+    """
+    size = arrays.h.size
+    rotation_constant = np.broadcast_to(rotation_constant, (size,))
+    arm_offset = np.broadcast_to(arm_offset, (size,))
+    columns = _column(arrays)
+
+    def rotation(neutral_axis: npt.NDArray) -> Tuple[npt.NDArray, npt.NDArray]:
+        arm = arm_offset[:, np.newaxis] + arm_slope * neutral_axis
+        theta = rotation_constant[:, np.newaxis] / arm
+        return theta, -theta * arm_slope / arm
+
+    def residual(neutral_axis: npt.NDArray) -> Tuple[npt.NDArray, npt.NDArray]:
+        theta, d_rotation = rotation(neutral_axis)
+        balance, d_theta, d_axis = force_balance(theta, neutral_axis, columns, steel_failure)
+        return balance, d_axis + d_theta * d_rotation
+
+    neutral_axis = _bracketed_newton(
+        residual,
+        lower=np.zeros(size),
+        upper=np.asarray(upper, dtype=float),
+        guess=None if guess is None else np.broadcast_to(np.asarray(guess, dtype=float), (size,))
+    )
+    with np.errstate(divide='ignore', invalid='ignore'):
+        theta, _ = rotation(neutral_axis[:, np.newaxis])
+    return theta[:, 0], neutral_axis
+
+
+def solve_steel_strain(arrays: SectionArrays,
+                       strain: npt.ArrayLike,
+                       guess: npt.ArrayLike = None) -> Tuple[npt.NDArray, npt.NDArray]:
+    """
+    Rotations and neutral axis depths at a bottom bar strain
+
+    Args:
+        arrays (SectionArrays): section constants
+        strain (npt.ArrayLike): target strain of each section
+        guess (npt.ArrayLike, optional): neutral axis guess. Defaults to None.
+
+    Returns:
+        Tuple[npt.NDArray, npt.NDArray]: theta, neutral axis
+    """
+    return _solve_strain_condition(
+        arrays,
+        rotation_constant=np.asarray(strain, dtype=float) * arrays.bar_length,
+        arm_offset=arrays.bottom_reinforcement_depth,
+        arm_slope=-1.,
+        upper=arrays.bottom_reinforcement_depth,
+        guess=guess
+    )
+
+
+def solve_tendon_strain(arrays: SectionArrays,
+                        strain: npt.ArrayLike,
+                        guess: npt.ArrayLike = None) -> Tuple[npt.NDArray, npt.NDArray]:
+    """
+    Rotations and neutral axis depths at a tendon strain, with failed steel
+
+    Args:
+        arrays (SectionArrays): section constants
+        strain (npt.ArrayLike): target strain of each section
+        guess (npt.ArrayLike, optional): neutral axis guess. Defaults to None.
+
+    Returns:
+        Tuple[npt.NDArray, npt.NDArray]: theta, neutral axis
+    """
+    return _solve_strain_condition(
+        arrays,
+        rotation_constant=(
+            (np.asarray(strain, dtype=float) - arrays.tendon_initial_strain)
+            / arrays.tendon_strain_ratio
+        ),
+        arm_offset=.5 * arrays.h,
+        arm_slope=-1.,
+        upper=.5 * arrays.h,
+        guess=guess,
+        steel_failure=True
+    )
+
+
+def solve_timber_strain(arrays: SectionArrays,
+                        strain: npt.ArrayLike,
+                        guess: npt.ArrayLike = None) -> Tuple[npt.NDArray, npt.NDArray]:
+    """
+    Rotations and neutral axis depths at a timber strain
+
+    Args:
+        arrays (SectionArrays): section constants
+        strain (npt.ArrayLike): target strain of each section
+        guess (npt.ArrayLike, optional): neutral axis guess. Defaults to None.
+
+    Returns:
+        Tuple[npt.NDArray, npt.NDArray]: theta, neutral axis
+    """
+    return _solve_strain_condition(
+        arrays,
+        rotation_constant=np.asarray(strain, dtype=float) * arrays.cantilever_length / 3,
+        arm_offset=np.zeros_like(arrays.h),
+        arm_slope=1.,
+        upper=arrays.h,
+        guess=guess
+    )
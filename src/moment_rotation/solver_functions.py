@@ -1,10 +1,25 @@
-from typing import Iterable, List, Tuple
-from scipy.optimize import fsolve
+from typing import Iterable, Tuple
 
+import numpy as np
+import numpy.typing as npt
+
+from model.enums import EquilibriumState
 from ..classes import Section, Frame
 
-from .strain_functions import steel_strain, tendon_strain, timber_strain
-from .force_functions import force_inbalance
+from .equilibrium_cache import equilibrium_points
+
+
+def _checked_point(theta: npt.NDArray, neutral_axis: npt.NDArray,
+                   section: Section, limit: str) -> npt.NDArray:
+    """
+    Solved theta and neutral axis of a single section, raising when the
+    force balance has no root
+    """
+    if np.isnan(neutral_axis[0]):
+        raise ValueError(
+            f'no neutral axis balancing the forces at {limit} for section {section.h}x{section.b}m'
+        )
+    return np.array([theta[0], neutral_axis[0]])
 
 
 def steel_yielding(initial_guess: Iterable, section: Section,
@@ -20,36 +35,13 @@ def steel_yielding(initial_guess: Iterable, section: Section,
     Returns:
         Tuple[float]: theta, neutral_axis
     """
-    def objective_yielding(guess : Iterable) -> List[float]:
-        """
-        objective function for steel yielding
-
-        Args:
-            guess (Iterable): theta, neutral axis
-
-        Returns:
-            List[float]: balances
-        """
-        theta = guess[0]
-        neutral_axis = guess[1]
-        force_balance = force_inbalance(
-            theta=theta,
-            neutral_axis=neutral_axis,
-            section=section,
-            frame=frame
-        ) 
-        steel_epsilon = steel_strain(
-            theta=theta,
-            neutral_axis=neutral_axis,
-            section=section
-        )[0] # bottom bar
-        steel_strain_balance = steel_epsilon - section.steel.epsilon_y
-        return [
-            force_balance,
-            steel_strain_balance
-        ]
-    
-    return fsolve(objective_yielding, initial_guess, xtol=10**-3, maxfev=10**4)
+    theta, neutral_axis = equilibrium_points(
+        [section],
+        frame,
+        EquilibriumState.SteelYielding,
+        guess=initial_guess[1]
+    )
+    return _checked_point(theta, neutral_axis, section, 'steel yielding')
 
 
 def steel_failure(initial_guess : Iterable, section : Section, 
@@ -65,36 +57,13 @@ def steel_failure(initial_guess : Iterable, section : Section,
     Returns:
         Tuple[float]: theta, neutral_axis
     """
-    def objective_failure(guess : Iterable) -> List[float]:
-        """
-        objective function for steel failure
-
-        Args:
-            guess (Iterable): theta, neutral axis
-
-        Returns:
-            List[float]: balances
-        """
-        theta = guess[0]
-        neutral_axis = guess[1]
-        force_balance = force_inbalance(
-            theta=theta,
-            neutral_axis=neutral_axis,
-            section=section,
-            frame=frame
-        ) 
-        steel_epsilon = steel_strain(
-            theta=theta,
-            neutral_axis=neutral_axis,
-            section=section
-        )[0] # bottom bar
-        steel_strain_balance = steel_epsilon - section.steel.epsilon_u
-        return [
-            force_balance,
-            steel_strain_balance
-        ]
-
-    return fsolve(objective_failure, initial_guess, xtol=10**-6, maxfev=10**4)
+    theta, neutral_axis = equilibrium_points(
+        [section],
+        frame,
+        EquilibriumState.SteelFailure,
+        guess=initial_guess[1]
+    )
+    return _checked_point(theta, neutral_axis, section, 'steel failure')
 
 
 def tendon_failure(initial_guess : Iterable, section : Section, 
@@ -110,38 +79,13 @@ def tendon_failure(initial_guess : Iterable, section : Section,
     Returns:
         Tuple[float]: theta, neutral_axis
     """
-    def objective_tendon(guess: Iterable) -> List[float]:
-        """
-        objective function for tendon failure
-
-        Args:
-            guess (Iterable): theta, neutral axis
-
-        Returns:
-            List[float]: balances
-        """
-        theta = guess[0]
-        neutral_axis = guess[1]
-        force_balance = force_inbalance(
-            theta=theta,
-            neutral_axis=neutral_axis,
-            section=section,
-            frame=frame,
-            steel_failure=True
-        ) 
-        tendon_epsilon = tendon_strain(
-            theta=theta,
-            neutral_axis=neutral_axis,
-            section=section,
-            frame=frame
-        )
-        tendon_strain_balance = tendon_epsilon - section.tendon.epsilon_y
-        return [
-            force_balance,
-            tendon_strain_balance
-        ]
-
-    return fsolve(objective_tendon, initial_guess, xtol=10**-6, maxfev=10**4)
+    theta, neutral_axis = equilibrium_points(
+        [section],
+        frame,
+        EquilibriumState.TendonFailure,
+        guess=initial_guess[1]
+    )
+    return _checked_point(theta, neutral_axis, section, 'tendon failure')
 
 
 def timber_yielding(initial_guess: Iterable, section: Section,
@@ -157,39 +101,13 @@ def timber_yielding(initial_guess: Iterable, section: Section,
     Returns:
         Tuple[float]: theta, neutral_axis
     """
-    def objective_timber(guess: Iterable) -> List[float]:
-        """
-        objective function for timber yielding
-
-        Args:
-            guess (Iterable): theta, neutral axis
-
-        Returns:
-            List[float]: balances
-        """
-        theta = guess[0]
-        neutral_axis = guess[1]
-        force_balance = force_inbalance(
-            theta=theta,
-            neutral_axis=neutral_axis,
-            section=section,
-            frame=frame
-        ) 
-        timber_epsilon = timber_strain(
-            theta=theta,
-            neutral_axis=neutral_axis,
-            section=section,
-            frame=frame
-        )
-        timber_strain_balance = (
-            timber_epsilon - section.timber.epsilon_lim(section.connection_stiffness_ratio)
-        )
-        return [
-            force_balance,
-            timber_strain_balance
-        ]
-
-    return fsolve(objective_timber, initial_guess, xtol=10**-6, maxfev=10**4)
+    theta, neutral_axis = equilibrium_points(
+        [section],
+        frame,
+        EquilibriumState.TimberYielding,
+        guess=initial_guess[1]
+    )
+    return _checked_point(theta, neutral_axis, section, 'timber yielding')
 
 
 def get_neutral_axis(initial_guess: Iterable, theta: float,
@@ -206,32 +124,11 @@ def get_neutral_axis(initial_guess: Iterable, theta: float,
     Returns:
         Tuple[float]: neutral axis
     """
-    def objective_equilibrium(guess: Iterable) -> List[float]:
-        """
-        objective function for equilibrium
-
-        Args:
-            guess (Iterable): neutral axis
-
-        Returns:
-            List[float]: balances
-        """
-        neutral_axis = guess[0]
-        force_balance = force_inbalance(
-            theta=theta,
-            neutral_axis=neutral_axis,
-            section=section,
-            frame=frame
-        ) 
-        return [
-            force_balance
-        ]
-
-    return fsolve(objective_equilibrium, initial_guess, xtol=10**-6, maxfev=10**4)
-
-
-
-  
-
-
-    
\ No newline at end of file
+    theta_point, neutral_axis = equilibrium_points(
+        [section],
+        frame,
+        EquilibriumState.NeutralAxis,
+        guess=initial_guess[0],
+        theta=theta
+    )
+    return _checked_point(theta_point, neutral_axis, section, f'theta {theta}')[1:]
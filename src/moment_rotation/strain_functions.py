@@ -1,39 +1,48 @@
 from typing import Tuple
-from ..classes import Section, Frame
 
+import numpy as np
+import numpy.typing as npt
 
-def tendon_strain(theta: float, neutral_axis: float,
-                  section: Section, frame: Frame) -> float:
+from ..classes import Frame, compile_section
+from .section_solver import SectionConstants
+
+
+def tendon_strain(theta: npt.ArrayLike, neutral_axis: npt.ArrayLike,
+                  section: SectionConstants, frame: Frame = None) -> npt.ArrayLike:
     """
     Computes the tendon strain given neutral axis and theta
 
     Args:
-        theta (float): rotation of connection
-        neutral_axis (float): neutral axis depth (from top)   
-        section (Section): section
-        frame (Frame): frame containing the section
+        theta (npt.ArrayLike): rotation of connection
+        neutral_axis (npt.ArrayLike): neutral axis depth (from top)   
+        section (SectionConstants): section, compiled section or section arrays
+        frame (Frame, optional): frame containing the section, not needed by
+            compiled sections. Defaults to None.
 
     Returns:
-        float: strain value
+        npt.ArrayLike: strain value
     """
+    section = compile_section(section, frame)
+    theta, neutral_axis = np.asarray(theta, dtype=float), np.asarray(neutral_axis, dtype=float)
     tendon_delta = theta * (section.h/2 - neutral_axis)
-    delta_strain = tendon_delta * 2*frame.n_spans / frame.tendon_unbonded_length
+    delta_strain = tendon_delta * section.tendon_strain_ratio
     return delta_strain + section.tendon_initial_strain
 
 
-def steel_strain(theta: float, neutral_axis: float,
-                 section: Section) -> Tuple[float]:
+def steel_strain(theta: npt.ArrayLike, neutral_axis: npt.ArrayLike,
+                 section: SectionConstants) -> Tuple[npt.ArrayLike]:
     """
     Computes the steel bar strain for bottom and top reinforcement
 
     Args:
-        theta (float): rotation of connection
-        neutral_axis (float): neutral axis depth (from top)
-        section (Section): section
+        theta (npt.ArrayLike): rotation of connection
+        neutral_axis (npt.ArrayLike): neutral axis depth (from top)
+        section (SectionConstants): section, compiled section or section arrays
 
     Returns:
-        Tuple[float]: bottom strain, top strain
+        Tuple[npt.ArrayLike]: bottom strain, top strain
     """
+    theta, neutral_axis = np.asarray(theta, dtype=float), np.asarray(neutral_axis, dtype=float)
     steel_bar_deltas = [
         theta * (section.bottom_reinforcement_depth - neutral_axis),
         theta * (section.top_reinforcement_depth - neutral_axis)
@@ -41,27 +50,22 @@ def steel_strain(theta: float, neutral_axis: float,
     return tuple(delta / section.bar_length for delta in steel_bar_deltas)
 
 
-def timber_strain(theta: float, neutral_axis: float,
-                  section: Section, frame: Frame) -> float:
+def timber_strain(theta: npt.ArrayLike, neutral_axis: npt.ArrayLike,
+                  section: SectionConstants, frame: Frame = None) -> npt.ArrayLike:
     """
     Computes the timber strain of the section
 
     Args:
-        theta (float): rotation of the connection
-        neutral_axis (float): neutral axis depth (from top)
-        section (Section): section
-        frame (Frame): frame containing the section
+        theta (npt.ArrayLike): rotation of the connection
+        neutral_axis (npt.ArrayLike): neutral axis depth (from top)
+        section (SectionConstants): section, compiled section or section arrays
+        frame (Frame, optional): frame containing the section, not needed by
+            compiled sections. Defaults to None.
 
 
     Returns:
-        float: timber max strain
+        npt.ArrayLike: timber max strain
     """
-    if section.is_beam:
-        L_cant = .5 * (frame.span_length - frame.int_column_section.h)
-    
-    else:
-        L_cant = .5 * (frame.storey_height - frame.beam_sections[0].h)
-    
-    return neutral_axis * 3*theta/L_cant
-
-
+    section = compile_section(section, frame)
+    theta, neutral_axis = np.asarray(theta, dtype=float), np.asarray(neutral_axis, dtype=float)
+    return neutral_axis * 3*theta/section.cantilever_length
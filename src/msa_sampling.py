@@ -0,0 +1,71 @@
+from typing import Dict, List, Sequence
+
+import numpy as np
+import numpy.typing as npt
+from scipy.stats import t as student_t
+
+
+# EDPs whose medians control the sampling of a stripe
+SAMPLING_EDPS = ('Story Drift Ratio', 'Acceleration')
+
+
+def median_interval_width(edps: npt.NDArray, confidence: float) -> npt.NDArray:
+    """
+    Relative half width of the confidence interval on the median of
+    lognormally distributed EDPs, from the Student t interval on the mean
+    of their logarithm
+
+    Args:
+        edps (npt.NDArray): EDP samples (records x channels)
+        confidence (float): confidence level of the interval
+
+    Returns:
+        npt.NDArray: relative half width of each channel, inf below two records
+    """
+    n_records = edps.shape[0]
+    if n_records < 2:
+        return np.full(edps.shape[1:], np.inf)
+    log_std = np.std(np.log(edps), axis=0, ddof=1)
+    t_value = student_t.ppf(0.5 + confidence / 2, n_records - 1)
+    return np.expm1(t_value * log_std / np.sqrt(n_records))
+
+
+def stripe_converged(edp_dct: Dict[str, npt.NDArray],
+                     confidence: float,
+                     target_width: float,
+                     min_records: int) -> bool:
+    """
+    Checks if the medians of the drift and acceleration of every floor of a
+    stripe are known within the target relative half width
+
+    Args:
+        edp_dct (Dict[str, npt.NDArray]): EDPs of the stripe records (records x floors)
+        confidence (float): confidence level of the interval
+        target_width (float): largest allowed relative half width
+        min_records (int): records needed before stopping
+
+    Returns:
+        bool: True if no more records are needed
+    """
+    n_records = edp_dct[SAMPLING_EDPS[0]].shape[0]
+    if n_records < max(2, min_records):
+        return False
+    return all(
+        np.all(median_interval_width(edp_dct[key], confidence) <= target_width)
+        for key in SAMPLING_EDPS
+    )
+
+
+def shuffled_stripes(stripes_map: Sequence[Sequence[int]], seed: int = None) -> List[List[int]]:
+    """
+    Random order of the records of each stripe, in which they are run
+
+    Args:
+        stripes_map (Sequence[Sequence[int]]): case ids of each stripe
+        seed (int, optional): random generator seed. Defaults to None.
+
+    Returns:
+        List[List[int]]: shuffled case ids of each stripe
+    """
+    rng = np.random.default_rng(seed)
+    return [[int(th_id) for th_id in rng.permutation(th_ids)] for th_ids in stripes_map]
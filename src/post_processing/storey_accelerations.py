@@ -4,8 +4,12 @@ import model.paths as pth
 import os
 import numpy as np
 
+from model.validation import TimeHistoryCollectionInput
+
+from ..case_summary import absolute_accelerations
 from ..classes import Frame
 from ..utils import import_from_json, write_to_csv
+from ..waveform_library import load_waveform
 
 G = 9.81
 
@@ -20,26 +24,44 @@ def compute_floor_accelerations(save_path: Path) -> List[List[float]]:
     Returns:
         List[List[float]]: storey_accelerations
     """
+    time_history_data = TimeHistoryCollectionInput(
+        **import_from_json(pth.TIME_HISTORY_PATH)
+    )
+    time_steps = {
+        f'TH_{time_history.id:04}': time_history.time_step
+        for time_history in time_history_data.NLTHCases
+    }
+    folders = [
+        folder for folder in os.listdir(pth.OUTPUT_TH_DIR_PATH)
+        if (pth.OUTPUT_TH_DIR_PATH / folder).is_dir()
+    ]
     max_accelerations = list()
 
-    for folder in os.listdir(pth.OUTPUT_TH_DIR_PATH):
+    for folder in folders:
         folder_path = pth.OUTPUT_TH_DIR_PATH / folder
+        # first column is time
         floors_acc = np.loadtxt(
             folder_path / pth.STOREY_REL_ACC_FILE
         )
-        base_acc = np.loadtxt(
-            pth.TIMESERIES_INPUT_FOLDER / import_from_json(folder_path / pth.TH_STATS_FILE)['time_series_name']
+        stats = import_from_json(folder_path / pth.TH_STATS_FILE)
+        base_acc = load_waveform(
+            pth.TIMESERIES_INPUT_FOLDER,
+            stats['time_series_name']
         )
-        absolute_acc = np.array([floor_acc + base for floor_acc, base in zip(floors_acc, base_acc)])
-        max_storey_acc = np.array(
-            # first column is time
-            [np.max(storey)/G for storey in np.transpose(absolute_acc)[1:]]
+        # trimmed records start at time_offset within the ground motion
+        absolute_acc = absolute_accelerations(
+            accelerations=floors_acc,
+            time_series=base_acc,
+            time_step=time_steps[folder],
+            scale_factor=stats.get('scale_factor', 1.),
+            time_offset=stats.get('time_offset', 0.)
         )
+        max_storey_acc = np.max(absolute_acc, axis=0)/G
         max_accelerations.append(max_storey_acc)
     
     csv_out_data = [
         [folder] + list(accs)
-        for folder, accs in zip(os.listdir(pth.OUTPUT_TH_DIR_PATH), max_accelerations)
+        for folder, accs in zip(folders, max_accelerations)
     ]
     n_storeys = len(max_accelerations[0])
     csv_header = ['Time_History'] + list(range(n_storeys))
@@ -0,0 +1,148 @@
+from dataclasses import replace
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from model.config import PreprocessingOptions
+from src.classes import TimeHistoryAnalysis
+from src.waveform_library import load_waveform
+
+
+def arias_window(time_series: npt.ArrayLike,
+                 time_step: float,
+                 start_fraction: float,
+                 end_fraction: float) -> Tuple[int, int]:
+    """
+    First and last sample of the window between two fractions of the
+    Arias intensity of a record
+
+    Args:
+        time_series (npt.ArrayLike): record [m/s2]
+        time_step (float): time step of the record
+        start_fraction (float): Arias intensity fraction at the window start
+        end_fraction (float): Arias intensity fraction at the window end
+
+    Returns:
+        Tuple[int, int]: first and last sample of the window
+    """
+    squared_record = np.asarray(time_series, dtype=float)**2
+    arias_history = np.zeros_like(squared_record)
+    arias_history[1:] = np.cumsum(squared_record[1:] + squared_record[:-1]) * time_step / 2
+    if squared_record.size < 2 or arias_history[-1] <= 0:
+        return 0, max(0, squared_record.size - 1)
+    normalized_arias = arias_history / arias_history[-1]
+    start_sample = int(np.searchsorted(normalized_arias, start_fraction, side='right')) - 1
+    end_sample = int(np.searchsorted(normalized_arias, end_fraction, side='left'))
+    return max(0, start_sample), min(squared_record.size - 1, end_sample)
+
+
+def trim_record(time_series: npt.ArrayLike,
+                time_step: float,
+                start_fraction: float = 0.001,
+                end_fraction: float = 0.999,
+                taper_duration: float = 0.5) -> Tuple[npt.NDArray, float]:
+    """
+    Trims a record to its Arias intensity window. The window is widened by
+    the taper duration on each side, where a cosine taper brings the record
+    to zero
+
+    Args:
+        time_series (npt.ArrayLike): record [m/s2]
+        time_step (float): time step of the record
+        start_fraction (float, optional): Arias intensity fraction at the window
+            start. Defaults to 0.001.
+        end_fraction (float, optional): Arias intensity fraction at the window
+            end. Defaults to 0.999.
+        taper_duration (float, optional): length of the tapers [s]. Defaults to 0.5.
+
+    Returns:
+        Tuple[npt.NDArray, float]: trimmed record and its start time within
+            the original record
+    """
+    time_series = np.asarray(time_series, dtype=float)
+    start_sample, end_sample = arias_window(time_series, time_step, start_fraction, end_fraction)
+    taper_samples = int(round(taper_duration / time_step))
+    start_sample = max(0, start_sample - taper_samples)
+    end_sample = min(time_series.size - 1, end_sample + taper_samples)
+
+    trimmed_record = time_series[start_sample:end_sample + 1].copy()
+    taper_samples = min(taper_samples, trimmed_record.size // 2)
+    if taper_samples > 0:
+        taper = 0.5 * (1 - np.cos(np.pi * np.arange(taper_samples) / taper_samples))
+        trimmed_record[:taper_samples] *= taper
+        trimmed_record[-taper_samples:] *= taper[::-1]
+    return trimmed_record, start_sample * time_step
+
+
+def trim_time_histories(time_histories: List[TimeHistoryAnalysis],
+                        waveform_folder: Path,
+                        start_fraction: float,
+                        end_fraction: float,
+                        taper_duration: float) -> Tuple[List[TimeHistoryAnalysis], Dict[str, npt.NDArray]]:
+    """
+    Trims the records of a set of analyses. Durations and time offsets of the
+    analyses follow the trimmed records, which must be passed to the analyses
+    in place of the waveform files
+
+    Args:
+        time_histories (List[TimeHistoryAnalysis]): time history analyses
+        waveform_folder (Path): folder holding the waveforms
+        start_fraction (float): Arias intensity fraction at the window start
+        end_fraction (float): Arias intensity fraction at the window end
+        taper_duration (float): length of the tapers [s]
+
+    Returns:
+        Tuple[List[TimeHistoryAnalysis], Dict[str, npt.NDArray]]: updated
+            analyses and trimmed records by file name
+    """
+    trimmed_records: Dict[str, Tuple[npt.NDArray, float]] = {}
+    trimmed_time_histories = []
+    for time_history in time_histories:
+        if time_history.filename not in trimmed_records:
+            trimmed_records[time_history.filename] = trim_record(
+                load_waveform(waveform_folder, time_history.filename),
+                time_history.time_step,
+                start_fraction=start_fraction,
+                end_fraction=end_fraction,
+                taper_duration=taper_duration
+            )
+        trimmed_record, time_offset = trimmed_records[time_history.filename]
+        trimmed_time_histories.append(replace(
+            time_history,
+            duration=trimmed_record.size * time_history.time_step,
+            time_offset=time_offset
+        ))
+
+    return trimmed_time_histories, {
+        filename: trimmed_record for filename, (trimmed_record, _) in trimmed_records.items()
+    }
+
+
+def preprocess_time_histories(time_histories: List[TimeHistoryAnalysis],
+                              waveform_folder: Path,
+                              preprocessing_options: PreprocessingOptions) -> Tuple[List[TimeHistoryAnalysis], Dict[str, npt.NDArray]]:
+    """
+    Applies the preprocessing configured in config.yaml to the records of a
+    set of analyses
+
+    Args:
+        time_histories (List[TimeHistoryAnalysis]): time history analyses
+        waveform_folder (Path): folder holding the waveforms
+        preprocessing_options (PreprocessingOptions): preprocessing options
+
+    Returns:
+        Tuple[List[TimeHistoryAnalysis], Dict[str, npt.NDArray]]: analyses to
+            run and preprocessed records by file name, empty if records are
+            used as they are
+    """
+    if not preprocessing_options.trim_records:
+        return time_histories, {}
+    return trim_time_histories(
+        time_histories,
+        waveform_folder,
+        start_fraction=preprocessing_options.arias_start,
+        end_fraction=preprocessing_options.arias_end,
+        taper_duration=preprocessing_options.taper_duration
+    )
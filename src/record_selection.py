@@ -0,0 +1,266 @@
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from src.intensity_measure_cache import IntensityMeasureCache
+from src.time_series_tools import response_spectrum
+from src.waveform_library import WaveformLibrary, load_waveform
+from model.validation import TargetSpectraInput
+
+
+def spectrum_index(library: WaveformLibrary,
+                   periods: npt.ArrayLike,
+                   time_steps: Sequence[float],
+                   csi: float = 0.05,
+                   cache: IntensityMeasureCache = None) -> npt.NDArray:
+    """
+    Spectral accelerations of every record of a waveform library at the
+    target periods, read from the spectra cache when given
+
+    Args:
+        library (WaveformLibrary): candidate records
+        periods (npt.ArrayLike): target periods
+        time_steps (Sequence[float]): time step of each record of the library
+        csi (float, optional): critical damping ratio. Defaults to 0.05.
+        cache (IntensityMeasureCache, optional): spectra cache. Defaults to
+            integrating the spectra directly.
+
+    Returns:
+        npt.NDArray: spectral accelerations (records x periods) [g]
+    """
+    records = [library[record_name] for record_name in library.names]
+    if cache is None:
+        spectra = response_spectrum(records, time_steps, periods, csi)
+    else:
+        spectra = cache.response_spectra(records, time_steps, periods, csi)
+    return spectra.Sa[:, 0, :]
+
+
+def _selection_cost(suite_residuals: npt.NDArray,
+                    record_misfits: npt.NDArray,
+                    suite_size: int,
+                    individual_weight: float) -> npt.NDArray:
+    """
+    Misfit of suites given the sum of their log residuals (suites x periods)
+    and the sum of the mean square residual of their records
+    """
+    return (np.mean((suite_residuals / suite_size)**2, axis=-1)
+            + individual_weight * record_misfits / suite_size)
+
+
+def select_records(target_sa: npt.ArrayLike,
+                   candidate_sa: npt.NDArray,
+                   n_records: int,
+                   min_scale_factor: float = 0.25,
+                   max_scale_factor: float = 4.0,
+                   individual_weight: float = 1.0,
+                   max_iterations: int = 20) -> Tuple[npt.NDArray, npt.NDArray]:
+    """
+    Selects and scales a suite of records matching a target spectrum. Each
+    record is scaled to the least squares fit of its log spectrum, within the
+    scale factor bounds. The suite is built greedily and then refined by
+    swapping records while the misfit decreases. The misfit is the mean square
+    log residual of the suite geometric mean plus individual_weight times the
+    mean square log residual of the records. Every step evaluates all the
+    candidates at once
+
+    Args:
+        target_sa (npt.ArrayLike): target spectrum (periods) [g]
+        candidate_sa (npt.NDArray): unscaled spectra of the candidates (records x periods) [g]
+        n_records (int): number of records of the suite
+        min_scale_factor (float, optional): lowest allowed scale factor. Defaults to 0.25.
+        max_scale_factor (float, optional): highest allowed scale factor. Defaults to 4.0.
+        individual_weight (float, optional): weight of the record misfits. Defaults to 1.0.
+        max_iterations (int, optional): maximum number of swap passes. Defaults to 20.
+
+    Returns:
+        Tuple[npt.NDArray, npt.NDArray]: indices of the selected candidates
+            and their scale factors
+    """
+    log_target = np.log(np.asarray(target_sa, dtype=float))
+    valid = np.all(candidate_sa > 0, axis=1)
+    if np.count_nonzero(valid) < n_records:
+        raise ValueError(
+            f'{np.count_nonzero(valid)} candidate records with a non zero spectrum, '
+            f'{n_records} required'
+        )
+    log_candidates = np.log(np.where(valid[:, np.newaxis], candidate_sa, 1.))
+
+    log_scale_factors = np.clip(
+        np.mean(log_target - log_candidates, axis=1),
+        np.log(min_scale_factor),
+        np.log(max_scale_factor)
+    )
+    residuals = log_candidates + log_scale_factors[:, np.newaxis] - log_target
+    misfits = np.where(valid, np.mean(residuals**2, axis=1), np.inf)
+
+    # greedy build
+    selected: List[int] = []
+    suite_residuals = np.zeros(log_target.size)
+    suite_misfits = 0.
+    available = valid.copy()
+    for suite_size in range(1, n_records + 1):
+        costs = _selection_cost(
+            suite_residuals + residuals,
+            suite_misfits + misfits,
+            suite_size,
+            individual_weight
+        )
+        best = int(np.argmin(np.where(available, costs, np.inf)))
+        selected.append(best)
+        available[best] = False
+        suite_residuals += residuals[best]
+        suite_misfits += misfits[best]
+
+    # swap refinement
+    cost = _selection_cost(suite_residuals, suite_misfits, n_records, individual_weight)
+    for _ in range(max_iterations):
+        improved = False
+        for slot, record in enumerate(selected):
+            costs = _selection_cost(
+                suite_residuals - residuals[record] + residuals,
+                suite_misfits - misfits[record] + misfits,
+                n_records,
+                individual_weight
+            )
+            best = int(np.argmin(np.where(available, costs, np.inf)))
+            if costs[best] < cost * (1 - 1e-12):
+                selected[slot] = best
+                available[record], available[best] = True, False
+                suite_residuals += residuals[best] - residuals[record]
+                suite_misfits += misfits[best] - misfits[record]
+                cost = costs[best]
+                improved = True
+        if not improved:
+            break
+
+    selected_records = np.array(selected)
+    return selected_records, np.exp(log_scale_factors[selected_records])
+
+
+def build_msa_inputs(targets: TargetSpectraInput,
+                     record_names: Sequence[str],
+                     time_steps: Sequence[float],
+                     record_lengths: Sequence[int],
+                     candidate_sa: npt.NDArray,
+                     first_period: float,
+                     min_scale_factor: float = 0.25,
+                     max_scale_factor: float = 4.0,
+                     individual_weight: float = 1.0) -> Tuple[dict, dict]:
+    """
+    Selects the records of every stripe and builds the time history cases and
+    the intensities of the multiple stripe analysis. Each selected record is a
+    new case, the stripe SaT1 is the target spectrum at the first period
+
+    Args:
+        targets (TargetSpectraInput): target spectra of the stripes
+        record_names (Sequence[str]): candidate waveform file names
+        time_steps (Sequence[float]): time step of each candidate
+        record_lengths (Sequence[int]): number of samples of each candidate
+        candidate_sa (npt.NDArray): candidate spectra at the target periods (records x periods) [g]
+        first_period (float): first mode period T1
+        min_scale_factor (float, optional): lowest allowed scale factor. Defaults to 0.25.
+        max_scale_factor (float, optional): highest allowed scale factor. Defaults to 4.0.
+        individual_weight (float, optional): weight of the record misfits. Defaults to 1.0.
+
+    Returns:
+        Tuple[dict, dict]: time history input data (NLTHCases) and intensities data
+    """
+    log_periods = np.log(targets.periods)
+    time_history_cases: List[Dict] = []
+    intensities = {
+        'intensities': [],
+        'map': [],
+        'mafe': [],
+        'SaT1': [],
+        'cases': targets.n_records,
+        'modeling_dispersion': targets.modeling_dispersion
+    }
+    for stripe in targets.stripes:
+        selected_records, scale_factors = select_records(
+            stripe.Sa,
+            candidate_sa,
+            targets.n_records,
+            min_scale_factor=min_scale_factor,
+            max_scale_factor=max_scale_factor,
+            individual_weight=individual_weight
+        )
+        stripe_ids = []
+        for record, scale_factor in zip(selected_records, scale_factors):
+            case_id = len(time_history_cases) + 1
+            time_history_cases.append({
+                'id': case_id,
+                'time_step_ratio': 1,
+                'scale_factor': float(scale_factor),
+                'time_step': float(time_steps[record]),
+                'duration': float((record_lengths[record] - 1) * time_steps[record]),
+                'filename': record_names[record]
+            })
+            stripe_ids.append(case_id)
+
+        intensities['intensities'].append(stripe.name)
+        intensities['map'].append(stripe_ids)
+        intensities['mafe'].append(stripe.mafe)
+        intensities['SaT1'].append(float(np.exp(np.interp(
+            np.log(first_period), log_periods, np.log(stripe.Sa)
+        ))))
+
+    return {'NLTHCases': time_history_cases}, intensities
+
+
+def scale_to_stripes(time_history_cases: List[dict],
+                     intensities: dict,
+                     waveform_folder: Path,
+                     first_period: float,
+                     cache: IntensityMeasureCache = None) -> Tuple[dict, dict]:
+    """
+    Scales the records mapped to each stripe to the stripe SaT1 at the first
+    period of the model. Sa(T1) of the distinct records is computed in a
+    single batch. Every mapped record becomes a new case, so a record shared
+    by several stripes gets one scale factor per stripe
+
+    Args:
+        time_history_cases (List[dict]): NLTHCases of the time history input
+        intensities (dict): intensities data, map holds the case ids of each stripe
+        waveform_folder (Path): folder holding the waveforms
+        first_period (float): first mode period T1
+        cache (IntensityMeasureCache, optional): spectra cache. Defaults to
+            integrating the spectra directly.
+
+    Returns:
+        Tuple[dict, dict]: scaled time history input data (NLTHCases) and
+            intensities data with the new case ids
+    """
+    cases_by_id = {int(case['id']): case for case in time_history_cases}
+    records = list(dict.fromkeys(
+        (cases_by_id[th_id]['filename'], cases_by_id[th_id]['time_step'])
+        for th_ids in intensities['map'] for th_id in th_ids
+    ))
+    ground_motions = [load_waveform(waveform_folder, filename) for filename, _ in records]
+    time_steps = [time_step for _, time_step in records]
+    if cache is None:
+        spectra = response_spectrum(ground_motions, time_steps, first_period)
+    else:
+        spectra = cache.response_spectra(ground_motions, time_steps, first_period)
+    unscaled_sa = dict(zip(records, spectra.Sa[:, 0, 0]))
+
+    scaled_cases: List[Dict] = []
+    stripes_map = []
+    for th_ids, target_sa in zip(intensities['map'], intensities['SaT1']):
+        stripe_ids = []
+        for th_id in th_ids:
+            case = cases_by_id[th_id]
+            scaled_case = dict(case)
+            scaled_case['id'] = len(scaled_cases) + 1
+            scaled_case['scale_factor'] = float(
+                target_sa / unscaled_sa[(case['filename'], case['time_step'])]
+            )
+            scaled_cases.append(scaled_case)
+            stripe_ids.append(scaled_case['id'])
+        stripes_map.append(stripe_ids)
+
+    scaled_intensities = dict(intensities)
+    scaled_intensities['map'] = stripes_map
+    return {'NLTHCases': scaled_cases}, scaled_intensities
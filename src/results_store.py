@@ -0,0 +1,363 @@
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterable, List, Union
+
+import h5py
+import numpy as np
+import numpy.typing as npt
+
+
+# Recorder datasets whose first column is the analysis time
+TIME_DATASETS = ('displacements', 'accelerations', 'gap_openings', 'base_reactions')
+
+ColumnSelection = Union[int, slice, Iterable[int], None]
+
+
+class ResultCase:
+    """
+    Lazy view over a single analysis case of a results file
+    """
+
+    def __init__(self, store: 'ResultsStore', path: str):
+        """
+        Instanciate a ResultCase object, nothing is read until requested
+
+        Args:
+            store (ResultsStore): store owning the case
+            path (str): hdf5 path of the case group
+        """
+        self.store = store
+        self.path = path
+        self._attrs = None
+
+    @property
+    def attrs(self) -> dict:
+        if self._attrs is None:
+            self._attrs = dict(self.store.file[self.path].attrs)
+        return self._attrs
+
+    @property
+    def success(self) -> bool:
+        return bool(self.attrs.get('success', True))
+
+    @property
+    def datasets(self) -> List[str]:
+        return [
+            key for key, item in self.store.file[self.path].items()
+            if isinstance(item, h5py.Dataset)
+        ]
+
+    def __getitem__(self, dataset: str) -> npt.NDArray:
+        return self.store.read(self._dataset_path(dataset))
+
+    def __contains__(self, dataset: str) -> bool:
+        return self._dataset_path(dataset) in self.store.file
+
+    @property
+    def displacements(self) -> npt.NDArray:
+        return self['displacements']
+
+    @property
+    def accelerations(self) -> npt.NDArray:
+        return self['accelerations']
+
+    @property
+    def gap_openings(self) -> npt.NDArray:
+        return self['gap_openings']
+
+    @property
+    def base_reactions(self) -> npt.NDArray:
+        return self['base_reactions']
+
+    @property
+    def time_series(self) -> npt.NDArray:
+        return self['time_series']
+
+    @property
+    def intensity_measures(self) -> dict[str, float]:
+        """
+        Intensity measures of the scaled ground motion by name
+        """
+        columns = self.store.file[self._dataset_path('intensity_measures')].attrs['columns']
+        return dict(zip(columns, self['intensity_measures'].tolist()))
+
+    def select(self, dataset: str,
+               columns: ColumnSelection = None,
+               time_window: tuple[float, float] = None) -> npt.NDArray:
+        """
+        Selects channels and a time window of a recorder dataset
+
+        Args:
+            dataset (str): dataset name
+            columns (ColumnSelection, optional): channels to keep, time column
+                excluded from the count. Defaults to all channels.
+            time_window (tuple[float, float], optional): start and end time.
+                Defaults to the whole history.
+
+        Returns:
+            npt.NDArray: selected data, a view when columns is a slice or None
+        """
+        data = self[dataset]
+        has_time = dataset in TIME_DATASETS
+
+        rows = slice(None)
+        if time_window is not None and has_time:
+            start, end = np.searchsorted(data[:, 0], time_window, side='left')
+            rows = slice(start, end)
+        values = data[rows, 1:] if has_time else data[rows]
+
+        if columns is None:
+            return values
+        if isinstance(columns, (int, np.integer)):
+            columns = slice(columns, columns + 1 or None)
+        if isinstance(columns, slice):
+            return values[:, columns]
+        return values[:, list(columns)]
+
+    def _dataset_path(self, dataset: str) -> str:
+        return dataset if self.path == '/' else f'{self.path}/{dataset}'
+
+    def __repr__(self):
+        return f'ResultCase({self.path})'
+
+
+class ResultsStore:
+    """
+    Query API over CLOUD, IDA, PH and sweep result files. The file is opened once and
+    decoded datasets are kept in a least recently used cache
+    """
+
+    def __init__(self, hdf5_path: Path, cache_size: int = 64):
+        """
+        Opens a results file in read mode
+
+        Args:
+            hdf5_path (Path): path to hdf5 results file
+            cache_size (int, optional): number of decoded datasets kept in memory.
+                Defaults to 64.
+        """
+        self.path = Path(hdf5_path)
+        self.cache_size = cache_size
+        self.file = h5py.File(self.path, 'r')
+        self._cache: OrderedDict[str, npt.NDArray] = OrderedDict()
+        self._case_ids = None
+        self._case_rows = None
+
+    def __enter__(self) -> 'ResultsStore':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Closes the file handle and drops the cache
+        """
+        self._cache.clear()
+        if self.file:
+            self.file.close()
+
+    @property
+    def layout(self) -> str:
+        """
+        Layout of the file: 'PH', 'SWEEP', 'IDA' or 'CLOUD'
+        """
+        if 'displacements' in self.file:
+            return 'PH'
+        if 'variants' in self.file:
+            return 'SWEEP'
+        if any('/' in case_id for case_id in self.case_ids):
+            return 'IDA'
+        return 'CLOUD'
+
+    @property
+    def case_ids(self) -> List[str]:
+        """
+        Hdf5 paths of the analysis cases in file order
+        """
+        if self._case_ids is None:
+            if 'summary/cases' in self.file:
+                self._case_ids = [
+                    case_id.decode() if isinstance(case_id, bytes) else case_id
+                    for case_id in self.file['summary/cases'][()]
+                ]
+            else:
+                self._case_ids = self._discover_cases()
+        return self._case_ids
+
+    def case_rows(self, case_ids: Iterable[Union[str, int]]) -> npt.NDArray:
+        """
+        Rows of the summary table holding the given cases
+
+        Args:
+            case_ids (Iterable[Union[str, int]]): case hdf5 paths or time history ids
+
+        Returns:
+            npt.NDArray: row indices
+        """
+        if self._case_rows is None:
+            self._case_rows = {
+                case_id: row for row, case_id in enumerate(self.case_ids)
+            }
+        return np.array(
+            [self._case_rows[self.case(case_id).path] for case_id in case_ids],
+            dtype=int
+        )
+
+    def case(self, case_id: Union[str, int]) -> ResultCase:
+        """
+        Lazy case object
+
+        Args:
+            case_id (Union[str, int]): case hdf5 path or time history id
+
+        Returns:
+            ResultCase: case
+        """
+        if isinstance(case_id, (int, np.integer)):
+            case_id = f'TH_{case_id:04}'
+        return ResultCase(self, case_id)
+
+    def cases(self, case_ids: Iterable[Union[str, int]] = None) -> List[ResultCase]:
+        """
+        Lazy case objects, all the cases if case_ids is not given
+        """
+        if case_ids is None:
+            case_ids = self.case_ids
+        return [self.case(case_id) for case_id in case_ids]
+
+    def read(self, dataset_path: str) -> npt.NDArray:
+        """
+        Reads a dataset through the cache. The returned array is read only so
+        that views handed out never alter the cached data
+
+        Args:
+            dataset_path (str): hdf5 path of the dataset
+
+        Returns:
+            npt.NDArray: decoded dataset
+        """
+        if dataset_path in self._cache:
+            self._cache.move_to_end(dataset_path)
+            return self._cache[dataset_path]
+
+        data = self.file[dataset_path][()]
+        if isinstance(data, np.ndarray):
+            data.flags.writeable = False
+        self._cache[dataset_path] = data
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return data
+
+    def summary(self, key: str = None) -> Union[dict, npt.NDArray]:
+        """
+        Reads the /summary table written at export time
+
+        Args:
+            key (str, optional): summary dataset. Defaults to every dataset.
+
+        Returns:
+            Union[dict, npt.NDArray]: summary dataset or all of them as dict
+        """
+        if key is not None:
+            return self.read(f'summary/{key}')
+        return {
+            key: self.read(f'summary/{key}')
+            for key in self.file['summary'].keys()
+        }
+
+    def realization_parameters(self, case_ids: Iterable[Union[str, int]] = None) -> dict[str, npt.NDArray]:
+        """
+        Sampled parameters of the material realization each case was run on,
+        for Monte Carlo result files
+
+        Args:
+            case_ids (Iterable[Union[str, int]], optional): cases to select.
+                Defaults to every case.
+
+        Returns:
+            dict[str, npt.NDArray]: parameter values of each case by name
+        """
+        parameters = self.read('realizations/parameters')
+        columns = self.file['realizations/parameters'].attrs['columns']
+        realizations = [int(case.attrs['realization']) for case in self.cases(case_ids)]
+        return dict(zip(columns, parameters[realizations].T))
+
+    def variant_parameters(self, case_ids: Iterable[Union[str, int]] = None) -> dict[str, npt.NDArray]:
+        """
+        Swept values of the design variant of each case, for sweep result
+        files, whose cases are stored as V_<index>/TH_<id>
+
+        Args:
+            case_ids (Iterable[Union[str, int]], optional): case hdf5 paths.
+                Defaults to every case.
+
+        Returns:
+            dict[str, npt.NDArray]: swept values of each case by label
+        """
+        variant_rows = {
+            name.decode() if isinstance(name, bytes) else name: row
+            for row, name in enumerate(self.read('variants/names'))
+        }
+        parameters = self.read('variants/parameters')
+        columns = self.file['variants/parameters'].attrs['columns']
+        rows = [variant_rows[case.path.split('/')[0]] for case in self.cases(case_ids)]
+        return dict(zip(columns, parameters[rows].T))
+
+    def select(self, dataset: str,
+               case_ids: Iterable[Union[str, int]] = None,
+               columns: ColumnSelection = None,
+               time_window: tuple[float, float] = None,
+               stack: bool = False) -> Union[List[npt.NDArray], npt.NDArray]:
+        """
+        Selects the same channels and time window over many cases
+
+        Args:
+            dataset (str): dataset name
+            case_ids (Iterable[Union[str, int]], optional): cases to select.
+                Defaults to every case.
+            columns (ColumnSelection, optional): channels to keep (floors,
+                connections...). Defaults to all channels.
+            time_window (tuple[float, float], optional): start and end time.
+                Defaults to the whole history.
+            stack (bool, optional): stack the selections in a single array,
+                cases must share the number of rows. Defaults to False.
+
+        Raises:
+            KeyError: a case has no such dataset
+
+        Returns:
+            Union[List[npt.NDArray], npt.NDArray]: one array per case, in the
+                order of the cases, or stacked array
+        """
+        cases = self.cases(case_ids)
+        missing_cases = [case.path for case in cases if dataset not in case]
+        if missing_cases:
+            raise KeyError(f'{dataset} missing in cases {missing_cases}')
+        selection = [
+            case.select(dataset, columns=columns, time_window=time_window)
+            for case in cases
+        ]
+        if stack:
+            return np.stack(selection)
+        return selection
+
+    def _discover_cases(self) -> List[str]:
+        """
+        Lists the case groups of files without a summary table
+        """
+        if 'displacements' in self.file:
+            return ['/']
+        case_ids = []
+        for name, item in self.file.items():
+            if not (isinstance(item, h5py.Group) and name.startswith('TH_')):
+                continue
+            runs = sorted(key for key in item.keys() if key.startswith('run_'))
+            if runs:
+                case_ids += [f'{name}/{run}' for run in runs]
+            else:
+                case_ids.append(name)
+        return sorted(case_ids)
+
+    def __repr__(self):
+        return f'ResultsStore({self.path}, {len(self.case_ids)} cases)'
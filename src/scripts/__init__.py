@@ -1,7 +1,9 @@
-from .moment_rotation import compute_moment_rotation
+from .moment_rotation import (compute_moment_rotation, compute_moment_rotations, frame_links,
+                              assign_frame_links)
 from .build_model import build_opensees_model
-from .import_frame import import_frame_data
+from .import_frame import import_frame_data, build_frame
 from .import_analysis import import_pushpull_analysis, import_time_history_analysis
 from .model_output import print_model
-from .limit_states import compute_limit_states, export_limit_states
+from .limit_states import (compute_limit_states, compute_frames_limit_states, frame_limit_state_table,
+                           export_limit_states)
 from .export_to_hdf5 import save_output_in_hdf5
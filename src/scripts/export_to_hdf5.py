@@ -8,6 +8,7 @@ import model.paths as pth
 from model.validation import PushPullInput, TimeHistoryCollectionInput
 
 from ..utils import import_from_json
+from ..waveform_library import load_waveform
 from ..classes import Frame
 
 
@@ -106,26 +107,29 @@ def save_output_in_hdf5(frame: Frame) -> None:
                                         time_history_data.NLTHCases):
 
             folder_path = pth.OUTPUT_TH_DIR_PATH / folder
+            th_stats = import_from_json(folder_path / pth.TH_STATS_FILE)
             # group and attributes for time history case
             th_case_metadata = {
                 'id': time_history.id,
-                'success': import_from_json(
-                        folder_path / pth.TH_STATS_FILE
-                    )['success'],
+                'success': th_stats['success'],
                 'time_step': time_history.time_step,
                 'scale_factor': time_history.scale_factor,
                 'time_step_ratio': time_history.time_step_ratio
             }
+            # trimmed records start later within the ground motion and are shorter
+            if 'time_offset' in th_stats:
+                th_case_metadata['time_offset'] = th_stats['time_offset']
+                th_case_metadata['duration'] = th_stats['duration']
             hdf5_create_group(
                 f,
                 f'time_history/{folder}',
                 metadata=th_case_metadata
             )
             # ground motion used for time history case
-            ground_motion = np.loadtxt(
-                pth.TIMESERIES_INPUT_FOLDER / time_history.filename,
-                dtype='f'
-            )
+            ground_motion = load_waveform(
+                pth.TIMESERIES_INPUT_FOLDER,
+                time_history.filename
+            ).astype('f')
             ground_motion_metadata = {
                 'duration': time_history.duration,
                 'time_step': time_history.time_step,
@@ -24,28 +24,33 @@ def import_frame_data(frame_path: Path, steel_path: Path, tendon_path: Path, tim
     Returns:
         Frame: frame object
     """
-    # Validation
-    validated_timber = mdl.TimberInput(
-        **import_from_json(
-            timber_path
-        )
-    )
-    validated_steel = mdl.SteelInput(
-        **import_from_json(
-            steel_path
-        )
-    )
-    validated_tendon = mdl.TendonInput(
-        **import_from_json(
-            tendon_path
-        )
-    )
-    validated_frame = mdl.RegularFrameInput(
-        **import_from_json(
-            frame_path
-        )
+    return build_frame(
+        frame_data=import_from_json(frame_path),
+        steel_data=import_from_json(steel_path),
+        tendon_data=import_from_json(tendon_path),
+        timber_data=import_from_json(timber_path)
     )
 
+
+def build_frame(frame_data: dict, steel_data: dict, tendon_data: dict, timber_data: dict) -> cls.Frame:
+    """
+    Validates the input data and builds the Frame object
+
+    Args:
+        frame_data (dict): frame input data
+        steel_data (dict): steel input data
+        tendon_data (dict): tendon input data
+        timber_data (dict): timber input data
+
+    Returns:
+        Frame: frame object
+    """
+    # Validation
+    validated_timber = mdl.TimberInput(**timber_data)
+    validated_steel = mdl.SteelInput(**steel_data)
+    validated_tendon = mdl.TendonInput(**tendon_data)
+    validated_frame = mdl.RegularFrameInput(**frame_data)
+
     # Build frame object
     timber = cls.Timber(
         **validated_timber.__dict__
@@ -1,9 +1,17 @@
 import pandas as pd
 import numpy as np
+from dataclasses import astuple
 from pathlib import Path
+from typing import Dict, List
 
-from ..classes import Section, SectionLimitStates, Frame
-from ..moment_rotation import timber_yielding, steel_failure, tendon_failure
+from model.enums import EquilibriumState
+from ..classes import Section, SectionLimitStates, Frame, LimitStateTable, compile_section
+from ..moment_rotation import timber_yielding, steel_failure, tendon_failure, equilibrium_points
+
+
+# Limit state tables, keyed by the constants of the frame sections, so that
+# frames imported again share the table
+_LIMIT_STATE_TABLES: Dict[bytes, LimitStateTable] = {}
 
 
 def compute_limit_states(frame: Frame,
@@ -41,6 +49,75 @@ def compute_limit_states(frame: Frame,
     return SectionLimitStates(**limit_states)
 
 
+def compute_frames_limit_states(frames: List[Frame]) -> List[List[SectionLimitStates]]:
+    """
+    Computes the limit states of every section of many frames, e.g. material
+    realizations of a frame, solving the sections of all the frames together.
+    Sections are ordered as external column, internal column and beams
+
+    Args:
+        frames (List[Frame]): frames
+
+    Returns:
+        List[List[SectionLimitStates]]: section limit states of each frame
+    """
+    frame_sections = [
+        [frame.ext_column_section, frame.int_column_section] + frame.beam_sections
+        for frame in frames
+    ]
+    compiled_sections = [
+        compile_section(section, frame)
+        for frame, sections in zip(frames, frame_sections)
+        for section in sections
+    ]
+    # same guesses as compute_limit_states, so that the points are shared
+    steel_failure_thetas, steel_failure_axes = equilibrium_points(
+        compiled_sections, None, EquilibriumState.SteelFailure, guess=0.2
+    )
+    tendon_failure_thetas, _ = equilibrium_points(
+        compiled_sections, None, EquilibriumState.TendonFailure, guess=0.1
+    )
+    timber_yielding_thetas, timber_yielding_axes = equilibrium_points(
+        compiled_sections, None, EquilibriumState.TimberYielding, guess=0.1
+    )
+    if np.any(np.isnan(steel_failure_axes)) or np.any(np.isnan(timber_yielding_axes)):
+        raise ValueError('no neutral axis balancing the forces at a limit state of the sections')
+
+    limit_states = iter([
+        SectionLimitStates(
+            DS1=float(steel_failure_theta),
+            DS2=float(tendon_failure_theta) if compiled_section.has_tendon else None,
+            DST=float(timber_yielding_theta)
+        )
+        for compiled_section, steel_failure_theta, tendon_failure_theta, timber_yielding_theta in zip(
+            compiled_sections, steel_failure_thetas, tendon_failure_thetas, timber_yielding_thetas
+        )
+    ])
+    return [[next(limit_states) for _ in sections] for sections in frame_sections]
+
+
+def frame_limit_state_table(frame: Frame) -> LimitStateTable:
+    """
+    Limit state table of the connections of the frame, computed once for
+    frames with the same sections
+
+    Args:
+        frame (Frame): frame
+
+    Returns:
+        LimitStateTable: limit state table
+    """
+    key = b''.join(
+        np.array(astuple(compile_section(section, frame)), dtype=float).tobytes()
+        for section in [frame.ext_column_section, frame.int_column_section] + frame.beam_sections
+    )
+    if key not in _LIMIT_STATE_TABLES:
+        _LIMIT_STATE_TABLES[key] = LimitStateTable.from_section_limit_states(
+            compute_frames_limit_states([frame])[0]
+        )
+    return _LIMIT_STATE_TABLES[key]
+
+
 def export_limit_states(frame: Frame,
                         path: Path) -> None:
     """
@@ -53,19 +130,9 @@ def export_limit_states(frame: Frame,
     Returns:
         SectionLimitStates: section limit states
     """
-    sections = [
-        frame.ext_column_section,
-        frame.int_column_section
-    ] + frame.beam_sections
-    # print(sections)
-
-    frame_gap_limit_states = pd.DataFrame()
-    for field in SectionLimitStates.__annotations__.keys():
-        frame_gap_limit_states[field] = np.zeros(len(sections))
-
-    for i, section in enumerate(sections):
-        limit_states = compute_limit_states(frame, section)
-        for key, value in limit_states.__dict__.items():
-            frame_gap_limit_states[key][i] = value
-        
+    frame_gap_limit_states = pd.DataFrame(
+        [limit_states.__dict__ for limit_states in compute_frames_limit_states([frame])[0]],
+        columns=list(SectionLimitStates.__annotations__.keys()),
+        dtype=float
+    )
     frame_gap_limit_states.to_csv(path, index=False)
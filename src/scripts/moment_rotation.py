@@ -1,7 +1,13 @@
-from ..classes import Frame, MultilinearElasticLink, GMSteelLink, KineticLink
+from dataclasses import astuple
+from typing import List
+
+import numpy as np
+
+from model.enums import EquilibriumState
+from ..classes import Frame, MultilinearElasticLink, GMSteelLink, KineticLink, compile_section
 from ..utils import import_configuration
 from ..moment_rotation import (
-    axial_moment, steel_moment, tendon_moment, get_neutral_axis, steel_yielding, steel_failure, tendon_failure)
+    axial_moment, steel_moment, tendon_moment, equilibrium_points, simplify_backbone, trace_backbone)
 
 # Import config data
 import model.config as config
@@ -23,57 +29,76 @@ def compute_moment_rotation(frame: Frame) -> Frame:
     Returns:
         Frame: populated frame object
     """
-    sections = frame.beam_sections + [
-        frame.int_column_section,
-        frame.ext_column_section
+    return compute_moment_rotations([frame])[0]
+
+
+def compute_moment_rotations(frames: List[Frame]) -> List[Frame]:
+    """
+    Computes moment rotation populating link data for each section of many
+    frames, e.g. material realizations of a frame. The sections of all the
+    frames are solved and traced together
+
+    Args:
+        frames (List[Frame]): frame objects
+
+    Returns:
+        List[Frame]: populated frame objects
+    """
+    frame_sections = [
+        (section, frame)
+        for frame in frames
+        for section in frame.beam_sections + [frame.int_column_section, frame.ext_column_section]
     ]
-    for section in sections:
-        theta_axis_points = list()
-        # Steel yielding
-        theta_axis_points.append(
-            steel_yielding(
-                initial_guess=[0.005, 0.3],
-                section=section,
-                frame=frame
-            )
-        )
+    # identical sections, e.g. shared by design variants, are solved once
+    solved_sections = {}
+    section_keys = []
+    for section, frame in frame_sections:
+        compiled_section = compile_section(section, frame)
+        section_keys.append(np.array(astuple(compiled_section), dtype=float).tobytes())
+        solved_sections.setdefault(section_keys[-1], (section, compiled_section))
+    sections = [section for section, _ in solved_sections.values()]
+    compiled_sections = [compiled_section for _, compiled_section in solved_sections.values()]
+    # limit points of all the sections are solved together
+    yielding_points = equilibrium_points(compiled_sections, None, EquilibriumState.SteelYielding, guess=0.3)
+    failure_points = equilibrium_points(compiled_sections, None, EquilibriumState.SteelFailure, guess=0.2)
+    tendon_points = equilibrium_points(compiled_sections, None, EquilibriumState.TendonFailure, guess=0.1)
+    has_tendon = np.array([section.has_tendon for section in compiled_sections])
+    if (np.any(np.isnan(yielding_points[1])) or np.any(np.isnan(failure_points[1]))
+            or np.any(np.isnan(tendon_points[1][has_tendon]))):
+        raise ValueError('no neutral axis balancing the forces at a limit point of the sections')
 
-        # Steel failure
-        theta_axis_points.append(
-            steel_failure(
-                initial_guess=[0.02, 0.2],
-                section=section,
-                frame=frame
-            )
+    # Moment rotation backbones, traced on dense rotation grids
+    backbones = trace_backbone(
+        compiled_sections,
+        yielding_points,
+        failure_points,
+        tendon_points,
+        n_points=options.backbone_points
+    )
+
+    for i, (section, compiled_section) in enumerate(zip(sections, compiled_sections)):
+        yielding_point = [yielding_points[0][i], yielding_points[1][i]]
+        failure_point = [failure_points[0][i], failure_points[1][i]]
+        thetas, neutral_axes, failure_index = backbones[i]
+        backbone_moments = tendon_moment(
+            theta=thetas,
+            neutral_axis=neutral_axes,
+            section=compiled_section
+        ) + axial_moment(
+            theta=thetas,
+            neutral_axis=neutral_axes,
+            section=compiled_section
         )
-        # Tendon yielding
-        if section.tendon is not None:
-            theta_axis_points.append(
-                tendon_failure(
-                    initial_guess=[0.05, 0.1],
-                    section=section,
-                    frame=frame
-                )
-            )
-        
-        # Additional points
-        delta_theta = (
-            (theta_axis_points[1][0] - theta_axis_points[0][0]) 
-            / (options.pt_points + 1)
-        ) # (Theta_s - Thesta_y) / ...
-
-        for i in range(options.pt_points):
-            theta = delta_theta * (i + 1) + theta_axis_points[0][0]  # dTheta * (i+1) + Theta_y
-            neutral_axis = get_neutral_axis(
-                initial_guess=[theta_axis_points[1][1]],
-                theta=theta,
-                section=section,
-                frame=frame
-            )
-            theta_axis_points.append(
-                [theta, neutral_axis[0]]
-            )
-        
+        # Steel yielding, steel failure and tendon failure are always kept,
+        # at most pt_points more are picked within the moment tolerance
+        link_points = simplify_backbone(
+            thetas,
+            backbone_moments,
+            fixed_points=[0, failure_index, len(thetas) - 1],
+            max_points=options.pt_points,
+            tolerance=options.backbone_tolerance
+        )
+
         # MULTILINEAR ELASTIC LINK
         # Initialize
         mul_el_link = MultilinearElasticLink(
@@ -88,27 +113,11 @@ def compute_moment_rotation(frame: Frame) -> Frame:
         mul_el_link.stress.append(decompression_stress)
         mul_el_link.stress.append(-decompression_stress)
         # Mom-Theta points
-        for point in theta_axis_points:
-            mul_el_link.strain.append(point[0])
-            mul_el_link.strain.append(-point[0])
-            stress = sum(
-                [
-                    tendon_moment(
-                        theta=point[0],
-                        neutral_axis=point[1],
-                        section=section,
-                        frame=frame
-                    ),
-                    axial_moment(
-                        theta=point[0],
-                        neutral_axis=point[1],
-                        section=section,
-                        frame=frame
-                    )
-                ]
-            )
-            mul_el_link.stress.append(stress)
-            mul_el_link.stress.append(-stress)
+        for point in link_points:
+            mul_el_link.strain.append(thetas[point])
+            mul_el_link.strain.append(-thetas[point])
+            mul_el_link.stress.append(backbone_moments[point])
+            mul_el_link.stress.append(-backbone_moments[point])
         
         mul_el_link.strain.sort()
         mul_el_link.stress.sort()
@@ -118,20 +127,18 @@ def compute_moment_rotation(frame: Frame) -> Frame:
         # MULTILINEAR PLASTIC LINK
         # Fy & E0
         yielding_moment = steel_moment(
-            theta=theta_axis_points[0][0],
-            neutral_axis=theta_axis_points[0][1],
-            section=section,
-            frame=frame
+            theta=yielding_point[0],
+            neutral_axis=yielding_point[1],
+            section=compiled_section
         )
-        elastic_stiffness = yielding_moment / theta_axis_points[0][0]
+        elastic_stiffness = yielding_moment / yielding_point[0]
         post_yielding_moment = steel_moment(
-            theta=theta_axis_points[1][0],
-            neutral_axis=theta_axis_points[1][1],
-            section=section,
-            frame=frame
+            theta=failure_point[0],
+            neutral_axis=failure_point[1],
+            section=compiled_section
         )
         plastic_stiffness = ((post_yielding_moment - yielding_moment) 
-                             / (theta_axis_points[1][0] - theta_axis_points[0][0]))
+                             / (failure_point[0] - yielding_point[0]))
         # link type
         if options.use_GM:
             b = plastic_stiffness/elastic_stiffness
@@ -139,7 +146,7 @@ def compute_moment_rotation(frame: Frame) -> Frame:
                 Fy=yielding_moment,
                 E0=elastic_stiffness,
                 b=b,
-                strain_limit=theta_axis_points[1][0]
+                strain_limit=failure_point[0]
             )
         else:
             H_kin = (elastic_stiffness * plastic_stiffness 
@@ -148,7 +155,50 @@ def compute_moment_rotation(frame: Frame) -> Frame:
                 Fy=yielding_moment,
                 E0=elastic_stiffness,
                 H_kin=H_kin,
-                strain_limit=theta_axis_points[1][0]
+                strain_limit=failure_point[0]
             )
 
+    # the other identical sections share the links
+    for (section, _), section_key in zip(frame_sections, section_keys):
+        solved_section, _ = solved_sections[section_key]
+        section.multilinear_elastic_link = solved_section.multilinear_elastic_link
+        section.kinetic_link = solved_section.kinetic_link
+        section.GM_link = solved_section.GM_link
+
+    return frames
+
+
+def frame_links(frame: Frame) -> List[tuple]:
+    """
+    Links of each section of a populated frame, so that a frame built again
+    from the same data, e.g. by an analysis worker, skips the moment rotation
+
+    Args:
+        frame (Frame): populated frame object
+
+    Returns:
+        List[tuple]: elastic, kinetic and GM link of each section
+    """
+    return [
+        (section.multilinear_elastic_link, section.kinetic_link, section.GM_link)
+        for section in frame.beam_sections + [frame.int_column_section, frame.ext_column_section]
+    ]
+
+
+def assign_frame_links(frame: Frame, links: List[tuple]) -> Frame:
+    """
+    Populates the sections of a frame with links computed before
+
+    Args:
+        frame (Frame): frame object
+        links (List[tuple]): links as returned by frame_links
+
+    Returns:
+        Frame: populated frame object
+    """
+    sections = frame.beam_sections + [frame.int_column_section, frame.ext_column_section]
+    for section, (elastic_link, kinetic_link, GM_link) in zip(sections, links):
+        section.multilinear_elastic_link = elastic_link
+        section.kinetic_link = kinetic_link
+        section.GM_link = GM_link
     return frame
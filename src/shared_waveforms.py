@@ -0,0 +1,204 @@
+from contextlib import contextmanager, nullcontext
+from multiprocessing import Pool, shared_memory
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+import model.config as config
+from src.classes import TimeHistoryAnalysis
+from src.record_preprocessing import preprocess_time_histories
+from src.scripts import import_time_history_analysis
+from src.utils import export_to_json, import_configuration
+from src.waveform_library import build_waveform_library, load_waveform
+
+
+# Shared block attached by the pool workers
+_attached_block: shared_memory.SharedMemory = None
+_attached_layout: Dict[str, Tuple[int, int]] = {}
+
+
+class SharedWaveforms:
+    """
+    Ground motions loaded once by the parent process into a shared memory
+    block. Pool workers attach to it through attach_shared_waveforms and
+    read the records without any file access
+    """
+
+    def __init__(self, waveform_folder: Path,
+                 filenames: Iterable[str],
+                 records: Dict[str, npt.NDArray] = None):
+        """
+        Loads the records in a new shared memory block
+
+        Args:
+            waveform_folder (Path): folder holding the waveforms
+            filenames (Iterable[str]): records needed by the analyses
+            records (Dict[str, npt.NDArray], optional): preprocessed records by
+                file name, shared in place of the waveform files. Defaults to None.
+        """
+        if records is None:
+            records = {}
+        records = {
+            filename: records[filename] if filename in records
+            else load_waveform(waveform_folder, filename)
+            for filename in dict.fromkeys(filenames)
+        }
+        self.layout: Dict[str, Tuple[int, int]] = {}
+        offset = 0
+        for filename, values in records.items():
+            self.layout[filename] = (offset, values.size)
+            offset += values.size
+
+        self.block = shared_memory.SharedMemory(
+            create=True,
+            size=max(1, offset) * np.dtype(np.float64).itemsize
+        )
+        data = np.ndarray((offset,), dtype=np.float64, buffer=self.block.buf)
+        for filename, (start, length) in self.layout.items():
+            data[start:start + length] = records[filename]
+
+    @property
+    def initargs(self) -> tuple:
+        """
+        Pool initializer arguments for attach_shared_waveforms
+        """
+        return (self.block.name, self.layout)
+
+    def __enter__(self) -> 'SharedWaveforms':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Releases the shared block, workers must have terminated
+        """
+        self.block.close()
+        self.block.unlink()
+
+
+def attach_shared_waveforms(block_name: str, layout: Dict[str, Tuple[int, int]]) -> None:
+    """
+    Pool initializer, attaches the worker to the shared ground motions
+
+    Args:
+        block_name (str): name of the shared memory block
+        layout (Dict[str, Tuple[int, int]]): offset and length of each record
+    """
+    global _attached_block, _attached_layout
+    _attached_block = shared_memory.SharedMemory(name=block_name)
+    _attached_layout = layout
+
+
+def shared_waveform(filename: str) -> npt.NDArray:
+    """
+    Read-only view of a shared ground motion, None if the process is not
+    attached or the record was not loaded
+
+    Args:
+        filename (str): waveform file name
+
+    Returns:
+        npt.NDArray: record values
+    """
+    if _attached_block is None or filename not in _attached_layout:
+        return None
+    start, length = _attached_layout[filename]
+    values = np.ndarray(
+        (length,),
+        dtype=np.float64,
+        buffer=_attached_block.buf,
+        offset=start * np.dtype(np.float64).itemsize
+    )
+    values.flags.writeable = False
+    return values
+
+
+@contextmanager
+def time_history_pool(th_options_path: Path = None,
+                      waveform_folder: Path = None,
+                      case_ids: Iterable[int] = None,
+                      processes: int = None) -> Iterator[Tuple[Pool, List[TimeHistoryAnalysis]]]:
+    """
+    Pool of workers sharing the ground motions of a set of time history
+    analyses. The waveform library of the records is built and the records
+    are preprocessed as configured in config.yaml. Without time history
+    options the pool shares no record
+
+    Args:
+        th_options_path (Path, optional): path to time history input options.
+            Defaults to None, no time history analysis.
+        waveform_folder (Path, optional): folder holding the waveforms, needed
+            with th_options_path. Defaults to None.
+        case_ids (Iterable[int], optional): ids of the cases to run. Defaults
+            to all the cases.
+        processes (int, optional): number of workers. Defaults to one less
+            than the number of cpus.
+
+    Yields:
+        Iterator[Tuple[Pool, List[TimeHistoryAnalysis]]]: pool and the
+            preprocessed analyses to run
+    """
+    timehistory_analyses = []
+    shared_waveforms = None
+    if th_options_path is not None:
+        timehistory_analyses = import_time_history_analysis(th_options_path)
+        if case_ids is not None:
+            case_ids = set(case_ids)
+            timehistory_analyses = [
+                time_history for time_history in timehistory_analyses
+                if time_history.id in case_ids
+            ]
+        build_waveform_library(
+            waveform_folder,
+            {time_history.filename: time_history.time_step for time_history in timehistory_analyses}
+        )
+
+        cfg: config.MNINTConfig
+        cfg = import_configuration(config.CONFIG_PATH, object_hook=config.MNINTConfig)
+        timehistory_analyses, preprocessed_records = preprocess_time_histories(
+            timehistory_analyses,
+            waveform_folder,
+            cfg.preprocessing_options
+        )
+        # records are read once and shared with the workers
+        shared_waveforms = SharedWaveforms(
+            waveform_folder,
+            [time_history.filename for time_history in timehistory_analyses],
+            records=preprocessed_records
+        )
+
+    if processes is None:
+        processes = max(1, (os.cpu_count() or 1) - 1)
+    with shared_waveforms or nullcontext(), Pool(
+        processes=processes,
+        initializer=attach_shared_waveforms if shared_waveforms else None,
+        initargs=shared_waveforms.initargs if shared_waveforms else ()
+    ) as pool:
+        yield pool, timehistory_analyses
+
+
+def export_time_history_status(status_path: Path,
+                               time_histories: List[TimeHistoryAnalysis],
+                               states: Iterable[bool]) -> None:
+    """
+    Writes the success of each time history analysis by case id
+
+    Args:
+        status_path (Path): path to status json file
+        time_histories (List[TimeHistoryAnalysis]): analyses run
+        states (Iterable[bool]): success of each analysis
+    """
+    export_to_json(
+        filepath=status_path,
+        data=dict(
+            zip(
+                [time_history.id for time_history in time_histories],
+                states
+            )
+        )
+    )
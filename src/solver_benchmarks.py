@@ -0,0 +1,397 @@
+import copy
+import platform
+import subprocess
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from model.enums import EquilibriumState
+from .classes import Frame, compile_section
+from .moment_rotation import clear_equilibrium_points, equilibrium_points, section_arrays, trace_backbone
+from .moment_rotation import section_solver
+from .scripts import (build_frame, compute_frames_limit_states, compute_limit_states,
+                      compute_moment_rotations)
+from .scripts.moment_rotation import options as moment_rotation_options
+
+
+# Frames of the generated section populations, each frame has its beams and
+# two columns
+GENERATED_POPULATIONS = {
+    'population_small': 20,
+    'population_large': 100
+}
+POPULATION_SEED = 1
+# Ranges of the generated sections, factors on the base section except for
+# the dissipator bars
+POPULATION_RANGES = {
+    'tendons_pt': (0.5, 1.1),
+    'reinforcement_count': (1, 4),
+    'b': (0.8, 1.2),
+    'h': (0.8, 1.2)
+}
+# Limit points of compute_moment_rotations and compute_frames_limit_states,
+# with their neutral axis guesses
+LIMIT_POINTS = (
+    (EquilibriumState.SteelYielding, 0.3),
+    (EquilibriumState.SteelFailure, 0.2),
+    (EquilibriumState.TendonFailure, 0.1),
+    (EquilibriumState.TimberYielding, 0.1)
+)
+
+
+class EvaluationCounter:
+    """
+    Number of force balance evaluations, calls and evaluated points
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.points = 0
+
+
+@contextmanager
+def count_evaluations() -> Iterator[EvaluationCounter]:
+    """
+    Counts the force balance evaluations of the section solvers within the
+    context. The solvers find force_balance in their module, so it is
+    wrapped there and restored on exit
+
+    Yields:
+        Iterator[EvaluationCounter]: counter
+    """
+    counter = EvaluationCounter()
+    force_balance = section_solver.force_balance
+
+    def counted_force_balance(*args, **kwargs):
+        result = force_balance(*args, **kwargs)
+        counter.calls += 1
+        counter.points += int(np.size(result[0]))
+        return result
+
+    section_solver.force_balance = counted_force_balance
+    try:
+        yield counter
+    finally:
+        section_solver.force_balance = force_balance
+
+
+def generate_population(input_data: Dict[str, dict], n_frames: int, seed: int = POPULATION_SEED) -> List[Dict[str, dict]]:
+    """
+    Input data of frames whose sections have random post tensioning,
+    dissipator bars and size within POPULATION_RANGES
+
+    Args:
+        input_data (Dict[str, dict]): base frame, steel, tendon and timber input data
+        n_frames (int): number of frames
+        seed (int, optional): random seed. Defaults to POPULATION_SEED.
+
+    Returns:
+        List[Dict[str, dict]]: input data of each frame
+    """
+    rng = np.random.default_rng(seed)
+    population = []
+    for _ in range(n_frames):
+        frame_data = copy.deepcopy(input_data['frame_data'])
+        sections = frame_data['sections']
+        for section in sections['beams'] + [sections['internal_column'], sections['external_column']]:
+            section['tendons_pt'] *= rng.uniform(*POPULATION_RANGES['tendons_pt'])
+            section['reinforcement_count'] = int(rng.integers(
+                POPULATION_RANGES['reinforcement_count'][0],
+                POPULATION_RANGES['reinforcement_count'][1] + 1
+            ))
+            section['b'] *= rng.uniform(*POPULATION_RANGES['b'])
+            section['h'] *= rng.uniform(*POPULATION_RANGES['h'])
+        population.append(dict(input_data, frame_data=frame_data))
+    return population
+
+
+def time_stage(function: Callable, repeats: int, setup: Callable = None) -> Tuple[object, dict]:
+    """
+    Times a solver stage. A first run counts the force balance evaluations
+    and gives the result, then the stage is timed repeats times without the
+    counter. setup runs before every run, outside of the timing
+
+    Args:
+        function (Callable): stage
+        repeats (int): number of timed runs
+        setup (Callable, optional): run before each run, e.g. to empty the
+            equilibrium cache. Defaults to None.
+
+    Returns:
+        Tuple[object, dict]: stage result and timing record
+    """
+    if setup is not None:
+        setup()
+    with count_evaluations() as counter:
+        result = function()
+
+    times = []
+    for _ in range(repeats):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return result, dict(
+        min_time=float(np.min(times)),
+        median_time=float(np.median(times)),
+        force_balance_calls=counter.calls,
+        evaluated_points=counter.points
+    )
+
+
+def benchmark_frames(frames: List[Frame], repeats: int) -> Tuple[Dict[str, dict], Dict[str, npt.NDArray]]:
+    """
+    Times every stage of the moment rotation and limit state solvers on the
+    sections of the frames
+
+    Args:
+        frames (List[Frame]): frames
+        repeats (int): number of timed runs of each stage
+
+    Returns:
+        Tuple[Dict[str, dict], Dict[str, npt.NDArray]]: timing record of each
+            stage and result values of each section by quantity
+    """
+    stages = {}
+    frame_sections = [
+        (section, frame)
+        for frame in frames
+        for section in frame.beam_sections + [frame.int_column_section, frame.ext_column_section]
+    ]
+
+    compiled_sections, stages['compile_sections'] = time_stage(
+        lambda: [compile_section(section, frame) for section, frame in frame_sections],
+        repeats
+    )
+    _, stages['section_arrays'] = time_stage(lambda: section_arrays(compiled_sections), repeats)
+
+    limit_points = {}
+    for state, guess in LIMIT_POINTS:
+        limit_points[state], stages[state.value] = time_stage(
+            lambda: equilibrium_points(compiled_sections, None, state, guess=guess),
+            repeats,
+            setup=clear_equilibrium_points
+        )
+    _, stages['trace_backbone'] = time_stage(
+        lambda: trace_backbone(
+            compiled_sections,
+            limit_points[EquilibriumState.SteelYielding],
+            limit_points[EquilibriumState.SteelFailure],
+            limit_points[EquilibriumState.TendonFailure],
+            n_points=moment_rotation_options.backbone_points
+        ),
+        repeats
+    )
+
+    # whole solvers, from an empty equilibrium cache and then from a full one
+    _, stages['moment_rotation'] = time_stage(
+        lambda: compute_moment_rotations(frames),
+        repeats,
+        setup=clear_equilibrium_points
+    )
+    _, stages['moment_rotation_warm'] = time_stage(lambda: compute_moment_rotations(frames), repeats)
+    frames_limit_states, stages['limit_states'] = time_stage(
+        lambda: compute_frames_limit_states(frames),
+        repeats,
+        setup=clear_equilibrium_points
+    )
+    _, stages['limit_states_per_section'] = time_stage(
+        lambda: [compute_limit_states(frame, section) for section, frame in frame_sections],
+        repeats,
+        setup=clear_equilibrium_points
+    )
+
+    links = [
+        section.GM_link if section.GM_link is not None else section.kinetic_link
+        for section, _ in frame_sections
+    ]
+    limit_states = [section_limit_states for frame_limit_states in frames_limit_states
+                    for section_limit_states in frame_limit_states]
+    values = {
+        'yielding_moment': np.array([link.Fy for link in links]),
+        'elastic_stiffness': np.array([link.E0 for link in links]),
+        'failure_theta': np.array([link.strain_limit for link in links]),
+        'peak_pt_moment': np.array([
+            max(section.multilinear_elastic_link.stress) for section, _ in frame_sections
+        ]),
+        'last_pt_theta': np.array([
+            max(section.multilinear_elastic_link.strain) for section, _ in frame_sections
+        ]),
+        'DS1': np.array([ls.DS1 for ls in limit_states], dtype=float),
+        'DS2': np.array([np.nan if ls.DS2 is None else ls.DS2 for ls in limit_states], dtype=float),
+        'DST': np.array([ls.DST for ls in limit_states], dtype=float)
+    }
+    return stages, values
+
+
+def value_statistics(values: Dict[str, npt.NDArray]) -> Dict[str, Dict[str, float]]:
+    """
+    Statistics of the result values, sections without a value (nan) are skipped
+
+    Args:
+        values (Dict[str, npt.NDArray]): result values of each section by quantity
+
+    Returns:
+        Dict[str, Dict[str, float]]: count, min, mean and max of each quantity
+    """
+    statistics = {}
+    for name, value in values.items():
+        value = value[np.isfinite(value)]
+        statistics[name] = dict(
+            count=int(value.size),
+            min=float(np.min(value)) if value.size else None,
+            mean=float(np.mean(value)) if value.size else None,
+            max=float(np.max(value)) if value.size else None
+        )
+    return statistics
+
+
+def reference_values(values: Dict[str, npt.NDArray]) -> Dict[str, List[float]]:
+    """
+    Result values of each section stored as reference, sections without a
+    value (nan) hold None
+
+    Args:
+        values (Dict[str, npt.NDArray]): result values of each section by quantity
+
+    Returns:
+        Dict[str, List[float]]: values of each section by quantity, json serializable
+    """
+    return {
+        name: [float(section_value) if np.isfinite(section_value) else None for section_value in value]
+        for name, value in values.items()
+    }
+
+
+def check_reference(cases: Dict[str, dict], reference: Dict[str, dict], rtol: float = 1e-6) -> List[dict]:
+    """
+    Compares the result values of each section of the cases with the
+    reference ones
+
+    Args:
+        cases (Dict[str, dict]): benchmark cases holding their section 'values'
+        reference (Dict[str, dict]): reference section values by case and quantity
+        rtol (float, optional): relative tolerance. Defaults to 1e-6.
+
+    Returns:
+        List[dict]: mismatches, empty if every value matches. Cases or
+            quantities missing or with another number of sections have no
+            section index
+    """
+    failures = []
+    for case, reference_values in reference.items():
+        if case not in cases:
+            failures.append(dict(case=case, quantity=None, section=None, value=None, reference=None))
+            continue
+        for quantity, reference_value in reference_values.items():
+            # None, a section without value, is read as nan
+            reference_value = np.array(reference_value, dtype=float)
+            value = np.array(cases[case]['values'].get(quantity, []), dtype=float)
+            if value.shape != reference_value.shape:
+                failures.append(dict(
+                    case=case, quantity=quantity, section=None,
+                    value=value.size, reference=reference_value.size
+                ))
+                continue
+            mismatches = ~np.isclose(value, reference_value, rtol=rtol, atol=0., equal_nan=True)
+            failures += [
+                dict(
+                    case=case, quantity=quantity, section=int(section),
+                    value=float(value[section]), reference=float(reference_value[section])
+                )
+                for section in np.flatnonzero(mismatches)
+            ]
+    return failures
+
+
+def compare_benchmarks(current: dict, baseline: dict) -> List[dict]:
+    """
+    Stage timings and evaluations of a benchmark over a baseline one, e.g.
+    of an older commit
+
+    Args:
+        current (dict): benchmark output
+        baseline (dict): baseline benchmark output
+
+    Returns:
+        List[dict]: case, stage, time ratio and evaluation ratio of the
+            stages found in both
+    """
+    rows = []
+    for case, case_data in current['cases'].items():
+        baseline_stages = baseline['cases'].get(case, {}).get('stages', {})
+        for stage, record in case_data['stages'].items():
+            if stage not in baseline_stages:
+                continue
+            baseline_record = baseline_stages[stage]
+            rows.append(dict(
+                case=case,
+                stage=stage,
+                min_time=record['min_time'],
+                baseline_min_time=baseline_record['min_time'],
+                time_ratio=record['min_time'] / baseline_record['min_time'] if baseline_record['min_time'] > 0 else np.nan,
+                evaluated_points_ratio=(
+                    record['evaluated_points'] / baseline_record['evaluated_points']
+                    if baseline_record['evaluated_points'] > 0 else np.nan
+                )
+            ))
+    return rows
+
+
+def run_benchmarks(input_data: Dict[str, dict], repeats: int) -> dict:
+    """
+    Benchmarks the solvers on the input frame and on the generated section
+    populations
+
+    Args:
+        input_data (Dict[str, dict]): frame, steel, tendon and timber input data
+        repeats (int): number of timed runs of each stage
+
+    Returns:
+        dict: benchmark output, machine readable
+    """
+    case_inputs = {'input_frame': [input_data]}
+    for case, n_frames in GENERATED_POPULATIONS.items():
+        case_inputs[case] = generate_population(input_data, n_frames)
+
+    cases = {}
+    for case, inputs in case_inputs.items():
+        frames = [build_frame(**frame_input) for frame_input in inputs]
+        stages, values = benchmark_frames(frames, repeats)
+        cases[case] = dict(
+            n_sections=len(values['DST']),
+            stages=stages,
+            statistics=value_statistics(values),
+            values=reference_values(values)
+        )
+        print(f'{case}: {cases[case]["n_sections"]} sections, '
+              f'moment rotation {stages["moment_rotation"]["min_time"]:.4f}s, '
+              f'limit states {stages["limit_states"]["min_time"]:.4f}s')
+
+    return dict(
+        commit=_git_commit(),
+        date=datetime.now().isoformat(timespec='seconds'),
+        python=platform.python_version(),
+        numpy=np.__version__,
+        machine=platform.machine(),
+        repeats=repeats,
+        cases=cases
+    )
+
+
+def _git_commit() -> str:
+    """
+    Commit of the working tree, None outside of a git repository
+    """
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
@@ -0,0 +1,195 @@
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+import numpy.typing as npt
+from scipy.optimize import brentq
+from scipy.signal import butter, sosfiltfilt
+from scipy.special import gammaincinv
+from scipy.stats import gamma
+
+from src.time_series_tools import G, _recurrence_coefficients
+from src.waveform_library import WaveformLibrary
+
+
+def _integrate(values: npt.NDArray, time_step: float) -> npt.NDArray:
+    """
+    Cumulative trapezoidal integral of each row, starting from zero
+    """
+    integral = np.zeros_like(values)
+    integral[:, 1:] = np.cumsum(values[:, 1:] + values[:, :-1], axis=1) * time_step / 2
+    return integral
+
+
+def modulating_shape(significant_duration: float, mid_time: float) -> Tuple[float, float]:
+    """
+    Shape and scale of the gamma density proportional to the squared
+    modulating function, from the 5-95% significant duration and the time
+    at 45% of the Arias intensity
+
+    Args:
+        significant_duration (float): 5-95% significant duration D5-95 [s]
+        mid_time (float): time at 45% of the Arias intensity [s]
+
+    Returns:
+        Tuple[float, float]: gamma shape and scale [s]
+    """
+    def duration_ratio(shape: float) -> float:
+        return ((gammaincinv(shape, 0.95) - gammaincinv(shape, 0.05))
+                / gammaincinv(shape, 0.45) - significant_duration / mid_time)
+
+    # the ratio decreases from the exponential density (shape 1) onwards
+    if duration_ratio(1.) <= 0:
+        raise ValueError(
+            f'significant duration {significant_duration}s too long for the mid time {mid_time}s'
+        )
+    shape = brentq(duration_ratio, 1., 1e4)
+    return shape, mid_time / gammaincinv(shape, 0.45)
+
+
+def generate_ground_motions(n_records: int,
+                            time_step: float,
+                            duration: float,
+                            arias_intensity: npt.ArrayLike,
+                            significant_duration: npt.ArrayLike,
+                            mid_time: npt.ArrayLike,
+                            mid_frequency: npt.ArrayLike,
+                            frequency_slope: npt.ArrayLike,
+                            filter_damping: npt.ArrayLike,
+                            min_frequency: float = 0.3,
+                            corner_frequency: float = 0.1,
+                            baseline_correction: bool = True,
+                            seed: int = None) -> npt.NDArray:
+    """
+    Generates records as modulated, filtered white noise (Rezaeian & Der
+    Kiureghian). The noise drives a SDOF filter whose frequency changes
+    linearly in time, the response is normalized to unit variance and
+    modulated by a gamma shaped envelope. Records are then high pass filtered
+    and baseline corrected, and scaled to their Arias intensity. All the
+    records are integrated together, model parameters are one value for all
+    the records or one value per record
+
+    Args:
+        n_records (int): number of records
+        time_step (float): time step of the records [s]
+        duration (float): duration of the records [s]
+        arias_intensity (npt.ArrayLike): Arias intensity [m/s]
+        significant_duration (npt.ArrayLike): 5-95% significant duration [s]
+        mid_time (npt.ArrayLike): time at 45% of the Arias intensity [s]
+        mid_frequency (npt.ArrayLike): filter frequency at the mid time [Hz]
+        frequency_slope (npt.ArrayLike): rate of change of the filter frequency [Hz/s]
+        filter_damping (npt.ArrayLike): filter critical damping ratio
+        min_frequency (float, optional): lowest filter frequency [Hz]. Defaults to 0.3.
+        corner_frequency (float, optional): corner of the 4th order Butterworth
+            high pass, 0 to skip it [Hz]. Defaults to 0.1.
+        baseline_correction (bool, optional): remove the polynomial trend
+            leaving residual velocity and displacement. Defaults to True.
+        seed (int, optional): random generator seed. Defaults to None.
+
+    Returns:
+        npt.NDArray: accelerations (records x steps) [m/s2]
+    """
+    def per_record(values: npt.ArrayLike) -> npt.NDArray:
+        return np.broadcast_to(np.asarray(values, dtype=float), (n_records,)).copy()
+
+    arias_intensity = per_record(arias_intensity)
+    significant_duration = per_record(significant_duration)
+    mid_time = per_record(mid_time)
+    mid_frequency = per_record(mid_frequency)
+    frequency_slope = per_record(frequency_slope)
+    filter_damping = per_record(filter_damping)
+    times = np.arange(int(round(duration / time_step)) + 1) * time_step
+
+    # time varying filter, exact recurrence for a load constant over the step
+    filter_frequencies = np.maximum(
+        mid_frequency[:, np.newaxis] + frequency_slope[:, np.newaxis] * (times - mid_time[:, np.newaxis]),
+        min_frequency
+    )
+    a11, a12, a21, a22, c_u, c_v, d_u, d_v = _recurrence_coefficients(
+        2 * np.pi * filter_frequencies,
+        filter_damping[:, np.newaxis],
+        time_step
+    )
+    b_u, b_v = c_u + d_u, c_v + d_v
+
+    white_noise = np.random.default_rng(seed).standard_normal((n_records, times.size))
+    responses = np.zeros((n_records, times.size))
+    displacements = np.zeros(n_records)
+    velocities = np.zeros(n_records)
+    # state covariance of the filter under unit variance noise
+    var_u = np.zeros(n_records)
+    cov_uv = np.zeros(n_records)
+    var_v = np.zeros(n_records)
+    for k in range(times.size - 1):
+        displacements, velocities = (
+            a11[:, k] * displacements + a12[:, k] * velocities + b_u[:, k] * white_noise[:, k],
+            a21[:, k] * displacements + a22[:, k] * velocities + b_v[:, k] * white_noise[:, k]
+        )
+        var_u, cov_uv, var_v = (
+            a11[:, k]**2 * var_u + 2 * a11[:, k] * a12[:, k] * cov_uv + a12[:, k]**2 * var_v + b_u[:, k]**2,
+            (a11[:, k] * a21[:, k] * var_u + (a11[:, k] * a22[:, k] + a12[:, k] * a21[:, k]) * cov_uv
+             + a12[:, k] * a22[:, k] * var_v + b_u[:, k] * b_v[:, k]),
+            a21[:, k]**2 * var_u + 2 * a21[:, k] * a22[:, k] * cov_uv + a22[:, k]**2 * var_v + b_v[:, k]**2
+        )
+        responses[:, k + 1] = displacements / np.sqrt(var_u)
+
+    # modulation, the squared envelope is a gamma density
+    envelopes = np.zeros((n_records, times.size))
+    for record, (record_duration, record_mid_time) in enumerate(zip(significant_duration, mid_time)):
+        shape, scale = modulating_shape(record_duration, record_mid_time)
+        envelopes[record] = np.sqrt(gamma.pdf(times, shape, scale=scale))
+    accelerations = envelopes * responses
+
+    # zero phase high pass removing the long period content of the noise
+    if corner_frequency > 0:
+        high_pass = butter(4, corner_frequency, btype='highpass', fs=1 / time_step, output='sos')
+        accelerations = sosfiltfilt(high_pass, accelerations, axis=1)
+
+    # baseline correction, the quadratic and cubic displacement trend
+    # bringing the record to rest at its end is removed
+    if baseline_correction:
+        record_velocities = _integrate(accelerations, time_step)
+        record_displacements = _integrate(record_velocities, time_step)
+        end_time = times[-1]
+        end_conditions = np.array([[end_time**2, end_time**3], [2 * end_time, 3 * end_time**2]])
+        trend = np.linalg.solve(
+            end_conditions,
+            np.stack([record_displacements[:, -1], record_velocities[:, -1]])
+        )
+        accelerations -= (np.stack([2 * np.ones_like(times), 6 * times], axis=1) @ trend).T
+
+    record_arias = np.pi / (2 * G) * _integrate(accelerations**2, time_step)[:, -1]
+    return accelerations * np.sqrt(arias_intensity / record_arias)[:, np.newaxis]
+
+
+def write_ground_motions(ground_motions: npt.NDArray,
+                         waveform_folder: Path,
+                         time_step: float,
+                         prefix: str = 'synthetic',
+                         text_files: bool = True) -> List[str]:
+    """
+    Saves records in a waveform folder, as text files indexed in the binary
+    library or directly in the library only
+
+    Args:
+        ground_motions (npt.NDArray): accelerations (records x steps) [m/s2]
+        waveform_folder (Path): destination waveform folder
+        time_step (float): time step of the records [s]
+        prefix (str, optional): file name prefix. Defaults to 'synthetic'.
+        text_files (bool, optional): write a text file per record. Defaults to True.
+
+    Returns:
+        List[str]: file names of the records
+    """
+    waveform_folder = Path(waveform_folder)
+    waveform_folder.mkdir(parents=True, exist_ok=True)
+    filenames = [f'{prefix}_{record:04}.txt' for record in range(1, len(ground_motions) + 1)]
+
+    library = WaveformLibrary(waveform_folder)
+    if text_files:
+        for filename, ground_motion in zip(filenames, ground_motions):
+            np.savetxt(waveform_folder / filename, ground_motion, fmt='%.12e')
+        library.update({filename: time_step for filename in filenames})
+    else:
+        library.add(dict(zip(filenames, ground_motions)), time_step)
+    return filenames
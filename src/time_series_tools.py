@@ -1,53 +1,194 @@
 import math
-from typing import List
+from dataclasses import dataclass
+from typing import List, Sequence, Tuple, Union
 import numpy as np
+import numpy.typing as npt
+from scipy.signal import lfilter
 
 G = 9.81
 
 
-def spectral_acceleration(time_series: List[float], time_step: float,
-                          period: float = 0.01, csi: float = 0.05) -> float:
+@dataclass
+class ResponseSpectra:
+    """
+    Elastic response spectra of a set of records. Arrays are shaped
+    (records, damping ratios, periods)
     """
-    Computes the spectral acceleration using direct integration
+    periods: npt.NDArray
+    csi: npt.NDArray
+    Sa: npt.NDArray
+    Sv: npt.NDArray
+    Sd: npt.NDArray
 
-    Args:
-        time_series (List[float]): time series
-        time_step (float): time step of time series
-        period (float, optional): period. Defaults to 0.01.
-        csi (float, optional): critical damping ratio. Defaults to 0.05.
 
-    Returns:
-        float: spectral acceleration
-    """                         
-    # TH
-    base_acc = np.array(time_series)
+def _recurrence_coefficients(omega: npt.NDArray,
+                             csi: npt.NDArray,
+                             time_step: float) -> Tuple[npt.NDArray, ...]:
+    """
+    Exact recurrence coefficients of a unit mass SDOF under a piecewise linear
+    load (Nigam & Jennings). Returns the state matrix (a11, a12, a21, a22) and
+    the load vectors at the start (c_u, c_v) and end (d_u, d_v) of the step
+    """
+    k = omega**2
+    sqrt_csi = np.sqrt(1 - csi**2)
+    omega_d = omega * sqrt_csi
+    e = np.exp(-csi * omega * time_step)
+    s = np.sin(omega_d * time_step)
+    c = np.cos(omega_d * time_step)
+    r = csi / sqrt_csi
 
-    base_acc_g = base_acc/G
+    a11 = e * (r * s + c)
+    a12 = e * s / omega_d
+    a21 = -e * omega / sqrt_csi * s
+    a22 = e * (c - r * s)
+    c_u = (2 * csi / (omega * time_step)
+           + e * (((1 - 2 * csi**2) / (omega_d * time_step) - r) * s
+                  - (1 + 2 * csi / (omega * time_step)) * c)) / k
+    d_u = (1 - 2 * csi / (omega * time_step)
+           + e * ((2 * csi**2 - 1) / (omega_d * time_step) * s
+                  + 2 * csi / (omega * time_step) * c)) / k
+    c_v = (-1 / time_step
+           + e * ((omega / sqrt_csi + r / time_step) * s + c / time_step)) / k
+    d_v = (1 - e * (r * s + c)) / (k * time_step)
+    return a11, a12, a21, a22, c_u, c_v, d_u, d_v
 
-    # SDOF params
-    omega_0 = 2 * math.pi / period
-    unit_mass = 1
-    force = -unit_mass * base_acc_g * G
-    k = unit_mass * omega_0**2
-    c = 2 * csi * unit_mass * omega_0
 
-    # Integration params
-    A = unit_mass / time_step**2
-    B = c / (2 * time_step)
+def _sdof_response(ground_motions: npt.NDArray,
+                   omega: float,
+                   csi: float,
+                   time_step: float) -> Tuple[npt.NDArray, npt.NDArray]:
+    """
+    Relative displacement and velocity histories of a SDOF for many records at
+    once, from rest. The recurrence is applied as a second order IIR filter
+    """
+    a11, a12, a21, a22, c_u, c_v, d_u, d_v = _recurrence_coefficients(
+        np.asarray(omega), np.asarray(csi), time_step
+    )
+    load = -ground_motions
+    denominator = [1., -(a11 + a22), a11 * a22 - a12 * a21]
+    u_numerator = [d_u, c_u - a22 * d_u + a12 * d_v, a12 * c_v - a22 * c_u]
+    v_numerator = [d_v, c_v - a11 * d_v + a21 * d_u, a21 * c_u - a11 * c_v]
+    displacements = lfilter(u_numerator, denominator, load, axis=-1)
+    velocities = lfilter(v_numerator, denominator, load, axis=-1)
 
-    u_r = np.zeros(len(base_acc))
-    a_r = np.zeros(len(base_acc))
+    # the filter sees a load ramping from zero to the first sample over the
+    # step before the record, its free response is removed to start from rest
+    impulse = np.zeros(load.shape[-1])
+    impulse[0] = 1.
+    free_u = lfilter([d_u, a12 * d_v - a22 * d_u], denominator, impulse)
+    free_v = lfilter([d_v, a21 * d_u - a11 * d_v], denominator, impulse)
+    displacements -= load[:, :1] * free_u
+    velocities -= load[:, :1] * free_v
+    return displacements, velocities
 
-    # Relative displacements
-    for i in range(1, len(base_acc) - 1):
-        u_r[i + 1] = 1/(A + B) * (force[i] - u_r[i] * (k - 2*A) - u_r[i - 1] * (A - B))
 
-    # Relative accelerations
-    for i in range(1, len(base_acc) - 1):
-        a_r[i] = (u_r[i + 1] + u_r[i - 1] - 2*u_r[i]) / (time_step**2 * G)
+def _peak(histories: npt.NDArray) -> npt.NDArray:
+    """
+    Peak absolute value of each row, without an abs temporary
+    """
+    return np.maximum(np.max(histories, axis=1), -np.min(histories, axis=1))
 
-    return np.max(abs(a_r + base_acc_g))
+
+def _record_groups(records: List[npt.NDArray],
+                   time_steps: npt.NDArray,
+                   max_padding: float = 1.5) -> List[Tuple[float, npt.NDArray]]:
+    """
+    Splits the records in groups sharing the time step, in which the longest
+    record is at most max_padding times the shortest one
+    """
+    groups = []
+    for dt in np.unique(time_steps):
+        same_step = np.flatnonzero(time_steps == dt)
+        by_length = same_step[np.argsort([records[i].size for i in same_step], kind='stable')]
+        start = 0
+        for end in range(1, by_length.size + 1):
+            if (end == by_length.size or
+                    records[by_length[end]].size > max_padding * max(1, records[by_length[start]].size)):
+                groups.append((dt, by_length[start:end]))
+                start = end
+    return groups
 
 
+def response_spectrum(time_series: Union[npt.ArrayLike, Sequence[npt.ArrayLike]],
+                      time_step: Union[float, Sequence[float]],
+                      periods: npt.ArrayLike,
+                      csi: Union[float, npt.ArrayLike] = 0.05) -> ResponseSpectra:
+    """
+    Computes the elastic response spectra of many records over a period grid
+    and several damping ratios. The SDOF response is integrated exactly for
+    ground motions linear between samples, vectorized over the records
+
+    Args:
+        time_series (Union[npt.ArrayLike, Sequence[npt.ArrayLike]]): a record or
+            a list of records of any length [m/s2]
+        time_step (Union[float, Sequence[float]]): time step of the records,
+            one value for all or one per record
+        periods (npt.ArrayLike): spectral periods, 0 yields the peak ground values
+        csi (Union[float, npt.ArrayLike], optional): critical damping ratios.
+            Defaults to 0.05.
 
-    
+    Returns:
+        ResponseSpectra: peak absolute acceleration Sa [g], peak relative
+            velocity Sv [m/s] and peak relative displacement Sd [m]
+    """
+    if np.ndim(time_series[0]) == 0:
+        time_series = [time_series]
+    records = [np.asarray(record, dtype=float) for record in time_series]
+    time_steps = np.broadcast_to(np.asarray(time_step, dtype=float), (len(records),))
+    periods = np.atleast_1d(np.asarray(periods, dtype=float))
+    csi = np.atleast_1d(np.asarray(csi, dtype=float))
+
+    shape = (len(records), csi.size, periods.size)
+    spectra = ResponseSpectra(
+        periods=periods,
+        csi=csi,
+        Sa=np.zeros(shape),
+        Sv=np.zeros(shape),
+        Sd=np.zeros(shape)
+    )
+
+    # records sharing the time step and of similar length are filtered
+    # together, zero padded to the longest one and masked beyond their own length
+    for dt, group in _record_groups(records, time_steps):
+        lengths = np.array([records[i].size for i in group])
+        ground_motions = np.zeros((group.size, lengths.max()))
+        for row, i in enumerate(group):
+            ground_motions[row, :lengths[row]] = records[i]
+        padded_rows = [
+            (row, length) for row, length in enumerate(lengths) if length < lengths.max()
+        ]
+        peak_ground_acc = _peak(ground_motions)
+
+        for j, damping in enumerate(csi):
+            for p, period in enumerate(periods):
+                if period <= 0:
+                    spectra.Sa[group, j, p] = peak_ground_acc / G
+                    continue
+                omega = 2 * math.pi / period
+                displacements, velocities = _sdof_response(ground_motions, omega, damping, dt)
+                for row, length in padded_rows:
+                    displacements[row, length:] = 0.
+                    velocities[row, length:] = 0.
+                absolute_accelerations = -(2 * damping * omega * velocities + omega**2 * displacements)
+                spectra.Sa[group, j, p] = _peak(absolute_accelerations) / G
+                spectra.Sv[group, j, p] = _peak(velocities)
+                spectra.Sd[group, j, p] = _peak(displacements)
+
+    return spectra
+
+
+def spectral_acceleration(time_series: List[float], time_step: float,
+                          period: float = 0.01, csi: float = 0.05) -> float:
+    """
+    Computes the spectral acceleration of a single record at a single period
+
+    Args:
+        time_series (List[float]): time series
+        time_step (float): time step of time series
+        period (float, optional): period. Defaults to 0.01.
+        csi (float, optional): critical damping ratio. Defaults to 0.05.
+
+    Returns:
+        float: spectral acceleration
+    """
+    return float(response_spectrum(time_series, time_step, period, csi).Sa[0, 0, 0])
@@ -0,0 +1,327 @@
+import hashlib
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+import model.paths as pth
+
+from src.utils import import_from_json, export_to_json
+
+
+def read_waveform_file(file_path: Path) -> npt.NDArray:
+    """
+    Parses a waveform text file, values are read row by row as OpenSees does
+
+    Args:
+        file_path (Path): path to waveform text file
+
+    Returns:
+        npt.NDArray: waveform values
+    """
+    try:
+        values = pd.read_csv(
+            file_path,
+            sep=r'\s+',
+            header=None,
+            dtype=float,
+            engine='c',
+            float_precision='round_trip'
+        ).to_numpy().ravel()
+    except pd.errors.EmptyDataError:
+        return np.empty(0)
+    # ragged last rows of multi column files are padded with NaN
+    return values[~np.isnan(values)]
+
+
+def _file_hash(file_path: Path) -> str:
+    with open(file_path, 'rb') as waveform_file:
+        return hashlib.sha1(waveform_file.read()).hexdigest()
+
+
+def _file_signature(file_path: Path) -> dict:
+    file_stats = os.stat(file_path)
+    return {'size': file_stats.st_size, 'mtime': file_stats.st_mtime_ns}
+
+
+class WaveformLibrary:
+    """
+    Binary store of the waveforms of a folder: a single contiguous float64 file
+    and a json index holding offset, length, dt and hash of every record.
+    Records are served as read-only views of a memory map
+    """
+
+    def __init__(self, waveform_folder: Path):
+        """
+        Opens the library of a waveform folder, use update() to build it
+
+        Args:
+            waveform_folder (Path): folder holding the waveform text files
+        """
+        self.waveform_folder = Path(waveform_folder)
+        self.data_path = self.waveform_folder / pth.WAVEFORM_LIBRARY_DATA_FILE
+        self.index_path = self.waveform_folder / pth.WAVEFORM_LIBRARY_INDEX_FILE
+        self._index_signature = self._read_index_signature()
+        self.index: Dict[str, dict] = (
+            import_from_json(self.index_path) if self._index_signature is not None else {}
+        )
+        self._data = None
+
+    def _read_index_signature(self) -> dict:
+        """
+        Size and modification time of the index file, None if missing
+        """
+        try:
+            return _file_signature(self.index_path)
+        except FileNotFoundError:
+            return None
+
+    def refresh(self) -> bool:
+        """
+        Reloads the index, and maps the data file again, if the index file
+        changed since it was read, e.g. by another library of the same folder
+
+        Returns:
+            bool: True if the library was reloaded
+        """
+        signature = self._read_index_signature()
+        if signature == self._index_signature:
+            return False
+        self._index_signature = signature
+        self.index = import_from_json(self.index_path) if signature is not None else {}
+        self._data = None
+        return True
+
+    @property
+    def data(self) -> npt.NDArray:
+        """
+        Memory map over the whole library
+        """
+        if self._data is None:
+            if self.data_path.exists() and self.data_path.stat().st_size > 0:
+                self._data = np.memmap(self.data_path, dtype=np.float64, mode='r')
+            else:
+                self._data = np.empty(0)
+        return self._data
+
+    @property
+    def names(self) -> List[str]:
+        return list(self.index.keys())
+
+    def __contains__(self, filename: str) -> bool:
+        return filename in self.index
+
+    def __getitem__(self, filename: str) -> npt.NDArray:
+        """
+        Zero-copy view of a record
+
+        Args:
+            filename (str): waveform file name
+
+        Returns:
+            npt.NDArray: read-only record values
+        """
+        record = self.index[filename]
+        return self.data[record['offset']:record['offset'] + record['length']]
+
+    def time_step(self, filename: str) -> float:
+        """
+        Time step registered for a record, None if unknown
+        """
+        return self.index[filename]['dt']
+
+    def is_current(self, filename: str) -> bool:
+        """
+        Checks that a record is stored and its text file has not changed since.
+        Records added without a text file are current until one is created
+        """
+        file_path = self.waveform_folder / filename
+        if filename in self.index and self.index[filename].get('generated'):
+            return not file_path.exists()
+        return (
+            filename in self.index and file_path.exists()
+            and all(
+                self.index[filename][key] == value
+                for key, value in _file_signature(file_path).items()
+            )
+        )
+
+    def update(self, time_steps: Dict[str, float] = None) -> List[str]:
+        """
+        Brings the library in line with the text files of the folder. Unchanged
+        records are kept, new records are appended and the data file is only
+        rewritten when records are changed or removed
+
+        Args:
+            time_steps (Dict[str, float], optional): time step of the records by
+                file name, stored in the index. Defaults to None.
+
+        Returns:
+            List[str]: names of the parsed records
+        """
+        if time_steps is None:
+            time_steps = {}
+        filenames = sorted(
+            file_path.name for file_path in self.waveform_folder.glob('*.txt')
+        )
+
+        parsed_records = {}
+        new_index = {}
+        for filename in filenames:
+            file_path = self.waveform_folder / filename
+            signature = _file_signature(file_path)
+            record = self.index.get(filename)
+            if record is not None and record.get('generated'):
+                record = None
+            elif record is not None and not self.is_current(filename):
+                # touched files with unchanged content are kept
+                file_hash = _file_hash(file_path)
+                if file_hash != record['hash']:
+                    record = None
+            if record is None:
+                parsed_records[filename] = read_waveform_file(file_path)
+                record = {'hash': _file_hash(file_path), 'dt': None}
+            new_index[filename] = {
+                **record,
+                **signature,
+                'dt': time_steps.get(filename, record['dt'])
+            }
+
+        # records added without a text file are kept until one is created
+        for filename, record in self.index.items():
+            if record.get('generated') and filename not in new_index:
+                new_index[filename] = record
+
+        changed_records = any(
+            filename not in new_index or filename in parsed_records
+            for filename in self.index
+        )
+        if changed_records:
+            self._rewrite(new_index, parsed_records)
+        elif parsed_records:
+            self._append(new_index, parsed_records)
+
+        if parsed_records or new_index != self.index:
+            export_to_json(self.index_path, new_index)
+            self.index = new_index
+            self._index_signature = self._read_index_signature()
+        return list(parsed_records.keys())
+
+    def add(self, records: Dict[str, npt.ArrayLike], time_step: float) -> None:
+        """
+        Stores records that have no text file, such as generated ones.
+        Records with the same name are replaced
+
+        Args:
+            records (Dict[str, npt.ArrayLike]): record values by file name
+            time_step (float): time step of the records
+        """
+        new_records = {
+            filename: np.asarray(values, dtype=np.float64)
+            for filename, values in records.items()
+        }
+        new_index = {
+            filename: record for filename, record in self.index.items()
+            if filename not in new_records
+        }
+        for filename, values in new_records.items():
+            new_index[filename] = {
+                'hash': hashlib.sha1(values.tobytes()).hexdigest(),
+                'dt': time_step,
+                'generated': True
+            }
+
+        if len(new_index) < len(self.index) + len(new_records):
+            self._rewrite(new_index, new_records)
+        else:
+            self._append(new_index, new_records)
+        export_to_json(self.index_path, new_index)
+        self.index = new_index
+        self._index_signature = self._read_index_signature()
+
+    def _append(self, new_index: Dict[str, dict], parsed_records: Dict[str, npt.NDArray]) -> None:
+        """
+        Appends new records at the end of the data file
+        """
+        offset = sum(record['length'] for record in self.index.values())
+        with open(self.data_path, 'r+b' if self.data_path.exists() else 'wb') as data_file:
+            data_file.seek(offset * np.dtype(np.float64).itemsize)
+            data_file.truncate()
+            for filename, values in parsed_records.items():
+                data_file.write(values.astype(np.float64).tobytes())
+                new_index[filename].update(offset=offset, length=values.size)
+                offset += values.size
+        self._data = None
+
+    def _rewrite(self, new_index: Dict[str, dict], parsed_records: Dict[str, npt.NDArray]) -> None:
+        """
+        Writes a compact data file, kept records are copied from the old one
+        """
+        temporary_path = self.data_path.with_suffix('.tmp')
+        offset = 0
+        with open(temporary_path, 'wb') as data_file:
+            for filename, record in new_index.items():
+                values = parsed_records.get(filename)
+                if values is None:
+                    values = self[filename]
+                data_file.write(np.asarray(values, dtype=np.float64).tobytes())
+                record.update(offset=offset, length=values.size)
+                offset += values.size
+        self._data = None
+        os.replace(temporary_path, self.data_path)
+
+
+def build_waveform_library(waveform_folder: Path,
+                           time_steps: Dict[str, float] = None) -> WaveformLibrary:
+    """
+    Builds or updates the binary library of a waveform folder
+
+    Args:
+        waveform_folder (Path): folder holding the waveform text files
+        time_steps (Dict[str, float], optional): time step of the records by file name
+
+    Returns:
+        WaveformLibrary: up to date library
+    """
+    library = WaveformLibrary(waveform_folder)
+    parsed_records = library.update(time_steps)
+    if parsed_records:
+        print(f'Waveform library {library.data_path}: {len(parsed_records)} records parsed')
+    return library
+
+
+@lru_cache(maxsize=None)
+def _cached_waveform_library(waveform_folder: Path) -> WaveformLibrary:
+    return WaveformLibrary(waveform_folder)
+
+
+def open_waveform_library(waveform_folder: Path) -> WaveformLibrary:
+    """
+    Library of a waveform folder, opened once per process and reloaded when
+    its index is updated
+    """
+    library = _cached_waveform_library(waveform_folder)
+    library.refresh()
+    return library
+
+
+def load_waveform(waveform_folder: Path, filename: str) -> npt.NDArray:
+    """
+    Loads a waveform from the folder library, as a memory mapped view. Records
+    missing from the library or changed since it was built are parsed from text
+
+    Args:
+        waveform_folder (Path): folder holding the waveform text files
+        filename (str): waveform file name
+
+    Returns:
+        npt.NDArray: waveform values, read-only
+    """
+    library = open_waveform_library(Path(waveform_folder))
+    if library.is_current(filename):
+        return library[filename]
+    return read_waveform_file(Path(waveform_folder) / filename)